@@ -1,13 +1,16 @@
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.urls import reverse_lazy, reverse
-import httpx
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
 from rest_framework.authentication import TokenAuthentication
 from rest_framework_api_key.models import APIKey
 from rest_framework_api_key.permissions import KeyParser, BaseHasAPIKey
 
+from accounts.cache import get_token_user, is_api_key_valid
+from accounts.clients import arequest, get_http_client
 from accounts.schemas import SteamAuthSchema
-from steam.webapi import WebAPI
-from steam.steamid import SteamID
+from players.steam import get_player_summary
 
 
 class SteamAuthService:
@@ -25,7 +28,11 @@ class SteamAuthService:
         get_steamid_from_url: Get the Steam ID from a Steam profile URL.
         format_params: Format the Steam authentication parameters into a dict.
         is_valid_params: Check if the provided Steam authentication parameters are valid.
+        ais_valid_params: Async variant of is_valid_params.
+        get_player_info: Get the Steam profile of a player.
+        aget_player_info: Async variant of get_player_info.
         authenticate: Authenticate a user using Steam authentication.
+        aauthenticate: Async variant of authenticate.
     """
 
     def __init__(
@@ -100,37 +107,28 @@ class SteamAuthService:
         -------
             bool: True if the parameters are valid, False otherwise.
         """
+        response = get_http_client().post(url=self.auth_url, data=self.get_check_params(params))
+        return "is_valid:true" in response.text
+
+    async def ais_valid_params(self, params: SteamAuthSchema) -> bool:
+        response = await arequest("POST", self.auth_url, data=self.get_check_params(params))
+        return "is_valid:true" in response.text
+
+    def get_check_params(self, params: SteamAuthSchema) -> dict:
         params_copy = params
         params_copy.openid_mode = "check_authentication"
-        formatted_params = self.format_params(params_copy)
-        with httpx.Client() as client:
-            response = client.post(url=self.auth_url, data=formatted_params)
-            return "is_valid:true" in response.text
+        return self.format_params(params_copy)
 
     def get_player_info(self, steamid64) -> dict:
-        steam_api = WebAPI(settings.STEAM_API_KEY)
-        results = steam_api.call(
-            "ISteamUser.GetPlayerSummaries",
-            steamids=steamid64,
-        )
-        if not len(results["response"]["players"]):
+        player = get_player_summary(steamid64)
+        if player is None:
             msg = "Invalid steamid64"
             raise Exception(msg)  # noqa: TRY002
+        return player
 
-        player = results["response"]["players"][0]
-
-        profile_url = player["profileurl"]
-        avatar = player["avatarfull"]
-
-        steamid64_from_player = player["steamid"]
-        steamid32 = SteamID(steamid64_from_player).as_steam2
-        return {
-            "username": player["personaname"],  # noqa: TRY002
-            "steamid64": steamid64_from_player,
-            "steamid32": steamid32,
-            "profile_url": profile_url,
-            "avatar": avatar,
-        }
+    async def aget_player_info(self, steamid64) -> dict:
+        # The Steam Web API client is blocking, it keeps its own pooled session and summaries are cached
+        return await sync_to_async(self.get_player_info, thread_sensitive=False)(steamid64)
 
     def authenticate(self, user: dict, params: SteamAuthSchema):
         """
@@ -153,6 +151,11 @@ class SteamAuthService:
             raise Exception(400, "Cannot authenticate steam profile")
         return self.get_steamid_from_url(params.openid_claimed_id)
 
+    async def aauthenticate(self, user: dict, params: SteamAuthSchema):
+        if not await self.ais_valid_params(params):
+            raise Exception(400, "Cannot authenticate steam profile")
+        return self.get_steamid_from_url(params.openid_claimed_id)
+
 
 class DiscordAuthService:
     """
@@ -161,18 +164,23 @@ class DiscordAuthService:
     Attributes
     ----------
         auth_url (str): The Discord authentication URL.
+        token_url (str): The Discord token URL.
+        user_info_url (str): The Discord URL of the current user.
 
     Methods
     -------
         get_login_url: Get the Discord authentication URL.
         exchange_code: Exchange a code for an access token.
+        aexchange_code: Async variant of exchange_code.
         get_user_info: Get the user information from the access token.
+        aget_user_info: Async variant of get_user_info.
     """
 
     def __init__(self) -> None:
         """Initialize the DiscordAuthService."""
         self.auth_url = "https://discord.com/api/oauth2/authorize"
         self.token_url = "https://discord.com/api/oauth2/token"
+        self.user_info_url = "https://discord.com/api/users/@me"
 
     def get_login_url(self, request):
         redirect_url = request.build_absolute_uri(reverse("discord_callback"))
@@ -195,6 +203,16 @@ class DiscordAuthService:
         -------
             dict: The access token.
         """
+        response = get_http_client().post(**self.get_token_request(code, request))
+        response.raise_for_status()
+        return response.json()
+
+    async def aexchange_code(self, code: str, request) -> dict:
+        response = await arequest("POST", **self.get_token_request(code, request))
+        response.raise_for_status()
+        return response.json()
+
+    def get_token_request(self, code: str, request) -> dict:
         redirect_url = request.build_absolute_uri(reverse("discord_callback"))
         data = {
             "grant_type": "authorization_code",
@@ -202,15 +220,12 @@ class DiscordAuthService:
             "redirect_uri": redirect_url,
         }
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        with httpx.Client() as client:
-            response = client.post(
-                url=self.token_url,
-                data=data,
-                headers=headers,
-                auth=(settings.DISCORD_CLIENT_ID, settings.DISCORD_CLIENT_SECRET),
-            )
-            response.raise_for_status()
-            return response.json()
+        return {
+            "url": self.token_url,
+            "data": data,
+            "headers": headers,
+            "auth": (settings.DISCORD_CLIENT_ID, settings.DISCORD_CLIENT_SECRET),
+        }
 
     def get_user_info(self, access_token: str) -> dict:
         """
@@ -225,14 +240,34 @@ class DiscordAuthService:
             dict: The user information.
         """
         headers = {"Authorization": f"Bearer {access_token}"}
-        with httpx.Client() as client:
-            response = client.get(
-                url="https://discord.com/api/users/@me", headers=headers
-            )
-            return response.json()
+        response = get_http_client().get(url=self.user_info_url, headers=headers)
+        return response.json()
+
+    async def aget_user_info(self, access_token: str) -> dict:
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = await arequest("GET", self.user_info_url, headers=headers)
+        return response.json()
+
 
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication reading the token user from the cache.
 
-class BearerTokenAuthentication(TokenAuthentication):
+    ``request.auth`` is an ``AuthToken`` with the IDs of the player and discord user of the user, so
+    permissions can compare them without loading related objects.
+    """
+
+    def authenticate_credentials(self, key):
+        token_user = get_token_user(key)
+        if token_user is None:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+        user, auth_token = token_user
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        return user, auth_token
+
+
+class BearerTokenAuthentication(CachedTokenAuthentication):
     keyword = "Bearer"
 
 class BearerKeyParser(KeyParser):
@@ -240,4 +275,10 @@ class BearerKeyParser(KeyParser):
 
 class HasAPIKey(BaseHasAPIKey):
     model = APIKey  # Or a custom model
-    key_parser = BearerKeyParser()
\ No newline at end of file
+    key_parser = BearerKeyParser()
+
+    def has_permission(self, request, view) -> bool:
+        key = self.get_key(request)
+        if not key:
+            return False
+        return is_api_key_valid(key)
@@ -0,0 +1,234 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from rest_framework_api_key.models import APIKey
+
+API_KEY_CACHE_KEY = "api_key:{}"
+API_KEY_DIGEST_CACHE_KEY = "api_key_digest:{}"
+AUTH_TOKEN_CACHE_KEY = "auth_token:key:{}"
+MISSING = object()
+
+
+class AuthToken(NamedTuple):
+    """
+    Authenticated token set as ``request.auth`` by ``CachedTokenAuthentication``.
+
+    Attributes
+    ----------
+        user_id (str): User ID.
+        player_id (str | None): Player ID of the user.
+        discord_user_id (str | None): Discord user ID of the player.
+    """
+    user_id: str
+    player_id: str | None
+    discord_user_id: str | None
+
+
+class LocalCache:
+    """
+    Thread safe in-process LRU cache with a time to live.
+
+    Entries expire ``timeout`` seconds after they were set, the least recently used entry is evicted
+    once ``max_size`` entries are stored.
+
+    Attributes
+    ----------
+        max_size (int): Maximum number of entries.
+        timeout (float): Seconds an entry is kept.
+
+    Methods
+    -------
+        get: Get an entry, MISSING if it does not exist or expired.
+        set: Set an entry.
+        delete: Delete an entry.
+        clear: Delete all entries.
+    """
+
+    def __init__(self, max_size: int = 1024, timeout: float = 5) -> None:
+        """Initialize the LocalCache."""
+        self.max_size = max_size
+        self.timeout = timeout
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key, MISSING)
+            if entry is MISSING:
+                return MISSING
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout: float | None = None) -> None:
+        expires_at = time.monotonic() + (self.timeout if timeout is None else timeout)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+api_keys_local_cache = LocalCache(settings.API_KEY_LOCAL_CACHE_SIZE, settings.API_KEY_LOCAL_CACHE_TIMEOUT)
+auth_tokens_local_cache = LocalCache(settings.AUTH_TOKEN_LOCAL_CACHE_SIZE, settings.AUTH_TOKEN_LOCAL_CACHE_TIMEOUT)
+
+
+def get_key_digest(key: str) -> str:
+    """Keyed BLAKE2 digest of a presented secret, cheap to compute and useless without SECRET_KEY."""
+    return hashlib.blake2b(key.encode(), key=settings.SECRET_KEY.encode()[:64], digest_size=20).hexdigest()
+
+
+def get_api_key_cache_key(digest: str) -> str:
+    return API_KEY_CACHE_KEY.format(digest)
+
+
+def get_api_key_digest_cache_key(prefix: str) -> str:
+    return API_KEY_DIGEST_CACHE_KEY.format(prefix)
+
+
+def is_api_key_valid(key: str) -> bool:
+    """
+    Check an API key, verified keys are cached in process and in Redis by the digest of the key.
+
+    A cached key costs a dictionary lookup, or a cache read in a new process, instead of the password
+    hasher and the database query of ``APIKey.objects.is_valid``. Entries keep the expiry date of the
+    key and are dropped when the key is saved (e.g. revoked) or deleted, in-process entries of other
+    processes live for at most ``API_KEY_LOCAL_CACHE_TIMEOUT`` seconds.
+
+    Args:
+    -----
+        key (str): Presented API key.
+
+    Returns:
+    --------
+        bool: True if the key exists, is not revoked and has not expired.
+    """
+    digest = get_key_digest(key)
+    entry = api_keys_local_cache.get(digest)
+    if entry is MISSING:
+        entry = cache.get(get_api_key_cache_key(digest))
+        if entry is not None:
+            api_keys_local_cache.set(digest, entry)
+    if entry is MISSING or entry is None:
+        try:
+            api_key = APIKey.objects.get_from_key(key)
+        except APIKey.DoesNotExist:
+            return False
+        if api_key.has_expired:
+            return False
+        entry = {
+            "prefix": api_key.prefix,
+            "expiry_date": api_key.expiry_date.timestamp() if api_key.expiry_date else None,
+        }
+        timeout = settings.API_KEY_CACHE_TIMEOUT
+        if entry["expiry_date"] is not None:
+            timeout = max(min(timeout, int(entry["expiry_date"] - time.time()) + 1), 1)
+        cache.set_many(
+            {get_api_key_cache_key(digest): entry, get_api_key_digest_cache_key(api_key.prefix): digest},
+            timeout=timeout,
+        )
+        api_keys_local_cache.set(digest, entry)
+    return entry["expiry_date"] is None or entry["expiry_date"] > time.time()
+
+
+def invalidate_api_key(prefix: str) -> None:
+    """
+    Drop the cached verification of an API key.
+
+    Args:
+    -----
+        prefix (str): Prefix of the API key.
+
+    Returns:
+    --------
+        None
+    """
+    digest_cache_key = get_api_key_digest_cache_key(prefix)
+    digest = cache.get(digest_cache_key)
+    if digest is None:
+        return
+    cache.delete_many([get_api_key_cache_key(digest), digest_cache_key])
+    api_keys_local_cache.delete(digest)
+
+
+def get_auth_token_cache_key(digest: str) -> str:
+    return AUTH_TOKEN_CACHE_KEY.format(digest)
+
+
+def get_token_user(key: str) -> tuple | None:
+    """
+    Get the user of a token with the IDs of their player and discord user, cached by the digest of the key.
+
+    Only the IDs and the active flag of the user are cached, every call builds a new user from them
+    whose other fields are loaded from the database on first access.
+
+    Args:
+    -----
+        key (str): Presented token key.
+
+    Returns:
+    --------
+        tuple[User, AuthToken] | None: User and token or None if the token does not exist.
+    """
+    digest = get_key_digest(key)
+    entry = auth_tokens_local_cache.get(digest)
+    if entry is MISSING:
+        entry = cache.get(get_auth_token_cache_key(digest))
+        if entry is None:
+            entry = (
+                Token.objects.filter(key=key)
+                .values_list("user_id", "user__is_active", "user__player_id", "user__player__discord_user_id")
+                .first()
+            )
+            if entry is None:
+                return None
+            cache.set(get_auth_token_cache_key(digest), entry, timeout=settings.AUTH_TOKEN_CACHE_TIMEOUT)
+        auth_tokens_local_cache.set(digest, entry)
+    user_id, is_active, player_id, discord_user_id = entry
+    return get_deferred_user(user_id, is_active, player_id), AuthToken(user_id, player_id, discord_user_id)
+
+
+def get_deferred_user(user_id: str, is_active: bool, player_id: str | None):
+    """Build a user from its ID, active flag and player ID, the other fields are deferred."""
+    user_model = get_user_model()
+    values = {"id": user_id, "is_active": is_active, "player_id": player_id}
+    field_names = [field.attname for field in user_model._meta.concrete_fields if field.attname in values]
+    return user_model.from_db(user_model.objects.db, field_names, [values[name] for name in field_names])
+
+
+def invalidate_auth_tokens(keys) -> None:
+    """
+    Drop the cached users of tokens.
+
+    Args:
+    -----
+        keys (Iterable[str]): Token keys.
+
+    Returns:
+    --------
+        None
+    """
+    digests = [get_key_digest(key) for key in keys]
+    if not digests:
+        return
+    cache.delete_many([get_auth_token_cache_key(digest) for digest in digests])
+    for digest in digests:
+        auth_tokens_local_cache.delete(digest)
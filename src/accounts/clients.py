@@ -0,0 +1,149 @@
+import asyncio
+import importlib.util
+import threading
+import weakref
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from steam.webapi import WebAPI
+
+_lock = threading.Lock()
+_http_client: httpx.Client | None = None
+_async_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_steam_webapis: dict[str, WebAPI] = {}
+
+
+def is_http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def get_transport_options() -> dict:
+    """
+    Options of the transports of the sync and async HTTP clients.
+
+    Returns:
+    --------
+        dict: Keyword arguments of ``httpx.HTTPTransport`` and ``httpx.AsyncHTTPTransport``.
+    """
+    return {
+        "http2": is_http2_available(),
+        "limits": httpx.Limits(
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+        ),
+        "retries": settings.HTTP_CLIENT_RETRIES,
+    }
+
+
+def get_timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.HTTP_CLIENT_TIMEOUT, connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT)
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Get the HTTP client shared by the threads of the process.
+
+    Connections are kept alive between requests, so logins reuse them instead of paying the DNS
+    lookup and TLS handshake every time. Connect errors are retried ``HTTP_CLIENT_RETRIES`` times.
+
+    Returns:
+    --------
+        httpx.Client: Shared client.
+    """
+    global _http_client
+    client = _http_client
+    if client is None or client.is_closed:
+        with _lock:
+            client = _http_client
+            if client is None or client.is_closed:
+                client = httpx.Client(
+                    transport=httpx.HTTPTransport(**get_transport_options()), timeout=get_timeout()
+                )
+                _http_client = client
+    return client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Get the async HTTP client of the running event loop.
+
+    Connections of an async client belong to the loop that opened them, so every loop gets its own
+    client, dropped together with the loop.
+
+    Returns:
+    --------
+        httpx.AsyncClient: Shared client of the running loop.
+
+    Raises:
+    -------
+        RuntimeError: If no event loop is running.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(**get_transport_options()), timeout=get_timeout()
+        )
+        _async_http_clients[loop] = client
+    return client
+
+
+async def arequest(method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    Send a request without blocking the event loop.
+
+    With ``USE_ASYNC_CLIENTS`` the request goes through the async client of the running loop, otherwise
+    through the shared sync client in a thread, as loops of async views under WSGI only live for a request.
+
+    Args:
+    -----
+        method (str): HTTP method.
+        url (str): URL.
+        **kwargs: Arguments of ``httpx.Client.request``.
+
+    Returns:
+    --------
+        httpx.Response: Response.
+    """
+    if not settings.USE_ASYNC_CLIENTS:
+        return await sync_to_async(get_http_client().request, thread_sensitive=False)(method, url, **kwargs)
+    return await get_async_http_client().request(method, url, **kwargs)
+
+
+def get_steam_webapi() -> WebAPI:
+    """
+    Get the Steam Web API of ``STEAM_API_KEY``, the list of interfaces is fetched once per process.
+
+    Returns:
+    --------
+        WebAPI: Shared Steam Web API.
+    """
+    key = settings.STEAM_API_KEY
+    webapi = _steam_webapis.get(key)
+    if webapi is None:
+        with _lock:
+            webapi = _steam_webapis.get(key)
+            if webapi is None:
+                webapi = WebAPI(key, http_timeout=settings.HTTP_CLIENT_TIMEOUT)
+                _steam_webapis[key] = webapi
+    return webapi
+
+
+def close_http_client() -> None:
+    """Close the shared sync HTTP client, the next call of ``get_http_client`` opens a new one."""
+    global _http_client
+    with _lock:
+        client, _http_client = _http_client, None
+    if client is not None:
+        client.close()
+
+
+async def aclose_http_client() -> None:
+    """Close the async HTTP client of the running event loop."""
+    client = _async_http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
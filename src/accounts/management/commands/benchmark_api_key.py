@@ -0,0 +1,52 @@
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory
+from rest_framework_api_key.models import APIKey
+from rest_framework_api_key.permissions import BaseHasAPIKey
+
+from accounts.auth import BearerKeyParser, HasAPIKey
+from accounts.cache import api_keys_local_cache
+from guilds.views import GuildViewSet
+
+
+class UncachedHasAPIKey(BaseHasAPIKey):
+    model = APIKey
+    key_parser = BearerKeyParser()
+
+
+class Command(BaseCommand):
+    help = "Compare the throughput of the stock and cached API key permission"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=200, help="Checks per measurement")
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+        factory = APIRequestFactory()
+        with transaction.atomic():
+            _, key = APIKey.objects.create_key(name="benchmark")
+            request = factory.get("/api/guilds/", HTTP_AUTHORIZATION=f"Bearer {key}")
+            for permission_class in (UncachedHasAPIKey, HasAPIKey):
+                cache.clear()
+                api_keys_local_cache.clear()
+                permission = permission_class()
+                self.report("has_permission", permission_class, repeat, lambda: permission.has_permission(request, None))
+                view = GuildViewSet.as_view({"get": "list"}, permission_classes=[permission_class])
+                self.report("GET /api/guilds/", permission_class, repeat, lambda: view(request))
+            transaction.set_rollback(True)
+        cache.clear()
+        api_keys_local_cache.clear()
+
+    def report(self, name: str, permission_class, repeat: int, run) -> None:
+        run()
+        started_at = time.perf_counter()
+        for _ in range(repeat):
+            run()
+        elapsed = time.perf_counter() - started_at
+        self.stdout.write(
+            f"{name:<18} {permission_class.__name__:<18} {repeat / elapsed:10.0f} req/s  "
+            f"{elapsed / repeat * 1_000_000:10.1f} us/req"
+        )
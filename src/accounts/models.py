@@ -1,10 +1,14 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 from prefix_id import PrefixIDField
 from rest_framework.authtoken.models import Token
+from rest_framework_api_key.models import APIKey
+
+from accounts.cache import invalidate_api_key, invalidate_auth_tokens
+from accounts.utils import invalidate_discord_users_tokens, invalidate_user_token
 
 
 class User(AbstractUser):
@@ -23,3 +27,58 @@ class User(AbstractUser):
 def create_auth_token(sender, instance=None, created=False, **kwargs):
     if created:
         Token.objects.create(user=instance)
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def store_previous_user_discord_user(sender, instance=None, update_fields=None, **kwargs):
+    # The token cached for the discord user of the previous player is dropped after the save
+    instance._previous_discord_user_id = None
+    if instance.pk is not None and (update_fields is None or "player" in update_fields):
+        instance._previous_discord_user_id = (
+            User.objects.filter(pk=instance.pk).values_list("player__discord_user", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_auth_token_on_user_change(sender, instance=None, created=False, **kwargs):
+    if not created:
+        invalidate_user_token(instance)
+        invalidate_discord_users_tokens([getattr(instance, "_previous_discord_user_id", None)])
+        invalidate_auth_tokens(Token.objects.filter(user=instance).values_list("key", flat=True))
+
+
+@receiver(pre_save, sender="players.Player")
+def store_previous_player_discord_user(sender, instance=None, update_fields=None, **kwargs):
+    instance._previous_discord_user_id = None
+    if instance.pk is not None and (update_fields is None or "discord_user" in update_fields):
+        instance._previous_discord_user_id = (
+            sender.objects.filter(pk=instance.pk).values_list("discord_user", flat=True).first()
+        )
+
+
+@receiver(post_save, sender="players.Player")
+def invalidate_auth_tokens_on_player_change(sender, instance=None, created=False, **kwargs):
+    if not created:
+        previous_discord_user_id = getattr(instance, "_previous_discord_user_id", None)
+        if previous_discord_user_id != instance.discord_user_id:
+            invalidate_discord_users_tokens([previous_discord_user_id, instance.discord_user_id])
+        invalidate_auth_tokens(Token.objects.filter(user__player=instance).values_list("key", flat=True))
+
+
+@receiver(pre_delete, sender="players.Player")
+def invalidate_auth_tokens_on_player_delete(sender, instance=None, **kwargs):
+    # Read before the delete, the users of the player are deleted with it
+    invalidate_auth_tokens(Token.objects.filter(user__player=instance).values_list("key", flat=True))
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_auth_token(sender, instance=None, **kwargs):
+    invalidate_user_token(instance.user)
+    invalidate_auth_tokens([instance.key])
+
+
+@receiver(post_save, sender=APIKey)
+@receiver(post_delete, sender=APIKey)
+def invalidate_cached_api_key(sender, instance=None, **kwargs):
+    invalidate_api_key(instance.prefix)
@@ -0,0 +1,187 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.authtoken.models import Token
+from rest_framework_api_key.models import APIKey
+
+from accounts.cache import (
+    MISSING,
+    AuthToken,
+    LocalCache,
+    api_keys_local_cache,
+    auth_tokens_local_cache,
+    get_api_key_cache_key,
+    get_auth_token_cache_key,
+    get_key_digest,
+    get_token_user,
+    is_api_key_valid,
+)
+from matches.tests.conftest import default_maps, match, teams, teams_with_players, players
+from players.tests.conftest import player, discord_user_data, steam_user_data, default_author
+from guilds.tests.conftest import guild, guild_data
+from players.models import DiscordUser
+
+
+@pytest.fixture
+def api_key():
+    cache.clear()
+    api_keys_local_cache.clear()
+    return APIKey.objects.create_key(name="test")
+
+
+@pytest.mark.django_db
+def test_is_api_key_valid_is_cached(api_key, django_assert_num_queries, mocker):
+    _, key = api_key
+    verify = mocker.spy(APIKey, "is_valid")
+    with django_assert_num_queries(1):
+        assert is_api_key_valid(key)
+    with django_assert_num_queries(0):
+        assert is_api_key_valid(key)
+    assert verify.call_count == 1
+
+    # Another process only has the shared cache
+    api_keys_local_cache.clear()
+    with django_assert_num_queries(0):
+        assert is_api_key_valid(key)
+    assert verify.call_count == 1
+
+
+@pytest.mark.django_db
+def test_is_api_key_valid_rejects_invalid_keys(api_key):
+    api_key, key = api_key
+    assert not is_api_key_valid(f"{api_key.prefix}.wrong")
+    assert not is_api_key_valid("unknown")
+    assert cache.get(get_api_key_cache_key(get_key_digest(f"{api_key.prefix}.wrong"))) is None
+    assert is_api_key_valid(key)
+
+
+@pytest.mark.django_db
+def test_revoked_api_key_is_invalidated(api_key):
+    api_key, key = api_key
+    assert is_api_key_valid(key)
+    api_key.revoked = True
+    api_key.save()
+    assert cache.get(get_api_key_cache_key(get_key_digest(key))) is None
+    assert not is_api_key_valid(key)
+
+
+@pytest.mark.django_db
+def test_deleted_api_key_is_invalidated(api_key):
+    api_key, key = api_key
+    assert is_api_key_valid(key)
+    api_key.delete()
+    assert not is_api_key_valid(key)
+
+
+@pytest.mark.django_db
+def test_cached_api_key_expires(api_key, mocker):
+    api_key, key = api_key
+    api_key.expiry_date = timezone.now() + timedelta(minutes=1)
+    api_key.save()
+    assert is_api_key_valid(key)
+    mocker.patch("accounts.cache.time.time", return_value=(timezone.now() + timedelta(minutes=2)).timestamp())
+    assert not is_api_key_valid(key)
+
+
+@pytest.mark.django_db
+def test_has_api_key_permission_uses_cache(api_key, django_assert_max_num_queries):
+    _, key = api_key
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {key}")
+    assert client.get("/api/guilds/").status_code == status.HTTP_200_OK
+    with django_assert_max_num_queries(2):
+        assert client.get("/api/guilds/").status_code == status.HTTP_200_OK
+    client.credentials(HTTP_AUTHORIZATION="Bearer wrong.key")
+    assert client.get("/api/guilds/").status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_local_cache_evicts_and_expires(mocker):
+    local_cache = LocalCache(max_size=2, timeout=10)
+    local_cache.set("a", 1)
+    local_cache.set("b", 2)
+    assert local_cache.get("a") == 1
+    local_cache.set("c", 3)
+    assert local_cache.get("b") is MISSING
+    assert local_cache.get("a") == 1
+    monotonic = mocker.patch("accounts.cache.time.monotonic", return_value=10 ** 9)
+    assert local_cache.get("c") is MISSING
+    monotonic.assert_called()
+
+
+@pytest.fixture
+def token(default_author):
+    cache.clear()
+    auth_tokens_local_cache.clear()
+    return Token.objects.get(user=default_author)
+
+
+@pytest.mark.django_db
+def test_get_token_user_is_cached(token, default_author, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        user, auth_token = get_token_user(token.key)
+    assert user == default_author
+    assert auth_token == AuthToken(default_author.pk, default_author.player_id, default_author.player.discord_user_id)
+    with django_assert_num_queries(0):
+        assert get_token_user(token.key) == (user, auth_token)
+        # Every call gets its own user
+        assert get_token_user(token.key)[0] is not user
+        assert user.is_active and user.player_id == default_author.player_id
+    # Other fields are loaded on first access
+    with django_assert_num_queries(1):
+        assert user.username == default_author.username
+    cached_entry = cache.get(get_auth_token_cache_key(get_key_digest(token.key)))
+    assert cached_entry == (
+        default_author.pk, True, default_author.player_id, default_author.player.discord_user_id
+    )
+    assert token.key not in repr(cached_entry)
+    auth_tokens_local_cache.clear()
+    with django_assert_num_queries(0):
+        assert get_token_user(token.key)[1] == auth_token
+    assert get_token_user("unknown") is None
+
+
+@pytest.mark.django_db
+def test_token_user_is_invalidated(token, default_author):
+    assert get_token_user(token.key)[0].is_active
+    default_author.is_active = False
+    default_author.save()
+    assert not get_token_user(token.key)[0].is_active
+
+    player = default_author.player
+    player.discord_user = DiscordUser.objects.create(user_id="123", username="new discord user")
+    player.save()
+    assert get_token_user(token.key)[1].discord_user_id == player.discord_user_id
+
+    key = token.key
+    token.delete()
+    assert get_token_user(key) is None
+
+
+@pytest.mark.django_db
+def test_token_user_is_invalidated_on_player_delete(token, default_author):
+    assert get_token_user(token.key)[1].discord_user_id == default_author.player.discord_user_id
+    default_author.player.delete()
+    assert get_token_user(token.key) is None
+
+
+@pytest.mark.django_db
+def test_config_authentication_does_not_query_user(token, match, django_assert_num_queries):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token.key}")
+    url = f"/api/matches/{match.pk}/config/"
+    assert client.get(url).status_code == status.HTTP_200_OK
+    # Config and token are cached, the author is checked against the cached discord user ID
+    with django_assert_num_queries(0):
+        assert client.get(url).status_code == status.HTTP_200_OK
+
+    other_user = get_user_model().objects.create(username="other")
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {Token.objects.get(user=other_user).key}")
+    assert client.get(url).status_code == status.HTTP_403_FORBIDDEN
+    client.credentials(HTTP_AUTHORIZATION="Bearer unknown")
+    assert client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,178 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+
+from accounts import clients
+from accounts.auth import DiscordAuthService, SteamAuthService
+from accounts.clients import aclose_http_client, close_http_client, get_http_client, get_steam_webapi
+from accounts.schemas import SteamAuthSchema
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def send_body(self, body: bytes, content_type: str, status: int = 200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        self.server.requests.append((self.path, body, self.headers.get("Authorization")))
+        if self.path == "/openid/login":
+            valid = "openid.mode=check_authentication" in body
+            self.send_body(f"ns:http://specs.openid.net/auth/2.0\nis_valid:{str(valid).lower()}\n".encode(), "text/plain")
+        elif self.path == "/oauth2/token":
+            self.send_body(json.dumps({"access_token": "token"}).encode(), "application/json")
+        else:
+            self.send_body(b"{}", "application/json", status=404)
+
+    def do_GET(self):
+        self.server.requests.append((self.path, "", self.headers.get("Authorization")))
+        if self.headers.get("Authorization") == "Bearer token":
+            self.send_body(json.dumps({"id": "1", "username": "user"}).encode(), "application/json")
+        else:
+            self.send_body(b"{}", "application/json", status=401)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    close_http_client()
+    yield server
+    close_http_client()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def server_url(stand_in_server):
+    host, port = stand_in_server.server_address
+    return f"http://{host}:{port}"
+
+
+@pytest.fixture
+def steam_auth(server_url):
+    service = SteamAuthService()
+    service.auth_url = f"{server_url}/openid/login"
+    return service
+
+
+@pytest.fixture
+def discord_auth(server_url):
+    service = DiscordAuthService()
+    service.token_url = f"{server_url}/oauth2/token"
+    service.user_info_url = f"{server_url}/users/@me"
+    return service
+
+
+def get_steam_params():
+    return SteamAuthSchema(
+        openid_ns="http://specs.openid.net/auth/2.0",
+        openid_mode="id_res",
+        openid_op_endpoint="https://steamcommunity.com/openid/login",
+        openid_claimed_id="https://steamcommunity.com/openid/id/76561198000000000",
+        openid_identity="https://steamcommunity.com/openid/id/76561198000000000",
+        openid_return_to="http://localhost/accounts/steam/callback/",
+        openid_response_nonce="nonce",
+        openid_assoc_handle="1234567890",
+        openid_signed="signed",
+        openid_sig="sig",
+    )
+
+
+@pytest.mark.django_db
+def test_services_reuse_connection(stand_in_server, steam_auth, discord_auth):
+    request = RequestFactory().get("/accounts/discord/callback/")
+    for _ in range(3):
+        assert steam_auth.authenticate({}, get_steam_params()) == "76561198000000000"
+        assert discord_auth.exchange_code("code", request) == {"access_token": "token"}
+        assert discord_auth.get_user_info("token") == {"id": "1", "username": "user"}
+
+    assert len(stand_in_server.requests) == 9
+    assert stand_in_server.connections == 1
+    path, body, authorization = stand_in_server.requests[1]
+    assert path == "/oauth2/token"
+    assert "grant_type=authorization_code" in body
+    assert authorization.startswith("Basic ")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("use_async_clients", [True, False])
+def test_services_async_variants(stand_in_server, steam_auth, discord_auth, settings, use_async_clients):
+    settings.USE_ASYNC_CLIENTS = use_async_clients
+    request = RequestFactory().get("/accounts/discord/callback/")
+
+    async def login():
+        try:
+            steamid64 = await steam_auth.aauthenticate({}, get_steam_params())
+            token = await discord_auth.aexchange_code("code", request)
+            user_info = await discord_auth.aget_user_info(token["access_token"])
+            return steamid64, user_info
+        finally:
+            await aclose_http_client()
+
+    assert asyncio.run(login()) == ("76561198000000000", {"id": "1", "username": "user"})
+    assert len(stand_in_server.requests) == 3
+    assert stand_in_server.connections == 1
+
+
+@pytest.mark.django_db
+def test_async_variants_reuse_connection_across_event_loops(stand_in_server, discord_auth, settings):
+    settings.USE_ASYNC_CLIENTS = False
+    # Under WSGI, every async view runs on a new event loop
+    for _ in range(3):
+        assert async_to_sync(discord_auth.aget_user_info)("token") == {"id": "1", "username": "user"}
+    assert stand_in_server.connections == 1
+
+
+@pytest.mark.django_db
+def test_exchange_code_raises_http_error(stand_in_server, discord_auth, server_url):
+    discord_auth.token_url = f"{server_url}/missing"
+    with pytest.raises(httpx.HTTPStatusError):
+        discord_auth.exchange_code("code", RequestFactory().get("/"))
+
+
+@pytest.mark.django_db
+def test_http_client_is_shared(settings):
+    settings.HTTP_CLIENT_TIMEOUT = 3
+    close_http_client()
+    client = get_http_client()
+    assert get_http_client() is client
+    assert client.timeout.read == 3
+    close_http_client()
+    assert client.is_closed
+    assert get_http_client() is not client
+    close_http_client()
+
+
+@pytest.mark.django_db
+def test_steam_webapi_is_shared(settings, mocker):
+    webapi = mocker.patch("accounts.clients.WebAPI")
+    mocker.patch.dict(clients._steam_webapis, clear=True)
+    settings.STEAM_API_KEY = "key1"
+    assert get_steam_webapi() is get_steam_webapi()
+    webapi.assert_called_once_with("key1", http_timeout=settings.HTTP_CLIENT_TIMEOUT)
+    settings.STEAM_API_KEY = "key2"
+    get_steam_webapi()
+    assert webapi.call_count == 2
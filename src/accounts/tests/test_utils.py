@@ -0,0 +1,64 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+
+from accounts.utils import get_discord_user_token, get_discord_users_tokens, get_discord_user_token_cache_key
+from players.models import DiscordUser, Player
+from players.tests.conftest import player, discord_user_data, steam_user_data, default_author
+
+
+@pytest.mark.django_db
+def test_get_discord_user_token(default_author, django_assert_num_queries):
+    cache.clear()
+    discord_user_id = default_author.player.discord_user_id
+    token = Token.objects.get(user=default_author).key
+    with django_assert_num_queries(1):
+        assert get_discord_user_token(discord_user_id) == token
+    with django_assert_num_queries(0):
+        assert get_discord_user_token(discord_user_id) == token
+
+
+@pytest.mark.django_db
+def test_get_discord_users_tokens_skips_unknown_users(default_author):
+    cache.clear()
+    discord_user_id = default_author.player.discord_user_id
+    tokens = get_discord_users_tokens([discord_user_id, "dc_user_unknown", None])
+    assert tokens == {discord_user_id: default_author.get_token()}
+
+
+@pytest.mark.django_db
+def test_discord_user_token_cache_invalidated_on_token_rotation(default_author):
+    cache.clear()
+    discord_user_id = default_author.player.discord_user_id
+    old_token = get_discord_user_token(discord_user_id)
+    Token.objects.filter(user=default_author).delete()
+    assert cache.get(get_discord_user_token_cache_key(discord_user_id)) is None
+    assert get_discord_user_token(discord_user_id) is None
+
+    new_token = Token.objects.create(user=default_author)
+    assert new_token.key != old_token
+    assert get_discord_user_token(discord_user_id) == new_token.key
+
+
+@pytest.mark.django_db
+def test_discord_user_token_cache_invalidated_on_player_relink(default_author):
+    cache.clear()
+    previous_discord_user_id = default_author.player.discord_user_id
+    token = get_discord_user_token(previous_discord_user_id)
+    discord_user = DiscordUser.objects.create(user_id="493797036869681153", username=".rzeznia")
+    default_author.player = Player.objects.create(discord_user=discord_user)
+    default_author.save()
+    assert get_discord_user_token(previous_discord_user_id) is None
+    assert get_discord_user_token(discord_user.pk) == token
+
+
+@pytest.mark.django_db
+def test_discord_user_token_cache_invalidated_on_discord_user_change(default_author):
+    cache.clear()
+    player = default_author.player
+    previous_discord_user_id = player.discord_user_id
+    token = get_discord_user_token(previous_discord_user_id)
+    player.discord_user = DiscordUser.objects.create(user_id="493797036869681153", username=".rzeznia")
+    player.save()
+    assert get_discord_user_token(previous_discord_user_id) is None
+    assert get_discord_user_token(player.discord_user_id) == token
@@ -0,0 +1,103 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+
+from players.models import Player
+
+DISCORD_USER_TOKEN_CACHE_KEY = "auth_token:discord_user:{}"
+
+
+def get_discord_user_token_cache_key(discord_user_id: str) -> str:
+    return DISCORD_USER_TOKEN_CACHE_KEY.format(discord_user_id)
+
+
+def get_discord_users_tokens(discord_users_ids: list[str]) -> dict[str, str]:
+    """
+    Resolve API tokens of the users connected to the given discord users.
+
+    Cached tokens are read in one round trip, the missing ones are loaded with a single query and cached.
+
+    Args:
+    -----
+        discord_users_ids (list[str]): Discord user IDs (primary keys).
+
+    Returns:
+    --------
+        dict[str, str]: Mapping of discord user ID to token key. Discord users without a token are omitted.
+    """
+    cache_keys = {
+        get_discord_user_token_cache_key(discord_user_id): discord_user_id
+        for discord_user_id in set(discord_users_ids)
+        if discord_user_id is not None
+    }
+    if not cache_keys:
+        return {}
+    cached_tokens = cache.get_many(cache_keys.keys())
+    tokens = {cache_keys[key]: token for key, token in cached_tokens.items()}
+    missing_ids = [discord_user_id for key, discord_user_id in cache_keys.items() if key not in cached_tokens]
+    if missing_ids:
+        missing_tokens = dict(
+            Token.objects.filter(user__player__discord_user__in=missing_ids).values_list(
+                "user__player__discord_user", "key"
+            )
+        )
+        cache.set_many(
+            {get_discord_user_token_cache_key(discord_user_id): key for discord_user_id, key in missing_tokens.items()},
+            timeout=settings.AUTH_TOKEN_CACHE_TIMEOUT,
+        )
+        tokens.update(missing_tokens)
+    return tokens
+
+
+def get_discord_user_token(discord_user_id: str) -> str | None:
+    """
+    Resolve the API token of the user connected to the discord user.
+
+    Args:
+    -----
+        discord_user_id (str): Discord user ID (primary key).
+
+    Returns:
+    --------
+        str | None: Token key or None if the discord user has no connected user.
+    """
+    return get_discord_users_tokens([discord_user_id]).get(discord_user_id)
+
+
+def invalidate_user_token(user) -> None:
+    """
+    Drop the cached token of the discord user connected to the user.
+
+    Args:
+    -----
+        user (User): User whose token was created, rotated or deleted.
+
+    Returns:
+    --------
+        None
+    """
+    if user is None or user.player_id is None:
+        return
+    discord_user_id = Player.objects.filter(pk=user.player_id).values_list("discord_user", flat=True).first()
+    invalidate_discord_users_tokens([discord_user_id])
+
+
+def invalidate_discord_users_tokens(discord_users_ids: list[str | None]) -> None:
+    """
+    Drop the cached tokens of the discord users.
+
+    Args:
+    -----
+        discord_users_ids (list[str | None]): Discord user IDs, None values are skipped.
+
+    Returns:
+    --------
+        None
+    """
+    cache_keys = [
+        get_discord_user_token_cache_key(discord_user_id)
+        for discord_user_id in set(discord_users_ids)
+        if discord_user_id is not None
+    ]
+    if cache_keys:
+        cache.delete_many(cache_keys)
@@ -33,14 +33,9 @@ def discord_callback(request):
         return JsonResponse({"error": "Invalid token"}, status=400)
     user_info = discord_auth.get_user_info(token["access_token"])
     request.session["dc_user"] = user_info
-    try:
-        dc_user = DiscordUser.objects.get(
-            user_id=user_info["id"], username=user_info["username"]
-        )
-    except DiscordUser.DoesNotExist:
-        dc_user = DiscordUser.objects.create(
-            user_id=user_info["id"], username=user_info["username"]
-        )
+    dc_user, _ = DiscordUser.objects.update_or_create(
+        user_id=user_info["id"], defaults={"username": user_info["username"]}
+    )
     try:
         user = User.objects.get(
             username=user_info["username"]
@@ -83,12 +78,14 @@ def steam_callback(request):
     steam_service = SteamAuthService()
     steamid64 = steam_service.authenticate(request.session.get("user"), params)
     player_info = steam_service.get_player_info(steamid64)
-    steam_user, created = SteamUser.objects.get_or_create(
+    steam_user, created = SteamUser.objects.update_or_create(
         steamid64=player_info["steamid64"],
-        username=player_info["username"],
-        steamid32=player_info["steamid32"],
-        profile_url=player_info["profile_url"],
-        avatar=player_info["avatar"],
+        defaults={
+            "username": player_info["username"],
+            "steamid32": player_info["steamid32"],
+            "profile_url": player_info["profile_url"],
+            "avatar": player_info["avatar"],
+        },
     )
     discord_user_session = request.session.get("dc_user", None)
     discord_user = DiscordUser.objects.get(user_id=discord_user_session["id"])
@@ -0,0 +1,37 @@
+import asyncio
+import weakref
+
+import redis.asyncio
+from django.conf import settings
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+
+def get_async_redis(url: str | None = None, timeout: float | None = None) -> redis.asyncio.Redis:
+    """
+    Get an async Redis client of the running event loop.
+
+    Connections of an async client belong to the loop that opened them, so every loop keeps its own
+    clients, one per URL and timeout, dropped together with the loop.
+
+    Args:
+    -----
+        url (str | None): Redis URL, the location of the default cache by default.
+        timeout (float | None): Socket and connect timeout in seconds.
+
+    Returns:
+    --------
+        redis.asyncio.Redis: Client with its own connection pool.
+
+    Raises:
+    -------
+        RuntimeError: If no event loop is running.
+    """
+    if url is None:
+        url = settings.CACHES["default"]["LOCATION"]
+    clients = _clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get((url, timeout))
+    if client is None:
+        client = redis.asyncio.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        clients[(url, timeout)] = client
+    return client
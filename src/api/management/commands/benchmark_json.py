@@ -0,0 +1,124 @@
+import contextlib
+import io
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from api.parsers import ORJSONParser
+from api.renderers import ORJSONRenderer
+from guilds.models import Guild
+from matches.models import Match
+from matches.serializers import MatchEventMapResultSerializer, MatchSerializer
+from players.models import DiscordUser, Player, SteamUser, Team
+
+UserModel = get_user_model()
+
+STEAMID64_BASE = 76561197960265728
+PLAYER_STATS = [
+    "kills", "deaths", "assists", "damage", "enemy5ks", "enemy4ks", "enemy3ks", "enemy2ks", "utility_count",
+    "utility_damage", "utility_successes", "utility_enemies", "flash_count", "flash_successes", "health_points_removed_total",
+    "health_points_dealt_total", "shots_fired_total", "shots_on_target_total", "v1_count", "v1_wins", "v2_count",
+    "v2_wins", "entry_count", "entry_wins", "equipment_value", "money_saved", "kill_reward", "live_time", "head_shot_kills",
+    "cash_earned", "enemies_flashed",
+]
+
+
+class Command(BaseCommand):
+    help = "Compare the throughput of the stock and orjson renderers and parsers on API payloads"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--matches", type=int, default=15, help="Matches in the rendered list")
+        parser.add_argument("--repeat", type=int, default=1_000, help="Iterations per measurement")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            matches = self.get_matches_data(options["matches"])
+            transaction.set_rollback(True)
+        map_result = self.get_map_result_payload()
+        validated_map_result = self.validate_map_result(map_result)
+
+        repeat = options["repeat"]
+        for name, data in (("MatchSerializer list", matches), ("map_result validated", validated_map_result)):
+            for renderer in (JSONRenderer(), ORJSONRenderer()):
+                self.report(f"render {name}", renderer, repeat, lambda: renderer.render(data))
+        content = JSONRenderer().render(map_result)
+        for parser in (JSONParser(), ORJSONParser()):
+            self.report("parse map_result", parser, repeat, lambda: parser.parse(io.BytesIO(content)))
+        for parser in (JSONParser(), ORJSONParser()):
+            self.report(
+                "parse and validate map_result", parser, repeat,
+                lambda: self.validate_map_result(parser.parse(io.BytesIO(content))),
+            )
+
+    def report(self, name: str, implementation, repeat: int, run) -> None:
+        started_at = time.perf_counter()
+        for _ in range(repeat):
+            run()
+        elapsed = time.perf_counter() - started_at
+        self.stdout.write(
+            f"{name:<30} {type(implementation).__name__:<15} {repeat / elapsed:10.0f} ops/s  "
+            f"{elapsed / repeat * 1_000_000:8.1f} us/op"
+        )
+
+    @staticmethod
+    def validate_map_result(payload: dict) -> dict:
+        serializer = MatchEventMapResultSerializer(data=payload)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    def get_matches_data(self, matches_count: int) -> list:
+        owner = UserModel.objects.create(username=f"benchmark{time.time_ns()}")
+        guild = Guild.objects.create(name="benchmark", guild_id=str(time.time_ns()), owner=owner)
+        players = [
+            Player.objects.create(
+                discord_user=DiscordUser.objects.create(user_id=str(time.time_ns() + i), username=f"player{i}"),
+                steam_user=SteamUser.objects.create(steamid64=str(STEAMID64_BASE + i), username=f"player{i}"),
+            )
+            for i in range(10)
+        ]
+        team1 = Team.objects.create(name="Benchmark 1", leader=players[0])
+        team1.players.add(*players[:5])
+        team2 = Team.objects.create(name="Benchmark 2", leader=players[5])
+        team2.players.add(*players[5:])
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(matches_count):
+                Match.objects.create_match(team1=team1, team2=team2, author=players[0].discord_user, guild=guild)
+        request = Request(RequestFactory().get("/"))
+        return MatchSerializer(
+            Match.objects.with_serializer_relations(), many=True, context={"request": request}
+        ).data
+
+    @staticmethod
+    def get_map_result_payload() -> dict:
+        def team(name: str, offset: int) -> dict:
+            return {
+                "name": name,
+                "series_score": 0,
+                "score": 13,
+                "score_ct": 7,
+                "score_t": 6,
+                "players": [
+                    {
+                        "steamid": str(STEAMID64_BASE + offset + i),
+                        "name": f"player{offset + i}",
+                        "stats": {stat: random.randint(0, 5_000) for stat in PLAYER_STATS},
+                    }
+                    for i in range(5)
+                ],
+            }
+
+        return {
+            "matchid": "1",
+            "event": "map_result",
+            "map_number": 0,
+            "team1": team("team1", 0),
+            "team2": team("team2", 5),
+            "winner": {"side": "ct", "team": "team1"},
+        }
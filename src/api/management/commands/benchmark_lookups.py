@@ -0,0 +1,107 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from guilds.models import Guild
+from matches.models import Map, Match, MatchStatus
+from players.models import DiscordUser, SteamUser
+from servers.models import Server
+
+UserModel = get_user_model()
+
+STEAMID64_BASE = 76561197960265728
+DISCORD_USER_ID_BASE = 10 ** 17
+
+
+class Command(BaseCommand):
+    help = "Seed a throwaway dataset and measure the latency of the hot lookups"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1_000_000, help="Discord and steam users to seed")
+        parser.add_argument("--matches", type=int, default=100_000, help="Matches to seed")
+        parser.add_argument("--guilds", type=int, default=1_000, help="Guilds to seed")
+        parser.add_argument("--servers", type=int, default=1_000, help="Servers to seed")
+        parser.add_argument("--repeat", type=int, default=500, help="Lookups per measurement")
+        parser.add_argument("--batch-size", type=int, default=10_000, help="bulk_create batch size")
+        parser.add_argument("--explain", action="store_true", help="Print the query plan of each lookup")
+        parser.add_argument("--keep", action="store_true", help="Keep the seeded data instead of rolling back")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options)
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE")
+            self.measure(options)
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+    def seed(self, options):
+        started_at = time.perf_counter()
+        batch_size = options["batch_size"]
+        DiscordUser.objects.bulk_create(
+            (
+                DiscordUser(user_id=str(DISCORD_USER_ID_BASE + i), username=f"user{i}")
+                for i in range(options["users"])
+            ),
+            batch_size=batch_size,
+        )
+        SteamUser.objects.bulk_create(
+            (SteamUser(steamid64=str(STEAMID64_BASE + i), username=f"user{i}") for i in range(options["users"])),
+            batch_size=batch_size,
+        )
+        owner = UserModel.objects.create(username=f"benchmark{time.time_ns()}")
+        guilds = Guild.objects.bulk_create(
+            [Guild(name=f"guild{i}", guild_id=str(DISCORD_USER_ID_BASE + i), owner=owner) for i in range(options["guilds"])],
+            batch_size=batch_size,
+        )
+        servers = Server.objects.bulk_create(
+            [Server(name=f"server{i}", ip="127.0.0.1", port=27015 + i) for i in range(options["servers"])],
+            batch_size=batch_size,
+        )
+        statuses = [MatchStatus.FINISHED] * 18 + [MatchStatus.CREATED, MatchStatus.LIVE]
+        Match.objects.bulk_create(
+            (
+                Match(status=random.choice(statuses), server=random.choice(servers), guild=random.choice(guilds))
+                for _ in range(options["matches"])
+            ),
+            batch_size=batch_size,
+        )
+        self.stdout.write(f"Seeded in {time.perf_counter() - started_at:.1f}s on {connection.vendor}")
+
+    def measure(self, options):
+        users, repeat = options["users"], options["repeat"]
+        servers = list(Server.objects.values_list("pk", flat=True))
+        guilds = list(Guild.objects.values_list("guild_id", flat=True))
+        maps = list(Map.objects.values_list("tag", flat=True)) or ["de_mirage"]
+        lookups = {
+            "DiscordUser.user_id": lambda: DiscordUser.objects.filter(
+                user_id=str(DISCORD_USER_ID_BASE + random.randrange(users))
+            ),
+            "SteamUser.steamid64": lambda: SteamUser.objects.filter(
+                steamid64=str(STEAMID64_BASE + random.randrange(users))
+            ),
+            "Guild.guild_id": lambda: Guild.objects.filter(guild_id=random.choice(guilds)),
+            "Map.tag": lambda: Map.objects.filter(tag=random.choice(maps)),
+            "Match(server, status)": lambda: Match.objects.filter(
+                server_id=random.choice(servers), status__in=[MatchStatus.STARTED, MatchStatus.LIVE]
+            ),
+        }
+        for name, get_queryset in lookups.items():
+            timings = []
+            for _ in range(repeat):
+                queryset = get_queryset()
+                started_at = time.perf_counter()
+                queryset.exists()
+                timings.append((time.perf_counter() - started_at) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f"{name:<24} p50 {statistics.median(timings):.3f} ms  "
+                f"p95 {timings[int(len(timings) * 0.95) - 1]:.3f} ms"
+            )
+            if options["explain"]:
+                self.stdout.write(get_queryset().explain())
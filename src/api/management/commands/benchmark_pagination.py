@@ -0,0 +1,85 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from rest_framework.pagination import Cursor, PageNumberPagination
+from rest_framework.request import Request
+
+from api.pagination import CreatedAtCursorPagination
+from players.models import DiscordUser
+
+DISCORD_USER_ID_BASE = 10 ** 17
+
+
+class Command(BaseCommand):
+    help = "Seed a throwaway dataset and compare page number and cursor pagination on deep pages"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1_000_000, help="Discord users to seed")
+        parser.add_argument("--depths", type=int, nargs="+", default=[1, 100, 1_000, 10_000, 50_000],
+                            help="Page numbers to measure")
+        parser.add_argument("--repeat", type=int, default=20, help="Requests per measurement")
+        parser.add_argument("--batch-size", type=int, default=10_000, help="bulk_create batch size")
+        parser.add_argument("--keep", action="store_true", help="Keep the seeded data instead of rolling back")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options)
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE")
+            self.measure(options)
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+    def seed(self, options):
+        started_at = time.perf_counter()
+        DiscordUser.objects.bulk_create(
+            (
+                DiscordUser(user_id=str(DISCORD_USER_ID_BASE + i), username=f"user{i}")
+                for i in range(options["users"])
+            ),
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(f"Seeded in {time.perf_counter() - started_at:.1f}s on {connection.vendor}")
+
+    def measure(self, options):
+        factory = RequestFactory()
+        queryset = DiscordUser.objects.order_by("created_at")
+        page_size = PageNumberPagination.page_size
+        pages = DiscordUser.objects.count() // page_size
+        for depth in options["depths"]:
+            if depth > pages:
+                continue
+            # Cursor of the requested page, taken from the last row of the previous page.
+            cursor_url = "/"
+            if depth > 1:
+                last = queryset.order_by("created_at", "id")[(depth - 1) * page_size - 1]
+                paginator = CreatedAtCursorPagination()
+                paginator.base_url = cursor_url
+                cursor_url = paginator.encode_cursor(
+                    Cursor(offset=0, reverse=False, position=paginator._get_position_from_instance(last, paginator.ordering))
+                )
+
+            page_number_timings = self.time_pages(
+                PageNumberPagination, queryset, factory.get("/", {"page": depth}), options["repeat"]
+            )
+            cursor_timings = self.time_pages(
+                CreatedAtCursorPagination, queryset, factory.get(cursor_url), options["repeat"]
+            )
+            self.stdout.write(
+                f"page {depth:<8} page number p50 {statistics.median(page_number_timings):8.3f} ms  "
+                f"cursor p50 {statistics.median(cursor_timings):8.3f} ms"
+            )
+
+    @staticmethod
+    def time_pages(pagination_class, queryset, request, repeat: int) -> list[float]:
+        timings = []
+        for _ in range(repeat):
+            paginator = pagination_class()
+            started_at = time.perf_counter()
+            list(paginator.paginate_queryset(queryset, Request(request)))
+            timings.append((time.perf_counter() - started_at) * 1000)
+        return timings
@@ -0,0 +1,71 @@
+from rest_framework.pagination import BasePagination, CursorPagination, PageNumberPagination
+
+PAGINATION_QUERY_PARAM = "pagination"
+CURSOR_PAGINATION = "cursor"
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination ordered by ``created_at, id``.
+
+    Pages start at the ``created_at`` of the cursor, read from the ``(created_at, id)`` index, instead of
+    an OFFSET and without counting the whole table, so deep pages cost the same as the first one.
+    """
+
+    ordering = ("created_at", "id")
+
+
+class RatingCursorPagination(CursorPagination):
+    """Keyset pagination of leaderboards, highest rating first."""
+
+    ordering = ("-rating", "id")
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class CursorOrPageNumberPagination(BasePagination):
+    """
+    Page number pagination, or cursor pagination with ``?pagination=cursor``.
+
+    The default keeps the ``count`` and page numbers of PageNumberPagination. Cursor pages carry
+    ``next`` and ``previous`` links only, which keep the ``pagination`` and ``cursor`` parameters.
+    """
+
+    page_number_pagination_class = PageNumberPagination
+    cursor_pagination_class = CreatedAtCursorPagination
+
+    def __init__(self) -> None:
+        self.paginator: BasePagination | None = None
+
+    def get_paginator(self, request) -> BasePagination:
+        use_cursor = (
+            request.query_params.get(PAGINATION_QUERY_PARAM) == CURSOR_PAGINATION
+            or self.cursor_pagination_class.cursor_query_param in request.query_params
+        )
+        return self.cursor_pagination_class() if use_cursor else self.page_number_pagination_class()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request)
+        return self.paginator.paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_number_pagination_class().get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *self.page_number_pagination_class().get_schema_operation_parameters(view),
+            {
+                "name": PAGINATION_QUERY_PARAM,
+                "required": False,
+                "in": "query",
+                "description": "Use cursor pagination ordered by creation time",
+                "schema": {"type": "string", "enum": [CURSOR_PAGINATION]},
+            },
+            *self.cursor_pagination_class().get_schema_operation_parameters(view),
+        ]
+
+    def to_html(self):
+        return self.paginator.to_html()
@@ -0,0 +1,36 @@
+import orjson
+from django.utils.http import parse_header_parameters
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    JSON renderer backed by orjson, enabled with ``USE_ORJSON`` (orjson has to be installed).
+
+    Datetimes, UUIDs and dict or list subclasses (such as ``ReturnDict`` and prefix IDs) are encoded
+    natively, everything else (lazy strings, Decimal, timedelta, querysets...) the same way as the
+    stock JSONRenderer.
+    """
+
+    media_type = "application/json"
+    format = "json"
+    charset = None
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if data is None:
+            return b""
+        options = ORJSON_OPTIONS
+        if self.get_indent(accepted_media_type):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=self.encoder.default, option=options)
+
+    @staticmethod
+    def get_indent(accepted_media_type: str | None) -> bool:
+        if not accepted_media_type:
+            return False
+        _, params = parse_header_parameters(accepted_media_type)
+        return "indent" in params
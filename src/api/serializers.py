@@ -0,0 +1,66 @@
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+
+SPARSE_FIELDS_PARAMETERS = [
+    OpenApiParameter("fields", str, description="Comma separated fields to return"),
+    OpenApiParameter("expand", str, description="Comma separated relations to return as objects instead of IDs"),
+]
+
+
+def parse_query_list(value: str | None) -> set[str] | None:
+    """
+    Parse a comma separated query parameter.
+
+    Args:
+    -----
+        value (str | None): Query parameter value.
+
+    Returns:
+    --------
+        set[str] | None: Names or None if the parameter is missing.
+    """
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+class DynamicFieldsMixin:
+    """
+    Serializer mixin supporting sparse fieldsets with the ``fields`` and ``expand`` query parameters.
+
+    ``?fields=id,status`` keeps only the listed fields, so unrequested method fields and nested
+    serializers are never computed. ``?expand=team1`` renders only the listed relations of
+    ``Meta.expandable_fields`` as nested objects, the other ones as primary keys. Without ``expand``
+    the relations in ``Meta.default_expand`` are nested, all of them if it is not set.
+
+    Only the top-level serializer of a response is affected.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if request is None or not self._is_root():
+            return fields
+        requested_fields = parse_query_list(request.query_params.get("fields"))
+        if requested_fields:
+            fields = {name: field for name, field in fields.items() if name in requested_fields}
+        expandable_fields = getattr(self.Meta, "expandable_fields", ())
+        expand = parse_query_list(request.query_params.get("expand"))
+        if expand is None:
+            expand = set(getattr(self.Meta, "default_expand", expandable_fields))
+        for name in expandable_fields:
+            if name in fields and name not in expand:
+                fields[name] = self.get_collapsed_field(name)
+        return fields
+
+    def get_collapsed_field(self, name: str) -> serializers.Field:
+        model_field = self.Meta.model._meta.get_field(name)
+        return serializers.PrimaryKeyRelatedField(
+            read_only=True, many=model_field.many_to_many, allow_null=model_field.null
+        )
+
+    def _is_root(self) -> bool:
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
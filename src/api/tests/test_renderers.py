@@ -0,0 +1,75 @@
+import datetime
+import decimal
+import io
+import json
+import uuid
+
+import pytest
+
+orjson = pytest.importorskip("orjson")
+
+from django.urls import reverse_lazy
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from api.parsers import ORJSONParser
+from api.renderers import ORJSONRenderer
+from cs2_battle_bot.tests.conftest import api_client, client_with_api_key
+from players.models import DiscordUser
+from players.views import DiscordUserViewSet
+
+
+def test_orjson_renderer_matches_json_renderer():
+    data = ReturnDict(
+        {
+            "id": "dc_user_1",
+            "created_at": datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            "date": datetime.date(2024, 5, 1),
+            "duration": datetime.timedelta(minutes=1),
+            "rating": decimal.Decimal("1.25"),
+            "uuid": uuid.UUID("12345678123456781234567812345678"),
+            "config_url": reverse_lazy("match-config", args=[1]),
+            "stats": {"kills": 20, "deaths": 10},
+            "maps": ("de_mirage", "de_nuke"),
+        },
+        serializer=None,
+    )
+    assert json.loads(ORJSONRenderer().render(data)) == json.loads(JSONRenderer().render(data))
+
+
+def test_orjson_renderer_empty_and_indent():
+    renderer = ORJSONRenderer()
+    assert renderer.render(None) == b""
+    assert renderer.render({"a": 1}, "application/json; indent=4") == b'{\n  "a": 1\n}'
+
+
+def test_orjson_parser():
+    assert ORJSONParser().parse(io.BytesIO(b'{"matchid": "1", "stats": {"kills": 20}}')) == {
+        "matchid": "1",
+        "stats": {"kills": 20},
+    }
+    with pytest.raises(ParseError):
+        ORJSONParser().parse(io.BytesIO(b'{"matchid": '))
+
+
+@pytest.mark.django_db
+def test_orjson_api(client_with_api_key, mocker):
+    mocker.patch.object(DiscordUserViewSet, "renderer_classes", [ORJSONRenderer])
+    mocker.patch.object(DiscordUserViewSet, "parser_classes", [ORJSONParser])
+    response = client_with_api_key.post(
+        "/api/discord-users/", {"user_id": "1234", "username": "orjson"}, format="json"
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert isinstance(response.accepted_renderer, ORJSONRenderer)
+    assert DiscordUser.objects.filter(user_id="1234").exists()
+
+    response = client_with_api_key.get("/api/discord-users/")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["results"][0]["username"] == "orjson"
+
+    response = client_with_api_key.post(
+        "/api/discord-users/", data=b'{"user_id": ', content_type="application/json"
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
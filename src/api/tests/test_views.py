@@ -0,0 +1,11 @@
+import asyncio
+
+from matches.views import MatchViewSet
+
+
+def test_async_actions_are_served_by_async_views():
+    assert asyncio.iscoroutinefunction(MatchViewSet.as_view({"post": "webhook"}))
+    assert asyncio.iscoroutinefunction(MatchViewSet.as_view({"get": "config"}))
+    assert not asyncio.iscoroutinefunction(MatchViewSet.as_view({"get": "list"}))
+    assert not asyncio.iscoroutinefunction(MatchViewSet.as_view({"get": "retrieve", "post": "load"}))
+
@@ -1,3 +1,64 @@
-from django.shortcuts import render
+import asyncio
+import inspect
+from functools import update_wrapper
 
-# Create your views here.
+from asgiref.sync import sync_to_async
+
+
+def has_async_actions(viewset, actions: dict | None) -> bool:
+    return bool(actions) and all(
+        asyncio.iscoroutinefunction(getattr(viewset, action, None)) for action in actions.values()
+    )
+
+
+class AsyncActionsMixin:
+    """
+    Serve the coroutine actions of a viewset as async views.
+
+    A route whose actions are all ``async def`` is dispatched on the event loop under ASGI, authentication,
+    permissions and throttling run in a thread as they may query the database. Other routes of the viewset
+    stay sync. Under WSGI, Django runs the async views in an event loop per request.
+
+    Methods
+    -------
+        as_view: Build the view of a route, async if all its actions are coroutines.
+        adispatch: Async variant of dispatch.
+    """
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not has_async_actions(cls, actions):
+            return view
+
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        return update_wrapper(async_view, view)
+
+    def dispatch(self, request, *args, **kwargs):
+        if has_async_actions(self, getattr(self, "action_map", None)):
+            return self.adispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -14,6 +14,7 @@ import os
 from pathlib import Path
 
 import toml
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -63,19 +64,30 @@ INSTALLED_APPS = [
     "corsheaders"
 ]
 
+USE_ORJSON = os.environ.get("USE_ORJSON", "False") == "True"
+# orjson is not a dependency of the project, it has to be installed next to it
+if USE_ORJSON:
+    try:
+        import orjson  # noqa: F401
+    except ImportError as e:
+        raise ImproperlyConfigured("USE_ORJSON=True requires orjson, install it with `pip install orjson`") from e
+# Async views use Redis and HTTP clients of the event loop, only worth it under an ASGI server whose loop
+# outlives requests. Under WSGI every async view runs on a new loop, so they use the shared sync pools.
+USE_ASYNC_CLIENTS = os.environ.get("USE_ASYNC_CLIENTS", "False") == "True"
+
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "accounts.auth.HasAPIKey",
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.auth.CachedTokenAuthentication',
         # 'accounts.auth.BearerTokenAuthentication',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'api.renderers.ORJSONRenderer' if USE_ORJSON else 'rest_framework.renderers.JSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'api.parsers.ORJSONParser' if USE_ORJSON else 'rest_framework.parsers.JSONParser',
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 15,
@@ -186,8 +198,69 @@ DISCORD_CLIENT_SECRET = os.environ.get("DISCORD_CLIENT_SECRET", "secret")
 
 STEAM_API_KEY = os.environ.get("STEAM_API_KEY", "key")
 
+# Shared HTTP clients of the Steam and Discord services, HTTP/2 is used when the h2 package is installed.
+HTTP_CLIENT_TIMEOUT = float(os.environ.get("HTTP_CLIENT_TIMEOUT", 10))
+HTTP_CLIENT_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CLIENT_CONNECT_TIMEOUT", 5))
+# Attempts to open a connection again after a connect error or timeout.
+HTTP_CLIENT_RETRIES = int(os.environ.get("HTTP_CLIENT_RETRIES", 2))
+HTTP_CLIENT_MAX_CONNECTIONS = int(os.environ.get("HTTP_CLIENT_MAX_CONNECTIONS", 20))
+HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS", 10))
+HTTP_CLIENT_KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_CLIENT_KEEPALIVE_EXPIRY", 60))
+
 AUTH_USER_MODEL = "accounts.User"  # new
 
+AUTH_TOKEN_CACHE_TIMEOUT = int(os.environ.get("AUTH_TOKEN_CACHE_TIMEOUT", 60 * 60))
+AUTH_TOKEN_LOCAL_CACHE_TIMEOUT = float(os.environ.get("AUTH_TOKEN_LOCAL_CACHE_TIMEOUT", 5))
+AUTH_TOKEN_LOCAL_CACHE_SIZE = int(os.environ.get("AUTH_TOKEN_LOCAL_CACHE_SIZE", 1024))
+API_KEY_CACHE_TIMEOUT = int(os.environ.get("API_KEY_CACHE_TIMEOUT", 5 * 60))
+# Verified API keys kept in process, revocations reach other processes after this many seconds.
+API_KEY_LOCAL_CACHE_TIMEOUT = float(os.environ.get("API_KEY_LOCAL_CACHE_TIMEOUT", 5))
+API_KEY_LOCAL_CACHE_SIZE = int(os.environ.get("API_KEY_LOCAL_CACHE_SIZE", 1024))
+MATCH_CONFIG_CACHE_TIMEOUT = int(os.environ.get("MATCH_CONFIG_CACHE_TIMEOUT", 60 * 60))
+MATCH_GUILD_CACHE_TIMEOUT = int(os.environ.get("MATCH_GUILD_CACHE_TIMEOUT", 60 * 60))
+
+RATING_K_FACTOR = float(os.environ.get("RATING_K_FACTOR", 32))
+TEAM_BALANCE_TIME_BUDGET = float(os.environ.get("TEAM_BALANCE_TIME_BUDGET", 0.05))
+
+# Base URL of the API used in the webhook URL of matches created by the matcher.
+MATCHMAKING_BASE_URL = os.environ.get("MATCHMAKING_BASE_URL", "http://localhost:8000")
+MATCHMAKING_PLAYERS_PER_TEAM = int(os.environ.get("MATCHMAKING_PLAYERS_PER_TEAM", 5))
+MATCHMAKING_MATCH_TYPE = os.environ.get("MATCHMAKING_MATCH_TYPE", "BO1")
+MATCHMAKING_RATING_WINDOW = float(os.environ.get("MATCHMAKING_RATING_WINDOW", 100))
+# Rating points the window widens by every second a player waits.
+MATCHMAKING_RATING_WINDOW_GROWTH = float(os.environ.get("MATCHMAKING_RATING_WINDOW_GROWTH", 5))
+MATCHMAKING_SCAN_LIMIT = int(os.environ.get("MATCHMAKING_SCAN_LIMIT", 200))
+MATCHMAKING_INTERVAL = float(os.environ.get("MATCHMAKING_INTERVAL", 2))
+
+JOB_RESULT_TIMEOUT = int(os.environ.get("JOB_RESULT_TIMEOUT", 60 * 60))
+LOAD_MATCH_DELAY = int(os.environ.get("LOAD_MATCH_DELAY", 5))
+
+RCON_TIMEOUT = float(os.environ.get("RCON_TIMEOUT", 5))
+RCON_POOL_MAX_CONNECTIONS = int(os.environ.get("RCON_POOL_MAX_CONNECTIONS", 2))
+RCON_POOL_IDLE_TIMEOUT = float(os.environ.get("RCON_POOL_IDLE_TIMEOUT", 300))
+RCON_POOL_HEALTH_CHECK_INTERVAL = float(os.environ.get("RCON_POOL_HEALTH_CHECK_INTERVAL", 30))
+
+SERVER_STATUS_POLL_INTERVAL = float(os.environ.get("SERVER_STATUS_POLL_INTERVAL", 15))
+SERVER_STATUS_TIMEOUT = float(os.environ.get("SERVER_STATUS_TIMEOUT", 2))
+SERVER_STATUS_TTL = int(os.environ.get("SERVER_STATUS_TTL", 60))
+
+STEAM_SUMMARY_CACHE_TIMEOUT = int(os.environ.get("STEAM_SUMMARY_CACHE_TIMEOUT", 60 * 60))
+# Steam users whose profile was updated longer ago than this many seconds are refreshed.
+STEAM_PROFILE_REFRESH_AGE = int(os.environ.get("STEAM_PROFILE_REFRESH_AGE", 24 * 60 * 60))
+STEAM_PROFILE_REFRESH_INTERVAL = float(os.environ.get("STEAM_PROFILE_REFRESH_INTERVAL", 5 * 60))
+# Minimum seconds between Steam Web API calls of a process, the API allows 100000 calls a day.
+STEAM_API_MIN_INTERVAL = float(os.environ.get("STEAM_API_MIN_INTERVAL", 1))
+STEAM_API_RETRIES = int(os.environ.get("STEAM_API_RETRIES", 3))
+
+EVENTS_REDIS_URL = os.environ.get("EVENTS_REDIS_URL", CACHES["default"]["LOCATION"])
+EVENTS_REDIS_TIMEOUT = float(os.environ.get("EVENTS_REDIS_TIMEOUT", 1))
+EVENTS_BUFFER_SIZE = int(os.environ.get("EVENTS_BUFFER_SIZE", 1000))
+EVENTS_BATCH_LINGER = float(os.environ.get("EVENTS_BATCH_LINGER", 0))
+# "pubsub", "stream" or "both"
+EVENTS_MODE = os.environ.get("EVENTS_MODE", "pubsub")
+EVENTS_STREAM_MAXLEN = int(os.environ.get("EVENTS_STREAM_MAXLEN", 10000))
+EVENTS_MATCH_STREAM_TTL = int(os.environ.get("EVENTS_MATCH_STREAM_TTL", 7 * 24 * 60 * 60))
+
 
 def get_spectacular_settings():
     # Load the pyproject.toml file
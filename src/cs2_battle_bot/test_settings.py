@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from rest_framework.authentication import TokenAuthentication
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -56,12 +57,23 @@ INSTALLED_APPS = [
     "django_filters"
 ]
 
+USE_ORJSON = os.environ.get("USE_ORJSON", "False") == "True"
+# orjson is not a dependency of the project, it has to be installed next to it
+if USE_ORJSON:
+    try:
+        import orjson  # noqa: F401
+    except ImportError as e:
+        raise ImproperlyConfigured("USE_ORJSON=True requires orjson, install it with `pip install orjson`") from e
+# Async views use Redis and HTTP clients of the event loop, only worth it under an ASGI server whose loop
+# outlives requests. Under WSGI every async view runs on a new loop, so they use the shared sync pools.
+USE_ASYNC_CLIENTS = os.environ.get("USE_ASYNC_CLIENTS", "False") == "True"
+
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "accounts.auth.HasAPIKey",
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.auth.CachedTokenAuthentication',
         # 'accounts.auth.BearerTokenAuthentication',
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
@@ -74,6 +86,9 @@ REST_FRAMEWORK = {
 
     ],
 }
+if USE_ORJSON:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = ['api.renderers.ORJSONRenderer']
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'] = ['api.parsers.ORJSONParser']
 
 # API_KEY_CUSTOM_HEADER = "Bearer"
 
@@ -118,15 +133,25 @@ DATABASES = {
     }
 }
 
-CACHES = {
-    "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
-        "LOCATION": os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/1"),
-        "OPTIONS": {
-            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+# The suite runs on django-redis when REDIS_URL is set (as in CI) and on the local memory cache otherwise,
+# so it also runs without Redis. matches/tests/test_cache.py always uses django-redis and is skipped when
+# Redis is unreachable.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            },
         },
-    },
-}
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+    }
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -174,6 +199,15 @@ DISCORD_REDIRECT_URI = os.environ.get("DISCORD_REDIRECT_URI", "uri")
 STEAM_API_KEY = os.environ.get("STEAM_API_KEY", "key")
 STEAM_REDIRECT_URI = os.environ.get("STEAM_REDIRECT_URI", "uri")
 
+# Shared HTTP clients of the Steam and Discord services, HTTP/2 is used when the h2 package is installed.
+HTTP_CLIENT_TIMEOUT = float(os.environ.get("HTTP_CLIENT_TIMEOUT", 10))
+HTTP_CLIENT_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CLIENT_CONNECT_TIMEOUT", 5))
+# Attempts to open a connection again after a connect error or timeout.
+HTTP_CLIENT_RETRIES = int(os.environ.get("HTTP_CLIENT_RETRIES", 2))
+HTTP_CLIENT_MAX_CONNECTIONS = int(os.environ.get("HTTP_CLIENT_MAX_CONNECTIONS", 20))
+HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS", 10))
+HTTP_CLIENT_KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_CLIENT_KEEPALIVE_EXPIRY", 60))
+
 RCON_HOST = os.environ.get("RCON_HOST", "localhost")
 RCON_PORT = os.environ.get("RCON_PORT", 27015)
 RCON_PASSWORD = os.environ.get("RCON_PASSWORD", "password")
@@ -183,6 +217,58 @@ API_KEY = os.environ.get("API_KEY", "key")
 
 AUTH_USER_MODEL = "accounts.User"  # new
 
+AUTH_TOKEN_CACHE_TIMEOUT = int(os.environ.get("AUTH_TOKEN_CACHE_TIMEOUT", 60 * 60))
+AUTH_TOKEN_LOCAL_CACHE_TIMEOUT = float(os.environ.get("AUTH_TOKEN_LOCAL_CACHE_TIMEOUT", 5))
+AUTH_TOKEN_LOCAL_CACHE_SIZE = int(os.environ.get("AUTH_TOKEN_LOCAL_CACHE_SIZE", 1024))
+API_KEY_CACHE_TIMEOUT = int(os.environ.get("API_KEY_CACHE_TIMEOUT", 5 * 60))
+# Verified API keys kept in process, revocations reach other processes after this many seconds.
+API_KEY_LOCAL_CACHE_TIMEOUT = float(os.environ.get("API_KEY_LOCAL_CACHE_TIMEOUT", 5))
+API_KEY_LOCAL_CACHE_SIZE = int(os.environ.get("API_KEY_LOCAL_CACHE_SIZE", 1024))
+MATCH_CONFIG_CACHE_TIMEOUT = int(os.environ.get("MATCH_CONFIG_CACHE_TIMEOUT", 60 * 60))
+MATCH_GUILD_CACHE_TIMEOUT = int(os.environ.get("MATCH_GUILD_CACHE_TIMEOUT", 60 * 60))
+
+RATING_K_FACTOR = float(os.environ.get("RATING_K_FACTOR", 32))
+TEAM_BALANCE_TIME_BUDGET = float(os.environ.get("TEAM_BALANCE_TIME_BUDGET", 0.05))
+
+# Base URL of the API used in the webhook URL of matches created by the matcher.
+MATCHMAKING_BASE_URL = os.environ.get("MATCHMAKING_BASE_URL", "http://localhost:8000")
+MATCHMAKING_PLAYERS_PER_TEAM = int(os.environ.get("MATCHMAKING_PLAYERS_PER_TEAM", 5))
+MATCHMAKING_MATCH_TYPE = os.environ.get("MATCHMAKING_MATCH_TYPE", "BO1")
+MATCHMAKING_RATING_WINDOW = float(os.environ.get("MATCHMAKING_RATING_WINDOW", 100))
+# Rating points the window widens by every second a player waits.
+MATCHMAKING_RATING_WINDOW_GROWTH = float(os.environ.get("MATCHMAKING_RATING_WINDOW_GROWTH", 5))
+MATCHMAKING_SCAN_LIMIT = int(os.environ.get("MATCHMAKING_SCAN_LIMIT", 200))
+MATCHMAKING_INTERVAL = float(os.environ.get("MATCHMAKING_INTERVAL", 2))
+
+JOB_RESULT_TIMEOUT = int(os.environ.get("JOB_RESULT_TIMEOUT", 60 * 60))
+LOAD_MATCH_DELAY = int(os.environ.get("LOAD_MATCH_DELAY", 5))
+
+RCON_TIMEOUT = float(os.environ.get("RCON_TIMEOUT", 5))
+RCON_POOL_MAX_CONNECTIONS = int(os.environ.get("RCON_POOL_MAX_CONNECTIONS", 2))
+RCON_POOL_IDLE_TIMEOUT = float(os.environ.get("RCON_POOL_IDLE_TIMEOUT", 300))
+RCON_POOL_HEALTH_CHECK_INTERVAL = float(os.environ.get("RCON_POOL_HEALTH_CHECK_INTERVAL", 30))
+
+SERVER_STATUS_POLL_INTERVAL = float(os.environ.get("SERVER_STATUS_POLL_INTERVAL", 15))
+SERVER_STATUS_TIMEOUT = float(os.environ.get("SERVER_STATUS_TIMEOUT", 2))
+SERVER_STATUS_TTL = int(os.environ.get("SERVER_STATUS_TTL", 60))
+
+STEAM_SUMMARY_CACHE_TIMEOUT = int(os.environ.get("STEAM_SUMMARY_CACHE_TIMEOUT", 60 * 60))
+# Steam users whose profile was updated longer ago than this many seconds are refreshed.
+STEAM_PROFILE_REFRESH_AGE = int(os.environ.get("STEAM_PROFILE_REFRESH_AGE", 24 * 60 * 60))
+STEAM_PROFILE_REFRESH_INTERVAL = float(os.environ.get("STEAM_PROFILE_REFRESH_INTERVAL", 5 * 60))
+# Minimum seconds between Steam Web API calls of a process, the API allows 100000 calls a day.
+STEAM_API_MIN_INTERVAL = float(os.environ.get("STEAM_API_MIN_INTERVAL", 1))
+STEAM_API_RETRIES = int(os.environ.get("STEAM_API_RETRIES", 3))
+
+EVENTS_REDIS_URL = os.environ.get("EVENTS_REDIS_URL", "redis://127.0.0.1:6379/0")
+EVENTS_REDIS_TIMEOUT = float(os.environ.get("EVENTS_REDIS_TIMEOUT", 1))
+EVENTS_BUFFER_SIZE = int(os.environ.get("EVENTS_BUFFER_SIZE", 1000))
+EVENTS_BATCH_LINGER = float(os.environ.get("EVENTS_BATCH_LINGER", 0))
+# "pubsub", "stream" or "both"
+EVENTS_MODE = os.environ.get("EVENTS_MODE", "pubsub")
+EVENTS_STREAM_MAXLEN = int(os.environ.get("EVENTS_STREAM_MAXLEN", 10000))
+EVENTS_MATCH_STREAM_TTL = int(os.environ.get("EVENTS_MATCH_STREAM_TTL", 7 * 24 * 60 * 60))
+
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
         'Basic': {
@@ -2,6 +2,8 @@ import pytest
 from rest_framework_api_key.models import APIKey
 from rest_framework.test import APIClient
 
+from accounts.cache import is_api_key_valid
+
 
 @pytest.fixture
 def api_client():
@@ -12,6 +14,8 @@ def api_client():
 def client_with_api_key():
     client = APIClient()
     api_key, key = APIKey.objects.create_key(name="test")
+    # Warm the verified keys cache, query counts of the tests are the ones of the steady state
+    is_api_key_valid(key)
     client.credentials(HTTP_AUTHORIZATION='Bearer ' + key)
     client.defaults["Authorization"] = f"Bearer {key}"
     return client
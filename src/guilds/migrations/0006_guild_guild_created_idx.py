@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guilds', '0005_alter_guild_guild_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='guild',
+            index=models.Index(fields=['created_at', 'id'], name='guild_created_idx'),
+        ),
+    ]
@@ -13,9 +13,11 @@ UserModel = get_user_model()
 
 class GuildManager(models.Manager):
     def create_guild(self, owner_id: str, owner_username: str, **kwargs):
-        dc_owner_user, _ = DiscordUser.objects.get_or_create(user_id=owner_id, username=owner_username)
+        dc_owner_user, _ = DiscordUser.objects.get_or_create(user_id=owner_id, defaults={"username": owner_username})
         player, _ = Player.objects.get_or_create(discord_user=dc_owner_user)
-        owner_user, _ = UserModel.objects.get_or_create(username=owner_username)
+        owner_user = UserModel.objects.filter(player=player).first()
+        if owner_user is None:
+            owner_user, _ = UserModel.objects.get_or_create(username=owner_username)
         if not owner_user.player:
             owner_user.player = player
             owner_user.save()
@@ -28,7 +30,7 @@ class Guild(models.Model):
     objects = GuildManager()
     id = PrefixIDField(primary_key=True, prefix="guild")
     name = models.CharField(max_length=255)
-    guild_id = models.CharField(max_length=255)
+    guild_id = models.CharField(max_length=255, unique=True)
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="guild_owner"
     )
@@ -38,5 +40,10 @@ class Guild(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="guild_created_idx"),
+        ]
+
     def __str__(self):
         return self.name
@@ -12,3 +12,14 @@ def test_create_guild(guild_data):
     assert guild.guild_id == guild_data["guild_id"]
     # +1 because the owner is also a member
     assert DiscordUser.objects.filter(user_id=guild_data["owner_id"]).exists() is True
+
+
+@pytest.mark.django_db
+def test_create_guild_of_known_owner_with_new_username(guild_data, django_user_model):
+    guild = Guild.objects.create_guild(**guild_data)
+    other_guild = Guild.objects.create_guild(
+        **{**guild_data, "guild_id": "583717343255986179", "owner_username": "qwizi_renamed"}
+    )
+    assert DiscordUser.objects.filter(user_id=guild_data["owner_id"]).count() == 1
+    assert other_guild.owner == guild.owner
+    assert django_user_model.objects.count() == 1
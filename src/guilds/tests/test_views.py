@@ -4,6 +4,8 @@ from cs2_battle_bot.tests.conftest import api_client
 from guilds.tests.conftest import guild_data
 from cs2_battle_bot.tests.conftest import client_with_api_key
 from guilds.models import Guild
+from matches.models import PlayerGuildStats
+from players.tests.conftest import player, players, discord_user_data, steam_user_data
 
 API_ENDPOINT = "/api/guilds/"
 
@@ -96,4 +98,27 @@ def test_update_guild(client_with_api_key, guild):
     assert response.data["lobby_channel"] == lobby_channel
     assert response.data["team1_channel"] == team1_channel
     assert response.data["team2_channel"] == team2_channel
-    assert response.data["owner"] is not None
\ No newline at end of file
+    assert response.data["owner"] is not None
+
+
+@pytest.mark.django_db
+def test_guild_leaderboard(client_with_api_key, guild, players):
+    PlayerGuildStats.objects.bulk_create(
+        [PlayerGuildStats(player=player, guild=guild, rating=1000 + i * 10) for i, player in enumerate(players)]
+    )
+    response = client_with_api_key.get(f"{API_ENDPOINT}{guild.guild_id}/leaderboard/", {"page_size": 4})
+    assert response.status_code == status.HTTP_200_OK
+    assert "count" not in response.data
+    ratings = [stats["rating"] for stats in response.data["results"]]
+    assert ratings == sorted(ratings, reverse=True)
+    assert ratings[0] == 1000 + (len(players) - 1) * 10
+    assert response.data["results"][0]["player"]["id"] == players[-1].id
+    next_page = client_with_api_key.get(response.data["next"])
+    assert next_page.status_code == status.HTTP_200_OK
+    assert next_page.data["results"][0]["rating"] < ratings[-1]
+
+
+@pytest.mark.django_db
+def test_guild_leaderboard_not_found(client_with_api_key):
+    response = client_with_api_key.get(f"{API_ENDPOINT}0/leaderboard/")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -1,8 +1,17 @@
 from drf_spectacular.utils import extend_schema
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from api.pagination import CursorOrPageNumberPagination, RatingCursorPagination
 from guilds.models import Guild
+from matches.models import PlayerGuildStats
+from matches.serializers import (
+    MatchmakingTicketResultSerializer,
+    MatchmakingTicketSerializer,
+    PlayerGuildStatsSerializer,
+)
+from matches.utils import join_matchmaking_queue, leave_matchmaking_queue
 from guilds.serializers import GuildSerializer, CreateGuildSerializer, \
     UpdateGuildSerializer
 from guilds.utils import create_guild
@@ -11,6 +20,7 @@ from guilds.utils import create_guild
 class GuildViewSet(viewsets.ModelViewSet):
     queryset = Guild.objects.all().order_by("created_at")
     serializer_class = GuildSerializer
+    pagination_class = CursorOrPageNumberPagination
     lookup_field = "guild_id"
 
     @extend_schema(
@@ -40,3 +50,25 @@ class GuildViewSet(viewsets.ModelViewSet):
             instance.team2_channel = data["team2_channel"]
         instance.save()
         return Response(self.get_serializer(instance).data)
+
+    @extend_schema(responses={200: PlayerGuildStatsSerializer(many=True)})
+    @action(detail=True, methods=["GET"], pagination_class=RatingCursorPagination)
+    def leaderboard(self, request, guild_id=None):
+        guild = self.get_object()
+        queryset = PlayerGuildStats.objects.filter(guild=guild).select_related(
+            "player__discord_user", "player__steam_user"
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = PlayerGuildStatsSerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(
+        request=MatchmakingTicketSerializer,
+        responses={200: MatchmakingTicketResultSerializer, 204: None}
+    )
+    @action(detail=True, methods=["POST", "DELETE"])
+    def queue(self, request, guild_id=None):
+        guild = self.get_object()
+        if request.method == "DELETE":
+            return leave_matchmaking_queue(request, guild)
+        return join_matchmaking_queue(request, guild)
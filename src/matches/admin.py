@@ -1,8 +1,10 @@
 from django.contrib import admin
 
-from matches.models import Map, Match, MapBan
+from matches.models import Map, Match, MapBan, MapResult, PlayerMapStats
 
 # Register your models here.
 admin.site.register(Match)
 admin.site.register(Map)
 admin.site.register(MapBan)
+admin.site.register(MapResult)
+admin.site.register(PlayerMapStats)
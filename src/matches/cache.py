@@ -0,0 +1,131 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+MATCH_CONFIG_VERSION_CACHE_KEY = "match_config_version:{}"
+MATCH_CONFIG_CACHE_KEY = "match_config:{}:{}"
+
+
+def get_match_config_version_cache_key(match_id: int) -> str:
+    return MATCH_CONFIG_VERSION_CACHE_KEY.format(match_id)
+
+
+def get_match_config_version(match_id: int) -> int:
+    """
+    Get the version of a match config.
+
+    A missing counter starts from the current time, so configs cached under an evicted counter are never reused.
+
+    Args:
+    -----
+        match_id (int): Match ID.
+
+    Returns:
+    --------
+        int: Config version.
+    """
+    key = get_match_config_version_cache_key(match_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_match_config_version(match_id: int) -> int:
+    """Async variant of ``get_match_config_version``."""
+    key = get_match_config_version_cache_key(match_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_match_configs_versions(matches_ids) -> None:
+    """
+    Invalidate the cached configs of matches.
+
+    Args:
+    -----
+        matches_ids (Iterable[int]): Match IDs.
+
+    Returns:
+    --------
+        None
+    """
+    for match_id in set(matches_ids):
+        key = get_match_config_version_cache_key(match_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def get_cached_match_config(match_id: int) -> tuple[int, dict | None]:
+    """
+    Get the cached config of a match.
+
+    Args:
+    -----
+        match_id (int): Match ID.
+
+    Returns:
+    --------
+        tuple[int, dict | None]: Config version and the cached entry (``data``, ``etag`` and ``author_id``),
+        the entry is None if the current version is not cached.
+    """
+    version = get_match_config_version(match_id)
+    return version, cache.get(MATCH_CONFIG_CACHE_KEY.format(match_id, version))
+
+
+async def aget_cached_match_config(match_id: int) -> tuple[int, dict | None]:
+    """Async variant of ``get_cached_match_config``."""
+    version = await aget_match_config_version(match_id)
+    return version, await cache.aget(MATCH_CONFIG_CACHE_KEY.format(match_id, version))
+
+
+def set_cached_match_config(match_id: int, version: int, data: dict, author_id: str | None) -> dict:
+    """
+    Cache the config of a match under its version.
+
+    Args:
+    -----
+        match_id (int): Match ID.
+        version (int): Config version the data was built for.
+        data (dict): Serialized config.
+        author_id (str | None): Match author ID, used to check permissions without loading the match.
+
+    Returns:
+    --------
+        dict: Cached entry.
+    """
+    content = json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+    entry = {
+        "data": data,
+        "etag": f'"{hashlib.sha1(content).hexdigest()}"',
+        "author_id": author_id,
+    }
+    cache.set(MATCH_CONFIG_CACHE_KEY.format(match_id, version), entry, timeout=settings.MATCH_CONFIG_CACHE_TIMEOUT)
+    return entry
+
+
+MATCH_GUILD_CACHE_KEY = "match_guild:{}"
+# Cached for matches without a guild, so they are not looked up on every webhook.
+MATCH_GUILD_NOT_SET = ""
+
+
+def get_match_guild_cache_key(match_id) -> str:
+    return MATCH_GUILD_CACHE_KEY.format(match_id)
+
+
+def delete_cached_match_guild_id(match_id) -> None:
+    cache.delete(get_match_guild_cache_key(match_id))
+
+
+def delete_cached_matches_guild_ids(matches_ids) -> None:
+    if matches_ids:
+        cache.delete_many([get_match_guild_cache_key(match_id) for match_id in matches_ids])
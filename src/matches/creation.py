@@ -0,0 +1,116 @@
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+
+from guilds.models import Guild
+from matches.models import Match, MatchType
+from matches.ratings import get_players_ratings
+from players.models import DiscordUser, Player
+from players.utils import PartyError, create_default_teams, resolve_parties, resolve_players
+from servers.models import Server
+
+DEFAULT_MAP_SIDES = ["knife", "team1_ct", "team2_ct"]
+
+
+class MatchCreationError(Exception):
+    """Match rejected, ``message`` and ``details`` are returned to the user with ``status``."""
+
+    def __init__(self, message: str, status: int = 400, **details) -> None:
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.details = details
+
+    @property
+    def data(self) -> dict:
+        return {"message": self.message, **self.details}
+
+
+def create_new_match(
+    discord_users_ids: list[str],
+    author_id: str,
+    guild_id: str,
+    base_url: str,
+    server_id: str | None = None,
+    match_type: str = MatchType.BO1,
+    clinch_series: bool = False,
+    map_sides: list[str] | None = None,
+    cvars: dict | None = None,
+    maplist: list[str] | None = None,
+    parties: list[list[str]] | None = None,
+) -> Match:
+    """
+    Create a match of discord users, divided into rating balanced teams keeping parties together.
+
+    Args:
+    -----
+        discord_users_ids (list[str]): Discord user IDs of the players.
+        author_id (str): Discord user ID of the author.
+        guild_id (str): Guild ID.
+        base_url (str): Scheme and host of the API, used in the webhook URL given to the server.
+        server_id (str | None): Server ID.
+        match_type (str): Match type.
+        clinch_series (bool): Whether the series ends once a team can't be caught up.
+        map_sides (list[str] | None): Sides of every map, knife rounds first by default.
+        cvars (dict | None): Extra cvars of the match config.
+        maplist (list[str] | None): Map tags, the active maps by default.
+        parties (list[list[str]] | None): Discord user IDs of players who play in the same team.
+
+    Returns:
+    --------
+        Match: Created match.
+
+    Raises:
+    -------
+        MatchCreationError: If the match can't be created.
+        Http404: If the server or the guild does not exist.
+    """
+    if match_type not in MatchType.values:
+        raise MatchCreationError(f"Invalid match type {match_type}")
+    discord_users_ids = list(set(discord_users_ids))
+    if len(discord_users_ids) < 2:
+        raise MatchCreationError("At least 2 players are required")
+    server = None
+    if server_id:
+        server = get_object_or_404(Server, pk=server_id)
+        if not server.is_online():
+            raise MatchCreationError("Server is not online. Cannot create match")
+        if not Match.objects.check_server_is_available_for_match(server):
+            raise MatchCreationError("Server is not available for a match. Another match is already running")
+    resolved_players = resolve_players(discord_users_ids)
+    if resolved_players.missing:
+        raise MatchCreationError("Discord users not found", status=404, users=sorted(resolved_players.missing))
+    author = DiscordUser.objects.filter(user_id=author_id).first()
+    if author is None:
+        raise MatchCreationError("Author not found", status=404, user_id=author_id)
+    if resolved_players.unlinked:
+        discord_user_id, player = next(iter(resolved_players.unlinked.items()))
+        raise MatchCreationError(
+            f"Discord user {player.discord_user.username} has no connected player",
+            status=404,
+            user_id=discord_user_id,
+        )
+    try:
+        parties = resolve_parties(parties or [], resolved_players.found)
+    except PartyError as e:
+        raise MatchCreationError(e.message, users=e.users) from e
+    players_list: list[Player] = list(resolved_players.found.values())
+
+    guild = get_object_or_404(Guild, pk=guild_id)
+    ratings = get_players_ratings(guild.pk, [player.id for player in players_list])
+    team1, team2 = create_default_teams("Team 1", "Team 2", players_list, ratings, parties)
+    new_match: Match = Match.objects.create_match(
+        team1=team1,
+        team2=team2,
+        author=author,
+        type=match_type,
+        clinch_series=clinch_series,
+        map_sides=DEFAULT_MAP_SIDES if map_sides is None else map_sides,
+        server=server,
+        cvars=cvars,
+        guild=guild,
+        maplist=maplist,
+    )
+    new_match.create_webhook_cvars(
+        webhook_url=f"{base_url.rstrip('/')}{reverse('match-webhook', args=[new_match.pk])}"
+    )
+    return new_match
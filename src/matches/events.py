@@ -0,0 +1,314 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import redis
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from api.aredis import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+
+class EventsMode:
+    PUBSUB = "pubsub"
+    STREAM = "stream"
+    BOTH = "both"
+
+
+EVENT_STREAM_KEY = "event_stream.{}"
+MATCH_EVENT_STREAM_KEY = "match_event_stream.{}"
+
+
+def get_event_stream_key(guild_id: str) -> str:
+    return EVENT_STREAM_KEY.format(guild_id)
+
+
+def get_match_event_stream_key(match_id: str) -> str:
+    return MATCH_EVENT_STREAM_KEY.format(match_id)
+
+
+class EventPublisher:
+    """
+    Publisher of match events backed by a shared Redis connection pool.
+
+    Events are appended to a bounded buffer and published in a single pipeline. When Redis is unavailable
+    they stay in the buffer (the oldest are dropped once it is full) and are sent with the next flush.
+
+    Depending on the mode, events on the ``event.{guild_id}.{event}`` channels are sent with PUBLISH
+    and/or appended to the capped ``event_stream.{guild_id}`` stream, which consumers can read through
+    consumer groups and replay after downtime. Events of a match are also appended to the
+    ``match_event_stream.{match_id}`` stream, which expires ``match_stream_ttl`` seconds after its last
+    event, so replaying a match reads only its own events.
+
+    Attributes
+    ----------
+        url (str): Redis URL.
+        timeout (float): Socket timeout in seconds.
+        client (redis.Redis): Redis client using the shared connection pool.
+        buffer (deque): Events waiting to be published.
+        linger (float): Seconds events wait to be batched with others, 0 publishes immediately.
+        mode (str): One of EventsMode.
+        stream_maxlen (int): Approximate maximum length of a guild or match stream.
+        match_stream_ttl (int): Seconds a match stream is kept after its last event.
+
+    Methods
+    -------
+        publish: Publish an event.
+        apublish: Publish an event with the async Redis client of the running event loop.
+        flush: Publish all buffered events.
+        create_consumer_group: Create a consumer group on a guild stream.
+        read_group: Read new events of a guild stream as a consumer group member.
+        ack: Acknowledge events read by a consumer group.
+        read_match_events: Read events of a match stored in its match stream.
+    """
+
+    def __init__(
+            self,
+            url: str,
+            buffer_size: int = 1000,
+            linger: float = 0,
+            timeout: float = 1,
+            mode: str = EventsMode.PUBSUB,
+            stream_maxlen: int = 10000,
+            match_stream_ttl: int = 7 * 24 * 60 * 60,
+    ) -> None:
+        """Initialize the EventPublisher."""
+        self.url = url
+        self.timeout = timeout
+        self.client = redis.Redis(
+            connection_pool=redis.ConnectionPool.from_url(
+                url, socket_timeout=timeout, socket_connect_timeout=timeout
+            )
+        )
+        self.buffer: deque[tuple[str, str, str | None]] = deque(maxlen=buffer_size)
+        self.linger = linger
+        self.mode = mode
+        self.stream_maxlen = stream_maxlen
+        self.match_stream_ttl = match_stream_ttl
+        self._lock = threading.Lock()
+        self._flusher: threading.Thread | None = None
+
+    def publish(self, channel: str, data: dict | None, match_id: str | None = None) -> bool:
+        """
+        Publish an event.
+
+        Args:
+        -----
+            channel (str): Channel name, ``event.{guild_id}.{event}``.
+            data (dict | None): Event data.
+            match_id (str | None): Match the event is about, stored with stream entries for replays.
+
+        Returns:
+        --------
+            bool: True if the event was published or queued for the next batch, False if Redis is unavailable.
+        """
+        with self._lock:
+            self.buffer.append((channel, json.dumps(data), None if match_id is None else str(match_id)))
+        if self.linger:
+            self._start_flusher()
+            return True
+        return self.flush()
+
+    async def apublish(self, channel: str, data: dict | None, match_id: str | None = None) -> bool:
+        """
+        Publish an event without blocking the event loop.
+
+        Batched events, and events published while older ones wait in the buffer, go through the buffer
+        to keep their order. Without ``USE_ASYNC_CLIENTS`` the event is published with the shared sync pool
+        in a thread.
+
+        Args:
+        -----
+            channel (str): Channel name, ``event.{guild_id}.{event}``.
+            data (dict | None): Event data.
+            match_id (str | None): Match the event is about, stored with stream entries for replays.
+
+        Returns:
+        --------
+            bool: True if the event was published or queued for the next batch, False if Redis is unavailable.
+        """
+        if self.linger or self.buffer or not settings.USE_ASYNC_CLIENTS:
+            return await sync_to_async(self.publish, thread_sensitive=False)(channel, data, match_id=match_id)
+        event = (channel, json.dumps(data), None if match_id is None else str(match_id))
+        pipeline = self.get_async_client().pipeline(transaction=False)
+        self._queue_commands(pipeline, [event])
+        try:
+            await pipeline.execute()
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            with self._lock:
+                self.buffer.append(event)
+            logger.warning("Error publishing events, %s buffered: %s", len(self.buffer), e)
+            return False
+        return True
+
+    def get_async_client(self):
+        return get_async_redis(self.url, self.timeout)
+
+    def flush(self) -> bool:
+        """
+        Publish all buffered events in one pipeline.
+
+        Returns:
+        --------
+            bool: True if the buffer is empty afterwards, False if Redis is unavailable.
+        """
+        with self._lock:
+            if not self.buffer:
+                return True
+            pipeline = self.client.pipeline(transaction=False)
+            self._queue_commands(pipeline, self.buffer)
+            try:
+                pipeline.execute()
+            except (redis.ConnectionError, redis.TimeoutError) as e:
+                logger.warning("Error publishing events, %s buffered: %s", len(self.buffer), e)
+                return False
+            self.buffer.clear()
+            return True
+
+    def create_consumer_group(self, guild_id: str, group: str, start_id: str = "0") -> bool:
+        """
+        Create a consumer group on a guild stream.
+
+        Args:
+        -----
+            guild_id (str): Discord guild ID.
+            group (str): Consumer group name.
+            start_id (str): ID of the last entry considered delivered, "0" delivers the whole stream.
+
+        Returns:
+        --------
+            bool: True if the group was created, False if it already exists.
+        """
+        try:
+            self.client.xgroup_create(get_event_stream_key(guild_id), group, id=start_id, mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+            return False
+        return True
+
+    def read_group(self, guild_id: str, group: str, consumer: str, count: int = 100, block: int | None = None) -> list[dict]:
+        """
+        Read new events of a guild stream as a consumer group member.
+
+        Args:
+        -----
+            guild_id (str): Discord guild ID.
+            group (str): Consumer group name.
+            consumer (str): Consumer name.
+            count (int): Maximum number of events.
+            block (int | None): Milliseconds to wait for events, None returns immediately.
+
+        Returns:
+        --------
+            list[dict]: Events, to be acknowledged with ack().
+        """
+        response = self.client.xreadgroup(
+            group, consumer, {get_event_stream_key(guild_id): ">"}, count=count, block=block
+        )
+        return [self._format_entry(entry) for _, entries in response for entry in entries]
+
+    def ack(self, guild_id: str, group: str, *events_ids: str) -> int:
+        """
+        Acknowledge events read by a consumer group.
+
+        Args:
+        -----
+            guild_id (str): Discord guild ID.
+            group (str): Consumer group name.
+            *events_ids (str): Stream IDs of the events.
+
+        Returns:
+        --------
+            int: Number of acknowledged events.
+        """
+        return self.client.xack(get_event_stream_key(guild_id), group, *events_ids)
+
+    def read_match_events(self, match_id: str, since: str | None = None, count: int = 100) -> list[dict]:
+        """
+        Read events of a match stored in its match stream.
+
+        Args:
+        -----
+            match_id (str): Match ID.
+            since (str | None): Match stream ID of the last event already seen, None reads from the beginning.
+            count (int): Maximum number of events.
+
+        Returns:
+        --------
+            list[dict]: Events, oldest first.
+        """
+        entries = self.client.xrange(
+            get_match_event_stream_key(match_id), min=f"({since}" if since else "-", max="+", count=count
+        )
+        return [self._format_entry(entry) for entry in entries]
+
+    @staticmethod
+    def _format_entry(entry) -> dict:
+        entry_id, fields = entry
+        return {
+            "id": entry_id.decode(),
+            "event": fields[b"event"].decode(),
+            "match_id": fields[b"match_id"].decode() or None,
+            "data": json.loads(fields[b"data"]),
+        }
+
+    def _queue_commands(self, pipeline, events) -> None:
+        for channel, payload, match_id in events:
+            if self.mode in (EventsMode.PUBSUB, EventsMode.BOTH):
+                pipeline.publish(channel, payload)
+            if self.mode in (EventsMode.STREAM, EventsMode.BOTH):
+                _, guild_id, event = channel.split(".", 2)
+                fields = {"event": event, "match_id": match_id or "", "data": payload}
+                pipeline.xadd(
+                    get_event_stream_key(guild_id), fields, maxlen=self.stream_maxlen, approximate=True
+                )
+                if match_id:
+                    match_stream_key = get_match_event_stream_key(match_id)
+                    pipeline.xadd(match_stream_key, fields, maxlen=self.stream_maxlen, approximate=True)
+                    pipeline.expire(match_stream_key, self.match_stream_ttl)
+
+    def _start_flusher(self) -> None:
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_forever, daemon=True)
+                self._flusher.start()
+
+    def _flush_forever(self) -> None:
+        while True:
+            time.sleep(self.linger)
+            self.flush()
+
+
+_publisher: EventPublisher | None = None
+_publisher_pid: int | None = None
+
+
+def get_event_publisher() -> EventPublisher:
+    """
+    Get the process-wide event publisher.
+
+    Returns:
+    --------
+        EventPublisher: The event publisher.
+    """
+    global _publisher, _publisher_pid
+    if _publisher is None or _publisher_pid != os.getpid():
+        _publisher = EventPublisher(
+            settings.EVENTS_REDIS_URL,
+            buffer_size=settings.EVENTS_BUFFER_SIZE,
+            linger=settings.EVENTS_BATCH_LINGER,
+            timeout=settings.EVENTS_REDIS_TIMEOUT,
+            mode=settings.EVENTS_MODE,
+            stream_maxlen=settings.EVENTS_STREAM_MAXLEN,
+            match_stream_ttl=settings.EVENTS_MATCH_STREAM_TTL,
+        )
+        _publisher_pid = os.getpid()
+    return _publisher
@@ -0,0 +1,94 @@
+import asyncio
+import statistics
+import time
+from unittest import mock
+
+import httpx
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+
+from guilds.models import Guild
+from matches.events import EventPublisher
+from matches.models import Match
+from matches.serializers import MatchEventEnum
+
+UserModel = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Compare the concurrent webhook capacity of a sync WSGI worker and an ASGI worker"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Requests per measurement")
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50], help="Requests in flight")
+        parser.add_argument("--latency", type=float, default=0.02, help="Simulated seconds of a Redis round trip")
+
+    def handle(self, *args, **options):
+        latency = options["latency"]
+
+        async def apublish(*args, **kwargs):
+            await asyncio.sleep(latency)
+            return True
+
+        owner = UserModel.objects.create(username=f"benchmark{time.time_ns()}")
+        guild = Guild.objects.create(name="benchmark", guild_id=str(time.time_ns()), owner=owner)
+        match = Match.objects.create(guild=guild)
+        url = f"/api/matches/{match.pk}/webhook/"
+        payload = {"matchid": str(match.pk), "event": MatchEventEnum.ROUND_END.value, "round_number": 1}
+        headers = {"Authorization": f"Bearer {owner.get_token()}"}
+        try:
+            with mock.patch.object(EventPublisher, "apublish", apublish), mock.patch("builtins.print"):
+                self.stdout.write(f"Webhook with {latency * 1_000:.0f} ms of Redis latency per request")
+                self.report("WSGI sync worker", 1, self.measure_wsgi(url, payload, headers, options["requests"]))
+                for concurrency in options["concurrency"]:
+                    durations = asyncio.run(self.measure_asgi(url, payload, headers, options["requests"], concurrency))
+                    self.report("ASGI worker", concurrency, durations)
+        finally:
+            match.delete()
+            guild.delete()
+            owner.delete()
+            cache.clear()
+
+    @staticmethod
+    def measure_wsgi(url: str, payload: dict, headers: dict, requests: int) -> tuple[float, list[float]]:
+        # A sync worker serves one request at a time, whatever the number of waiting clients
+        with httpx.Client(transport=httpx.WSGITransport(app=get_wsgi_application()), base_url="http://testserver") as client:
+            durations = []
+            started_at = time.perf_counter()
+            for _ in range(requests):
+                request_started_at = time.perf_counter()
+                response = client.post(url, json=payload, headers=headers)
+                assert response.status_code == 200, response.text
+                durations.append(time.perf_counter() - request_started_at)
+            return time.perf_counter() - started_at, durations
+
+    @staticmethod
+    async def measure_asgi(
+        url: str, payload: dict, headers: dict, requests: int, concurrency: int
+    ) -> tuple[float, list[float]]:
+        transport = httpx.ASGITransport(app=get_asgi_application())
+        semaphore = asyncio.Semaphore(concurrency)
+        durations = []
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            async def post():
+                async with semaphore:
+                    request_started_at = time.perf_counter()
+                    response = await client.post(url, json=payload, headers=headers)
+                    assert response.status_code == 200, response.text
+                    durations.append(time.perf_counter() - request_started_at)
+
+            started_at = time.perf_counter()
+            await asyncio.gather(*[post() for _ in range(requests)])
+            return time.perf_counter() - started_at, durations
+
+    def report(self, name: str, concurrency: int, measurement: tuple[float, list[float]]) -> None:
+        elapsed, durations = measurement
+        durations.sort()
+        self.stdout.write(
+            f"  {name:<18} concurrency {concurrency:>3}  {len(durations) / elapsed:8.0f} req/s  "
+            f"p50 {statistics.median(durations) * 1_000:7.1f} ms  "
+            f"p99 {durations[int(len(durations) * 0.99) - 1] * 1_000:7.1f} ms"
+        )
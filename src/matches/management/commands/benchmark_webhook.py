@@ -0,0 +1,144 @@
+import copy
+import random
+import time
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from guilds.models import Guild
+from matches.models import Match
+from matches.serializers import (
+    MatchEventEnum,
+    MatchEventGoingLiveSerializer,
+    MatchEventMapResultSerializer,
+    MatchEventSerializer,
+)
+from matches.views import MatchViewSet
+from matches.webhook import validate_webhook_event
+
+UserModel = get_user_model()
+
+STEAMID64_BASE = 76561197960265728
+PLAYER_STATS = [
+    "kills", "deaths", "assists", "damage", "enemy5ks", "enemy4ks", "enemy3ks", "enemy2ks", "utility_count",
+    "utility_damage", "flash_count", "flash_successes", "shots_fired_total", "shots_on_target_total", "head_shot_kills",
+]
+
+
+def get_map_result_payload(match_id: str) -> dict:
+    def team(name: str, offset: int) -> dict:
+        return {
+            "name": name,
+            "series_score": 0,
+            "score": 13,
+            "score_ct": 7,
+            "score_t": 6,
+            "players": [
+                {
+                    "steamid": str(STEAMID64_BASE + offset + i),
+                    "name": f"player{offset + i}",
+                    "stats": {stat: random.randint(0, 5_000) for stat in PLAYER_STATS},
+                }
+                for i in range(5)
+            ],
+        }
+
+    return {
+        "matchid": match_id,
+        "event": MatchEventEnum.MAP_RESULT.value,
+        "map_number": 0,
+        "team1": team("team1", 0),
+        "team2": team("team2", 5),
+        "winner": {"side": "ct", "team": "team1"},
+    }
+
+
+def get_round_end_payload(match_id: str) -> dict:
+    return {
+        "matchid": match_id,
+        "event": MatchEventEnum.ROUND_END.value,
+        "map_number": 0,
+        "round_number": 12,
+        "round_time": 95000,
+        "reason": 9,
+        "winner": {"side": "ct", "team": "team1"},
+        "team1": {"name": "team1", "score": 7},
+        "team2": {"name": "team2", "score": 5},
+    }
+
+
+def get_going_live_payload(match_id: str) -> dict:
+    return {"matchid": match_id, "event": MatchEventEnum.GOING_LIVE.value, "map_number": 0}
+
+
+class Command(BaseCommand):
+    help = "Measure webhook validation and ingestion throughput per worker"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=2_000, help="Events per measurement")
+        parser.add_argument("--publish", action="store_true", help="Publish events to Redis instead of discarding them")
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+        payloads = {
+            MatchEventEnum.ROUND_END: (get_round_end_payload("1"), None),
+            MatchEventEnum.MAP_RESULT: (get_map_result_payload("1"), MatchEventMapResultSerializer),
+            MatchEventEnum.GOING_LIVE: (get_going_live_payload("1"), MatchEventGoingLiveSerializer),
+        }
+        self.stdout.write("Validation")
+        for event, (payload, serializer_class) in payloads.items():
+            self.report(f"{event.value} serializers", repeat, lambda: self.validate_with_serializers(
+                payload, serializer_class
+            ))
+            self.report(f"{event.value} precompiled", repeat, lambda: validate_webhook_event(payload))
+
+        with transaction.atomic():
+            owner = UserModel.objects.create(username=f"benchmark{time.time_ns()}")
+            guild = Guild.objects.create(name="benchmark", guild_id=str(time.time_ns()), owner=owner)
+            match = Match.objects.create(guild=guild)
+            self.stdout.write("Webhook view")
+            self.measure_view(match, owner, repeat, options["publish"])
+            transaction.set_rollback(True)
+        cache.clear()
+
+    def measure_view(self, match: Match, user, repeat: int, publish: bool) -> None:
+        factory = APIRequestFactory()
+        view = MatchViewSet.as_view({"post": "webhook"}, permission_classes=[], authentication_classes=[])
+        url = f"/api/matches/{match.pk}/webhook/"
+        payloads = {
+            MatchEventEnum.ROUND_END: get_round_end_payload(str(match.pk)),
+            MatchEventEnum.MAP_RESULT: get_map_result_payload(str(match.pk)),
+            MatchEventEnum.GOING_LIVE: get_going_live_payload(str(match.pk)),
+        }
+        patcher = mock.patch("matches.utils.apublish_event") if not publish else mock.MagicMock()
+        with patcher, mock.patch("builtins.print"):
+            for event, payload in payloads.items():
+                def post():
+                    request = factory.post(url, copy.deepcopy(payload), format="json")
+                    force_authenticate(request, user)
+                    response = async_to_sync(view)(request, pk=str(match.pk))
+                    assert response.status_code == 200, response.data
+
+                self.report(f"{event.value}", repeat, post)
+
+    @staticmethod
+    def validate_with_serializers(payload: dict, serializer_class) -> dict:
+        serializer = MatchEventSerializer(data=payload)
+        serializer.is_valid(raise_exception=True)
+        if serializer_class is None:
+            return payload
+        event_serializer = serializer_class(data=payload)
+        event_serializer.is_valid(raise_exception=True)
+        return event_serializer.validated_data
+
+    def report(self, name: str, repeat: int, run) -> None:
+        started_at = time.perf_counter()
+        for _ in range(repeat):
+            run()
+        elapsed = time.perf_counter() - started_at
+        self.stdout.write(f"  {name:<26} {repeat / elapsed:10.0f} events/s  {elapsed / repeat * 1_000_000:8.1f} us/event")
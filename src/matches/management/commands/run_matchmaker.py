@@ -0,0 +1,26 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from matches.matchmaking import run_matchmaking
+
+
+class Command(BaseCommand):
+    help = "Create matches from the matchmaking queues, run a single matcher per Redis database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run a single matchmaking pass and exit")
+        parser.add_argument(
+            "--interval", type=float, default=settings.MATCHMAKING_INTERVAL, help="Seconds between passes"
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Matching queued players")
+        while True:
+            started_at = time.monotonic()
+            for match in run_matchmaking():
+                self.stdout.write(f"Match {match.pk} created on server {match.server_id}")
+            if options["once"]:
+                return
+            time.sleep(max(options["interval"] - (time.monotonic() - started_at), 0))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from matches.tasks import pop_job, run_job
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs, e.g. loading matches into servers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--burst", action="store_true", help="Exit when the queue is empty")
+
+    def handle(self, *args, **options):
+        self.stdout.write("Waiting for jobs")
+        while True:
+            payload = pop_job(timeout=1 if options["burst"] else 0)
+            if payload is None:
+                if options["burst"]:
+                    return
+                continue
+            # Like a request, a job starts and ends without the connections the database may have closed
+            close_old_connections()
+            try:
+                job = run_job(payload)
+            finally:
+                close_old_connections()
+            self.stdout.write(f"Job {job['id']} ({job['name']}) {job['status']}")
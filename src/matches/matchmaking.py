@@ -0,0 +1,376 @@
+import json
+import logging
+import time
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db.models import Q
+from django_redis import get_redis_connection
+
+from guilds.models import Guild
+from matches.creation import MatchCreationError, create_new_match
+from matches.models import Match
+from matches.ratings import get_players_ratings
+from players.models import Player
+from players.utils import DEFAULT_RATING
+from servers.models import Server
+
+logger = logging.getLogger(__name__)
+
+MATCHMAKING_QUEUES_KEY = "matchmaking.queues"
+MATCHMAKING_TICKETS_KEY = "matchmaking.tickets"
+MATCHMAKING_QUEUE_KEY = "matchmaking.{}.{}"
+
+
+class QueueError(Exception):
+    """Ticket rejected, ``message`` is returned to the user with ``status``."""
+
+    def __init__(self, message: str, status: int = 400) -> None:
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+class Ticket(NamedTuple):
+    """
+    Player waiting in a matchmaking queue.
+
+    Attributes
+    ----------
+        player_id (str): Player ID.
+        discord_user_id (str): Discord user ID of the player, used to create the match.
+        rating (float): Guild rating of the player when the ticket was created.
+        enqueued_at (float): Unix timestamp of the ticket creation.
+    """
+    player_id: str
+    discord_user_id: str
+    rating: float
+    enqueued_at: float
+
+
+def get_queue_name(guild_id: str, players_per_team: int) -> str:
+    return MATCHMAKING_QUEUE_KEY.format(guild_id, players_per_team)
+
+
+class MatchmakingQueue:
+    """
+    Matchmaking queue of a guild and team size backed by Redis sorted sets.
+
+    Tickets are stored in ``{name}.ratings`` scored by rating and ``{name}.waiting`` scored by the time
+    they were created, so joining, leaving and finding the players around a rating are O(log n). The
+    ``matchmaking.tickets`` hash maps every queued player to their queue and discord user, a player
+    waits in one queue at a time.
+
+    Attributes
+    ----------
+        client (redis.Redis): Redis client.
+        guild_id (str): Guild ID.
+        players_per_team (int): Players in each team of the created matches.
+        name (str): Prefix of the queue keys.
+
+    Methods
+    -------
+        enqueue: Add a player to the queue.
+        dequeue: Remove a player from the queue.
+        size: Count the tickets of the queue.
+        find_groups: Find groups of tickets with close ratings.
+        pop: Remove a group of tickets from the queue.
+        requeue: Add popped tickets back with their original wait time.
+    """
+
+    def __init__(self, guild_id: str, players_per_team: int, client=None):
+        self.client = client or get_redis_connection("default")
+        self.guild_id = guild_id
+        self.players_per_team = players_per_team
+        self.name = get_queue_name(guild_id, players_per_team)
+        self.ratings_key = f"{self.name}.ratings"
+        self.waiting_key = f"{self.name}.waiting"
+
+    @classmethod
+    def from_name(cls, name: str, client=None) -> "MatchmakingQueue":
+        _, guild_id, players_per_team = name.rsplit(".", 2)
+        return cls(guild_id, int(players_per_team), client=client)
+
+    @property
+    def group_size(self) -> int:
+        return self.players_per_team * 2
+
+    def enqueue(self, player: Player, rating: float, enqueued_at: float | None = None) -> Ticket:
+        """
+        Add a player to the queue, a player already waiting in it keeps their place.
+
+        Args:
+        -----
+            player (Player): Player with a discord user.
+            rating (float): Guild rating of the player.
+            enqueued_at (float | None): Unix timestamp of the ticket, now by default.
+
+        Returns:
+        --------
+            Ticket: Created or existing ticket.
+
+        Raises:
+        -------
+            QueueError: The player is waiting in another queue.
+        """
+        enqueued_at = time.time() if enqueued_at is None else enqueued_at
+        ticket = {"queue": self.name, "discord_user_id": player.discord_user.user_id}
+        if not self.client.hsetnx(MATCHMAKING_TICKETS_KEY, player.id, json.dumps(ticket)):
+            existing = json.loads(self.client.hget(MATCHMAKING_TICKETS_KEY, player.id))
+            if existing["queue"] != self.name:
+                raise QueueError("Player is already waiting in another queue", status=409)
+        pipeline = self.client.pipeline()
+        pipeline.zadd(self.ratings_key, {player.id: rating}, nx=True)
+        pipeline.zadd(self.waiting_key, {player.id: enqueued_at}, nx=True)
+        pipeline.sadd(MATCHMAKING_QUEUES_KEY, self.name)
+        pipeline.zscore(self.ratings_key, player.id)
+        pipeline.zscore(self.waiting_key, player.id)
+        *_, rating, enqueued_at = pipeline.execute()
+        return Ticket(player.id, player.discord_user.user_id, float(rating), float(enqueued_at))
+
+    def dequeue(self, player_id: str) -> bool:
+        """
+        Remove a player from the queue.
+
+        Args:
+        -----
+            player_id (str): Player ID.
+
+        Returns:
+        --------
+            bool: True if the player was waiting in the queue.
+        """
+        ticket = self.client.hget(MATCHMAKING_TICKETS_KEY, player_id)
+        if ticket is None or json.loads(ticket)["queue"] != self.name:
+            return False
+        pipeline = self.client.pipeline()
+        pipeline.zrem(self.ratings_key, player_id)
+        pipeline.zrem(self.waiting_key, player_id)
+        pipeline.hdel(MATCHMAKING_TICKETS_KEY, player_id)
+        return bool(pipeline.execute()[0])
+
+    def size(self) -> int:
+        return self.client.zcard(self.waiting_key)
+
+    def position(self, player_id: str) -> int | None:
+        return self.client.zrank(self.waiting_key, player_id)
+
+    def get_rating_window(self, waited: float) -> float:
+        return settings.MATCHMAKING_RATING_WINDOW + settings.MATCHMAKING_RATING_WINDOW_GROWTH * max(waited, 0)
+
+    def get_neighbours(
+        self, player_id: str, rating: float, window: float, excluded: set[str]
+    ) -> list[tuple[str, float]]:
+        """Get the players closest to a rating within the window, ``excluded`` players are left out."""
+        count = self.group_size + len(excluded)
+        pipeline = self.client.pipeline()
+        pipeline.zrevrangebyscore(self.ratings_key, rating, rating - window, start=0, num=count, withscores=True)
+        pipeline.zrangebyscore(self.ratings_key, rating, rating + window, start=0, num=count, withscores=True)
+        below, above = pipeline.execute()
+        neighbours = {}
+        for member, score in [*below, *above]:
+            member = member.decode() if isinstance(member, bytes) else member
+            if member != player_id and member not in excluded:
+                neighbours[member] = score
+        return sorted(neighbours.items(), key=lambda item: abs(item[1] - rating))
+
+    def find_groups(self, now: float | None = None, limit: int | None = None) -> list[list[str]]:
+        """
+        Find groups of ``players_per_team * 2`` players with close ratings.
+
+        The longest waiting players are matched first, every one with the players closest to their
+        rating within a window growing with the time they waited.
+
+        Args:
+        -----
+            now (float | None): Unix timestamp used to compute wait times, now by default.
+            limit (int | None): Longest waiting tickets tried as the first player of a group.
+
+        Returns:
+        --------
+            list[list[str]]: Player IDs of every group, the longest waiting player first.
+        """
+        now = time.time() if now is None else now
+        limit = settings.MATCHMAKING_SCAN_LIMIT if limit is None else limit
+        if self.size() < self.group_size:
+            return []
+        oldest = [
+            (member.decode() if isinstance(member, bytes) else member, enqueued_at)
+            for member, enqueued_at in self.client.zrange(self.waiting_key, 0, limit - 1, withscores=True)
+        ]
+        ratings = self.client.zmscore(self.ratings_key, [player_id for player_id, _ in oldest]) if oldest else []
+        groups, grouped = [], set()
+        for (player_id, enqueued_at), rating in zip(oldest, ratings):
+            if player_id in grouped or rating is None:
+                continue
+            window = self.get_rating_window(now - enqueued_at)
+            neighbours = [neighbour for neighbour, _ in self.get_neighbours(player_id, rating, window, grouped)]
+            if len(neighbours) < self.group_size - 1:
+                continue
+            group = [player_id, *neighbours[:self.group_size - 1]]
+            grouped.update(group)
+            groups.append(group)
+        return groups
+
+    def pop(self, players_ids: list[str]) -> list[Ticket]:
+        """
+        Remove a group of tickets from the queue.
+
+        Args:
+        -----
+            players_ids (list[str]): Player IDs.
+
+        Returns:
+        --------
+            list[Ticket]: Removed tickets, players who left the queue in the meantime are missing.
+        """
+        pipeline = self.client.pipeline()
+        pipeline.zmscore(self.ratings_key, players_ids)
+        pipeline.zmscore(self.waiting_key, players_ids)
+        pipeline.hmget(MATCHMAKING_TICKETS_KEY, players_ids)
+        pipeline.zrem(self.ratings_key, *players_ids)
+        pipeline.zrem(self.waiting_key, *players_ids)
+        pipeline.hdel(MATCHMAKING_TICKETS_KEY, *players_ids)
+        ratings, enqueued_ats, tickets, *_ = pipeline.execute()
+        return [
+            Ticket(player_id, json.loads(ticket)["discord_user_id"], rating, enqueued_at)
+            for player_id, rating, enqueued_at, ticket in zip(players_ids, ratings, enqueued_ats, tickets)
+            if rating is not None and ticket is not None
+        ]
+
+    def requeue(self, tickets: list[Ticket]) -> None:
+        """
+        Add popped tickets back to the queue with their original wait time.
+
+        Args:
+        -----
+            tickets (list[Ticket]): Popped tickets.
+
+        Returns:
+        --------
+            None
+        """
+        if not tickets:
+            return
+        pipeline = self.client.pipeline()
+        for ticket in tickets:
+            pipeline.hsetnx(
+                MATCHMAKING_TICKETS_KEY,
+                ticket.player_id,
+                json.dumps({"queue": self.name, "discord_user_id": ticket.discord_user_id}),
+            )
+            pipeline.zadd(self.ratings_key, {ticket.player_id: ticket.rating}, nx=True)
+            pipeline.zadd(self.waiting_key, {ticket.player_id: ticket.enqueued_at}, nx=True)
+        pipeline.execute()
+
+
+def join_queue(guild: Guild, player: Player, players_per_team: int) -> Ticket:
+    """
+    Add a player to the matchmaking queue of a guild with their guild rating.
+
+    Args:
+    -----
+        guild (Guild): Guild.
+        player (Player): Player with a connected steam user.
+        players_per_team (int): Players in each team.
+
+    Returns:
+    --------
+        Ticket: Ticket of the player.
+    """
+    if player.steam_user_id is None:
+        raise QueueError(f"Discord user {player.discord_user.username} has no connected player", status=404)
+    rating = get_players_ratings(guild.pk, [player.id]).get(player.id, DEFAULT_RATING)
+    return MatchmakingQueue(guild.pk, players_per_team).enqueue(player, rating)
+
+
+def get_available_server(guild: Guild, excluded: set[str]) -> Server | None:
+    """
+    Get an online server of the guild, or a public one, without a running match.
+
+    Args:
+    -----
+        guild (Guild): Guild.
+        excluded (set[str]): IDs of servers already taken.
+
+    Returns:
+    --------
+        Server | None: Available server or None if every server is busy.
+    """
+    for server in Server.objects.filter(Q(guild=guild) | Q(is_public=True)).order_by("created_at"):
+        if server.pk in excluded or not Match.objects.check_server_is_available_for_match(server):
+            continue
+        if server.is_online():
+            return server
+    return None
+
+
+def create_queued_match(queue: MatchmakingQueue, guild: Guild, players_ids: list[str], server: Server) -> Match | None:
+    """
+    Pop a group from the queue and create its match, the tickets are put back if it fails.
+
+    Args:
+    -----
+        queue (MatchmakingQueue): Queue of the group.
+        guild (Guild): Guild of the queue.
+        players_ids (list[str]): Player IDs of the group.
+        server (Server): Server of the match.
+
+    Returns:
+    --------
+        Match | None: Created match or None if some players left the queue or the match was rejected.
+    """
+    tickets = queue.pop(players_ids)
+    if len(tickets) < queue.group_size:
+        queue.requeue(tickets)
+        return None
+    try:
+        return create_new_match(
+            discord_users_ids=[ticket.discord_user_id for ticket in tickets],
+            author_id=tickets[0].discord_user_id,
+            guild_id=guild.pk,
+            base_url=settings.MATCHMAKING_BASE_URL,
+            server_id=server.pk,
+            match_type=settings.MATCHMAKING_MATCH_TYPE,
+        )
+    except MatchCreationError as e:
+        logger.warning("Matchmaking group %s rejected: %s", players_ids, e.data)
+    except Exception:
+        logger.exception("Matchmaking group %s failed", players_ids)
+    queue.requeue(tickets)
+    return None
+
+
+def run_matchmaking(now: float | None = None, client=None) -> list[Match]:
+    """
+    Create matches for the groups found in every matchmaking queue.
+
+    Args:
+    -----
+        now (float | None): Unix timestamp used to compute wait times, now by default.
+        client (redis.Redis | None): Redis client, the default cache connection by default.
+
+    Returns:
+    --------
+        list[Match]: Created matches.
+    """
+    client = client or get_redis_connection("default")
+    matches = []
+    for name in client.smembers(MATCHMAKING_QUEUES_KEY):
+        queue = MatchmakingQueue.from_name(name.decode() if isinstance(name, bytes) else name, client=client)
+        groups = queue.find_groups(now)
+        if not groups:
+            continue
+        guild = Guild.objects.filter(pk=queue.guild_id).first()
+        if guild is None:
+            continue
+        taken_servers = set()
+        for group in groups:
+            server = get_available_server(guild, taken_servers)
+            if server is None:
+                break
+            match = create_queued_match(queue, guild, group, server)
+            if match is not None:
+                taken_servers.add(server.pk)
+                matches.append(match)
+    return matches
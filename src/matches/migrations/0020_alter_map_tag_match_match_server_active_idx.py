@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-18 10:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guilds', '0005_alter_guild_guild_id'),
+        ('matches', '0019_match_last_map_ban_match_last_map_pick'),
+        ('players', '0006_alter_discorduser_user_id_alter_steamuser_steamid64'),
+        ('servers', '0006_remove_server_max_players'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='map',
+            name='tag',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(condition=models.Q(('status__in', ['STARTED', 'LIVE'])), fields=['server', 'status'], name='match_server_active_idx'),
+        ),
+    ]
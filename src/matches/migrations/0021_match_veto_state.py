@@ -0,0 +1,49 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:03
+
+from django.db import migrations, models
+
+
+def fill_veto_state(apps, schema_editor):
+    Match = apps.get_model("matches", "Match")
+    matches = Match.objects.prefetch_related("map_bans__map", "map_picks__map")
+    for match in matches.iterator(chunk_size=500):
+        match.veto_banned_maps = [
+            map_ban.map.tag for map_ban in sorted(match.map_bans.all(), key=lambda map_ban: map_ban.created_at)
+        ]
+        match.veto_picked_maps = [
+            map_pick.map.tag for map_pick in sorted(match.map_picks.all(), key=lambda map_pick: map_pick.created_at)
+        ]
+        match.veto_maps_left = [tag for tag in match.maplist or [] if tag not in match.veto_picked_maps]
+        match.veto_step = len(match.veto_banned_maps) + len(match.veto_picked_maps)
+        match.save(update_fields=["veto_banned_maps", "veto_picked_maps", "veto_maps_left", "veto_step"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0020_alter_map_tag_match_match_server_active_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='veto_banned_maps',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='veto_maps_left',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='veto_picked_maps',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='veto_step',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_veto_state, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guilds', '0006_guild_guild_created_idx'),
+        ('matches', '0021_match_veto_state'),
+        ('players', '0007_discorduser_discord_user_created_idx_and_more'),
+        ('servers', '0007_server_server_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['created_at', 'id'], name='match_created_idx'),
+        ),
+    ]
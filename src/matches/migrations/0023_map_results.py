@@ -0,0 +1,69 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0022_match_match_created_idx'),
+        ('players', '0007_discorduser_discord_user_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MapResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('map_number', models.PositiveSmallIntegerField()),
+                ('team1_name', models.CharField(max_length=255)),
+                ('team1_score', models.PositiveSmallIntegerField()),
+                ('team1_score_ct', models.PositiveSmallIntegerField()),
+                ('team1_score_t', models.PositiveSmallIntegerField()),
+                ('team1_series_score', models.PositiveSmallIntegerField()),
+                ('team2_name', models.CharField(max_length=255)),
+                ('team2_score', models.PositiveSmallIntegerField()),
+                ('team2_score_ct', models.PositiveSmallIntegerField()),
+                ('team2_score_t', models.PositiveSmallIntegerField()),
+                ('team2_series_score', models.PositiveSmallIntegerField()),
+                ('winner_side', models.CharField(max_length=255)),
+                ('winner_team', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='map_results', to='matches.match')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PlayerMapStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('steamid64', models.CharField(max_length=255)),
+                ('team', models.CharField(max_length=255)),
+                ('name', models.CharField(max_length=255)),
+                ('kills', models.PositiveIntegerField(default=0)),
+                ('deaths', models.PositiveIntegerField(default=0)),
+                ('assists', models.PositiveIntegerField(default=0)),
+                ('damage', models.PositiveIntegerField(default=0)),
+                ('headshot_kills', models.PositiveIntegerField(default=0)),
+                ('rounds_played', models.PositiveIntegerField(default=0)),
+                ('stats', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('map_result', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='players_stats', to='matches.mapresult')),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='players_stats', to='matches.match')),
+                ('player', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='map_stats', to='players.player')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='mapresult',
+            constraint=models.UniqueConstraint(fields=('match', 'map_number'), name='map_result_match_map_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='playermapstats',
+            index=models.Index(fields=['steamid64', 'match'], name='player_map_stats_steamid_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='playermapstats',
+            constraint=models.UniqueConstraint(fields=('map_result', 'steamid64'), name='player_map_stats_unique'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guilds', '0006_guild_guild_created_idx'),
+        ('matches', '0023_map_results'),
+        ('players', '0007_discorduser_discord_user_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerGuildStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kills', models.PositiveIntegerField(default=0)),
+                ('deaths', models.PositiveIntegerField(default=0)),
+                ('assists', models.PositiveIntegerField(default=0)),
+                ('damage', models.PositiveIntegerField(default=0)),
+                ('rounds_played', models.PositiveIntegerField(default=0)),
+                ('maps_played', models.PositiveIntegerField(default=0)),
+                ('maps_won', models.PositiveIntegerField(default=0)),
+                ('matches_played', models.PositiveIntegerField(default=0)),
+                ('matches_won', models.PositiveIntegerField(default=0)),
+                ('rating', models.FloatField(default=1000)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('guild', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='players_stats', to='guilds.guild')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='guilds_stats', to='players.player')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['guild', '-rating', 'id'], name='player_guild_stats_rating_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='playerguildstats',
+            constraint=models.UniqueConstraint(fields=('player', 'guild'), name='player_guild_stats_unique'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-18 12:25
+
+from django.db import migrations, models
+
+
+def flag_rated_map_results(apps, schema_editor):
+    # Stored results were added to the ratings when they were first received
+    MapResult = apps.get_model("matches", "MapResult")
+    MapResult.objects.update(rated=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0024_player_guild_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mapresult',
+            name='rated',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(flag_rated_map_results, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,18 @@
 import math
 
 from django.contrib.auth import get_user_model
-from django.db import models
-from django.db.models import Q
+from django.db import models, transaction
+from django.db.models import Prefetch, Q
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
 from prefix_id import PrefixIDField
 
-from players.models import Team
+from accounts.utils import get_discord_user_token
+from matches.cache import bump_match_configs_versions, delete_cached_match_guild_id, delete_cached_matches_guild_ids
+
+from players.models import Player, SteamUser, Team
+from players.steam import steam_users_refreshed
+from players.utils import DEFAULT_RATING
 
 UserModel = get_user_model()
 
@@ -17,16 +24,28 @@ class MatchStatus(models.TextChoices):
     FINISHED = "FINISHED"
 
 
+ACTIVE_MATCH_STATUSES = [MatchStatus.STARTED, MatchStatus.LIVE]
+
+
 class MatchType(models.TextChoices):
     BO1 = "BO1"
     BO3 = "BO3"
     BO5 = "BO5"
 
 
+class VetoError(Exception):
+    """Veto action rejected, ``message`` is returned to the user with ``status``."""
+
+    def __init__(self, message: str, status: int = 400) -> None:
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
 class Map(models.Model):
     id = PrefixIDField(primary_key=True, prefix="map")
     name = models.CharField(max_length=255)
-    tag = models.CharField(max_length=255)
+    tag = models.CharField(max_length=255, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -56,7 +75,51 @@ class MapPick(models.Model):
         return f"<{self.team.name} - {self.map.name}>"
 
 
-class MatchManager(models.Manager):
+class MatchQuerySet(models.QuerySet):
+    def with_serializer_relations(self):
+        """
+        Load everything ``MatchSerializer`` touches in a fixed number of queries.
+
+        Returns:
+        --------
+            MatchQuerySet: Queryset with the related objects selected and prefetched.
+        """
+        players = Player.objects.select_related("discord_user", "steam_user")
+        leader = ["team__leader__discord_user", "team__leader__steam_user"]
+        map_bans = MapBan.objects.select_related("map", *leader).prefetch_related(
+            Prefetch("team__players", queryset=players)
+        )
+        map_picks = MapPick.objects.select_related("map", *leader).prefetch_related(
+            Prefetch("team__players", queryset=players)
+        )
+        return self.select_related(
+            "author",
+            "server",
+            "guild__owner__player__discord_user",
+            "guild__owner__player__steam_user",
+            "team1__leader__discord_user",
+            "team1__leader__steam_user",
+            "team2__leader__discord_user",
+            "team2__leader__steam_user",
+            "winner_team__leader__discord_user",
+            "winner_team__leader__steam_user",
+            "last_map_ban__map",
+            *[f"last_map_ban__{relation}" for relation in leader],
+            "last_map_pick__map",
+            *[f"last_map_pick__{relation}" for relation in leader],
+        ).prefetch_related(
+            "maps",
+            Prefetch("team1__players", queryset=players),
+            Prefetch("team2__players", queryset=players),
+            Prefetch("winner_team__players", queryset=players),
+            Prefetch("last_map_ban__team__players", queryset=players),
+            Prefetch("last_map_pick__team__players", queryset=players),
+            Prefetch("map_bans", queryset=map_bans),
+            Prefetch("map_picks", queryset=map_picks),
+        )
+
+
+class MatchManager(models.Manager.from_queryset(MatchQuerySet)):
     def create_match(self, **kwargs):
         maps = Map.objects.all()
         maplist = kwargs.pop("maplist", None)
@@ -80,6 +143,7 @@ class MatchManager(models.Manager):
             team1=team1,
             team2=team2,
             maplist=maplist,
+            veto_maps_left=list(maplist),
             map_sides=map_sides,
             num_maps=num_maps,
             players_per_team=players_per_team_rounded,
@@ -92,10 +156,7 @@ class MatchManager(models.Manager):
         return match
 
     def check_server_is_available_for_match(self, server):
-        return not self.filter(
-            Q(server=server) &
-            (Q(status=MatchStatus.LIVE) | Q(status=MatchStatus.STARTED))
-        ).exists()
+        return not self.filter(server=server, status__in=ACTIVE_MATCH_STATUSES).exists()
 
 # Create your models here.
 class Match(models.Model):
@@ -135,9 +196,23 @@ class Match(models.Model):
         "servers.Server", on_delete=models.CASCADE, related_name="matches", null=True
     )
     guild = models.ForeignKey("guilds.Guild", on_delete=models.CASCADE, related_name="matches", null=True)
+    veto_step = models.PositiveSmallIntegerField(default=0)
+    veto_maps_left = models.JSONField(default=list)
+    veto_banned_maps = models.JSONField(default=list)
+    veto_picked_maps = models.JSONField(default=list)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["server", "status"],
+                name="match_server_active_idx",
+                condition=Q(status__in=ACTIVE_MATCH_STATUSES),
+            ),
+            models.Index(fields=["created_at", "id"], name="match_created_idx"),
+        ]
+
     @property
     def api_key_header(self):
         return "Authorization"
@@ -180,7 +255,7 @@ class Match(models.Model):
         return "" if not self.server else self.server.get_connect_string()
 
     def get_author_token(self):
-        return UserModel.objects.get(player__discord_user=self.author).get_token()
+        return get_discord_user_token(self.author_id)
 
     def create_webhook_cvars(self, webhook_url: str):
         self.cvars = self.cvars or {}
@@ -194,25 +269,297 @@ class Match(models.Model):
     def get_maps_tags(self):
         return [map.tag for map in self.maps.all()]
 
+    def init_veto_state(self):
+        """Start the veto from the maplist, matches created before the veto state was stored have none."""
+        if self.veto_step == 0 and not self.veto_maps_left:
+            self.veto_maps_left = list(self.maplist or [])
+
     def ban_map(self, team, map):
+        self._check_veto_map(map, "banned")
         map_ban = MapBan.objects.create(team=team, map=map)
-        self.map_bans.add(map_ban)
-        self.maps.remove(map)
-        self.maplist.remove(map.tag)
+        Match.map_bans.through.objects.create(match=self, mapban=map_ban)
+        Match.maps.through.objects.filter(match=self, map=map).delete()
+        self.veto_maps_left.remove(map.tag)
+        self.veto_banned_maps.append(map.tag)
         self.last_map_ban = map_ban
-        self.save()
+        self._save_veto_step("last_map_ban")
         return self
 
     def pick_map(self, team, map):
+        self._check_veto_map(map, "picked")
         map_pick = MapPick.objects.create(team=team, map=map)
-        self.map_picks.add(map_pick)
-        map_index = self.maplist.index(map.tag)
-        self.maplist.pop(map_index)
-        map_picks_count = self.map_picks.count()
-        if map_picks_count == 1:
-            self.maplist.insert(0, map.tag)
-        else:
-            self.maplist.insert(1, map.tag)
+        Match.map_picks.through.objects.create(match=self, mappick=map_pick)
+        self.veto_maps_left.remove(map.tag)
+        self.veto_picked_maps.append(map.tag)
         self.last_map_pick = map_pick
-        self.save()
-        return self
\ No newline at end of file
+        self._save_veto_step("last_map_pick")
+        return self
+
+    def _check_veto_map(self, map, action: str):
+        self.init_veto_state()
+        if map.tag not in self.veto_maps_left:
+            raise VetoError(f"Map {map.tag} is not available to be {action}")
+
+    def _save_veto_step(self, *fields):
+        self.veto_step += 1
+        self.maplist = self.veto_picked_maps + self.veto_maps_left
+        self.save(
+            update_fields=[
+                "veto_step", "veto_maps_left", "veto_banned_maps", "veto_picked_maps", "maplist", "updated_at", *fields
+            ]
+        )
+
+
+PLAYER_MAP_STATS_FIELDS = ["kills", "deaths", "assists", "damage", "headshot_kills", "rounds_played"]
+
+
+def get_stat(stats: dict, name: str) -> int:
+    try:
+        return max(int(stats.get(name) or 0), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class MapResultManager(models.Manager):
+    def create_from_event(self, match_id: int, data: dict) -> tuple["MapResult", bool]:
+        """
+        Store a map result and the stat lines of its players from a validated MAP_RESULT event.
+
+        A result already stored for the same map is replaced, so webhook retries are idempotent. The
+        replacement keeps its ``rated`` flag, so the map is counted in the ratings once.
+
+        Args:
+        -----
+            match_id (int): Match ID.
+            data (dict): Validated MAP_RESULT event data.
+
+        Returns:
+        --------
+            tuple[MapResult, bool]: Map result and False if it replaced a stored one.
+        """
+        team1, team2 = data["team1"], data["team2"]
+        steamids = [player["steamid"] for team in (team1, team2) for player in team["players"]]
+        # Newest first, so the oldest player of a steam user wins.
+        players = dict(
+            Player.objects.filter(steam_user__steamid64__in=steamids)
+            .order_by("-created_at")
+            .values_list("steam_user__steamid64", "pk")
+        )
+        with transaction.atomic():
+            stored = self.filter(match_id=match_id, map_number=data["map_number"])
+            rated = stored.select_for_update().values_list("rated", flat=True).first()
+            if rated is not None:
+                stored.delete()
+            map_result = self.create(
+                match_id=match_id,
+                map_number=data["map_number"],
+                rated=bool(rated),
+                team1_name=team1["name"],
+                team1_score=team1["score"],
+                team1_score_ct=team1["score_ct"],
+                team1_score_t=team1["score_t"],
+                team1_series_score=team1["series_score"],
+                team2_name=team2["name"],
+                team2_score=team2["score"],
+                team2_score_ct=team2["score_ct"],
+                team2_score_t=team2["score_t"],
+                team2_series_score=team2["series_score"],
+                winner_side=data["winner"]["side"],
+                winner_team=data["winner"]["team"],
+            )
+            PlayerMapStats.objects.bulk_create(
+                [
+                    PlayerMapStats(
+                        map_result=map_result,
+                        match_id=match_id,
+                        steamid64=player["steamid"],
+                        player_id=players.get(player["steamid"]),
+                        team=team_key,
+                        name=player["name"],
+                        stats=player["stats"],
+                        **{field: get_stat(player["stats"], field) for field in PLAYER_MAP_STATS_FIELDS},
+                    )
+                    for team_key, team in (("team1", team1), ("team2", team2))
+                    for player in team["players"]
+                ],
+                # A player listed twice keeps the first stat line.
+                ignore_conflicts=True,
+            )
+        return map_result, rated is None
+
+
+class MapResult(models.Model):
+    objects = MapResultManager()
+
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name="map_results")
+    map_number = models.PositiveSmallIntegerField()
+    team1_name = models.CharField(max_length=255)
+    team1_score = models.PositiveSmallIntegerField()
+    team1_score_ct = models.PositiveSmallIntegerField()
+    team1_score_t = models.PositiveSmallIntegerField()
+    team1_series_score = models.PositiveSmallIntegerField()
+    team2_name = models.CharField(max_length=255)
+    team2_score = models.PositiveSmallIntegerField()
+    team2_score_ct = models.PositiveSmallIntegerField()
+    team2_score_t = models.PositiveSmallIntegerField()
+    team2_series_score = models.PositiveSmallIntegerField()
+    winner_side = models.CharField(max_length=255)
+    winner_team = models.CharField(max_length=255)
+    # Set in the transaction adding the result to the ratings of its players.
+    rated = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["match", "map_number"], name="map_result_match_map_unique"),
+        ]
+
+    def __str__(self):
+        return f"<{self.match_id} - {self.map_number} - {self.team1_score}:{self.team2_score}>"
+
+
+class PlayerMapStats(models.Model):
+    map_result = models.ForeignKey(MapResult, on_delete=models.CASCADE, related_name="players_stats")
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name="players_stats")
+    player = models.ForeignKey(Player, on_delete=models.SET_NULL, related_name="map_stats", null=True)
+    steamid64 = models.CharField(max_length=255)
+    team = models.CharField(max_length=255)
+    name = models.CharField(max_length=255)
+    kills = models.PositiveIntegerField(default=0)
+    deaths = models.PositiveIntegerField(default=0)
+    assists = models.PositiveIntegerField(default=0)
+    damage = models.PositiveIntegerField(default=0)
+    headshot_kills = models.PositiveIntegerField(default=0)
+    rounds_played = models.PositiveIntegerField(default=0)
+    stats = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["steamid64", "match"], name="player_map_stats_steamid_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["map_result", "steamid64"], name="player_map_stats_unique"),
+        ]
+
+    def __str__(self):
+        return f"<{self.steamid64} - {self.kills}/{self.deaths}/{self.assists}>"
+
+
+class PlayerGuildStats(models.Model):
+    """Running totals and rating of a player in a guild, updated by every map and series result."""
+
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="guilds_stats")
+    guild = models.ForeignKey("guilds.Guild", on_delete=models.CASCADE, related_name="players_stats")
+    kills = models.PositiveIntegerField(default=0)
+    deaths = models.PositiveIntegerField(default=0)
+    assists = models.PositiveIntegerField(default=0)
+    damage = models.PositiveIntegerField(default=0)
+    rounds_played = models.PositiveIntegerField(default=0)
+    maps_played = models.PositiveIntegerField(default=0)
+    maps_won = models.PositiveIntegerField(default=0)
+    matches_played = models.PositiveIntegerField(default=0)
+    matches_won = models.PositiveIntegerField(default=0)
+    rating = models.FloatField(default=DEFAULT_RATING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["guild", "-rating", "id"], name="player_guild_stats_rating_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["player", "guild"], name="player_guild_stats_unique"),
+        ]
+
+    @property
+    def adr(self) -> float:
+        return round(self.damage / self.rounds_played, 2) if self.rounds_played else 0
+
+    @property
+    def kd(self) -> float:
+        return round(self.kills / self.deaths, 2) if self.deaths else float(self.kills)
+
+    def __str__(self):
+        return f"<{self.player_id} - {self.guild_id} - {self.rating:.0f}>"
+
+
+MATCH_CONFIG_FIELDS = {
+    "author", "team1", "team2", "maplist", "map_sides", "cvars", "num_maps", "clinch_series", "players_per_team"
+}
+
+
+def get_unfinished_matches_ids(query: Q) -> list[int]:
+    return list(Match.objects.filter(query).exclude(status=MatchStatus.FINISHED).values_list("pk", flat=True).distinct())
+
+
+@receiver(post_save, sender=Match)
+def invalidate_match_config(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields is None or MATCH_CONFIG_FIELDS.intersection(update_fields):
+        bump_match_configs_versions([instance.pk])
+
+
+@receiver(post_delete, sender=Match)
+def invalidate_deleted_match_config(sender, instance, **kwargs):
+    bump_match_configs_versions([instance.pk])
+
+
+@receiver(post_save, sender=Match)
+def invalidate_match_guild(sender, instance, created, update_fields=None, **kwargs):
+    if not created and (update_fields is None or "guild" in update_fields):
+        delete_cached_match_guild_id(instance.pk)
+
+
+@receiver(post_delete, sender=Match)
+def invalidate_deleted_match_guild(sender, instance, **kwargs):
+    delete_cached_match_guild_id(instance.pk)
+
+
+@receiver(post_save, sender="guilds.Guild")
+def invalidate_guild_matches_guild(sender, instance, created, **kwargs):
+    # Finished matches keep their entry until it expires, they get no more webhooks
+    if not created:
+        delete_cached_matches_guild_ids(get_unfinished_matches_ids(Q(guild=instance)))
+
+
+@receiver(post_save, sender=Team)
+def invalidate_team_matches_configs(sender, instance, created, **kwargs):
+    if not created:
+        bump_match_configs_versions(get_unfinished_matches_ids(Q(team1=instance) | Q(team2=instance)))
+
+
+@receiver(m2m_changed, sender=Team.players.through)
+def invalidate_team_players_matches_configs(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        teams_ids = [instance.pk]
+    elif pk_set:
+        teams_ids = list(pk_set)
+    else:
+        teams_ids = list(instance.teams.values_list("pk", flat=True))
+    bump_match_configs_versions(get_unfinished_matches_ids(Q(team1__in=teams_ids) | Q(team2__in=teams_ids)))
+
+
+@receiver(post_save, sender=Player)
+def invalidate_player_matches_configs(sender, instance, created, **kwargs):
+    if not created:
+        bump_match_configs_versions(get_unfinished_matches_ids(Q(team1__players=instance) | Q(team2__players=instance)))
+
+
+@receiver(post_save, sender=SteamUser)
+def invalidate_steam_user_matches_configs(sender, instance, created, **kwargs):
+    if not created:
+        bump_match_configs_versions(
+            get_unfinished_matches_ids(Q(team1__players__steam_user=instance) | Q(team2__players__steam_user=instance))
+        )
+
+
+@receiver(steam_users_refreshed, sender=SteamUser)
+def invalidate_refreshed_steam_users_matches_configs(sender, steam_users_ids, **kwargs):
+    bump_match_configs_versions(
+        get_unfinished_matches_ids(
+            Q(team1__players__steam_user__in=steam_users_ids) | Q(team2__players__steam_user__in=steam_users_ids)
+        )
+    )
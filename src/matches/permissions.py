@@ -1,12 +1,26 @@
 from rest_framework import permissions
 
+from accounts.cache import AuthToken
+
+
+def get_request_discord_user_id(request) -> str | None:
+    """Discord user ID of the request user, read from the cached token when there is one."""
+    if isinstance(request.auth, AuthToken):
+        return request.auth.discord_user_id
+    player = request.user.player
+    return player.discord_user_id if player is not None else None
+
 
 class IsAuthor(permissions.BasePermission):
     """
     Object-level permission to only allow owners of an object to edit it.
-    Assumes the model instance has an `owner` attribute.
+    Assumes the model instance has an `author_id` attribute.
     """
 
     def has_object_permission(self, request, view, obj):
-        # Instance must have an attribute named `owner`.
-        return request.user and request.user.is_authenticated and obj.author == request.user.player.discord_user
\ No newline at end of file
+        return bool(
+            request.user
+            and request.user.is_authenticated
+            and obj.author_id is not None
+            and obj.author_id == get_request_discord_user_id(request)
+        )
\ No newline at end of file
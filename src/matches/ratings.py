@@ -0,0 +1,145 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from matches.models import MapResult, Match, PlayerGuildStats, PlayerMapStats
+
+MAP_STATS_FIELDS = ["kills", "deaths", "assists", "damage", "rounds_played"]
+
+
+def get_expected_score(rating: float, opponent_rating: float) -> float:
+    return 1 / (1 + 10 ** ((opponent_rating - rating) / 400))
+
+
+def get_team_score(team: str, winner_team: str) -> float:
+    if winner_team not in ("team1", "team2"):
+        return 0.5
+    return 1.0 if team == winner_team else 0.0
+
+
+def lock_players_stats(guild_id: str, players_ids) -> dict[str, PlayerGuildStats]:
+    """
+    Get and lock the stats of players in a guild, missing rows are created first.
+
+    Args:
+    -----
+        guild_id (str): Guild ID.
+        players_ids (Iterable[str]): Player IDs.
+
+    Returns:
+    --------
+        dict[str, PlayerGuildStats]: Locked stats keyed by player ID.
+    """
+    players_ids = set(players_ids)
+    PlayerGuildStats.objects.bulk_create(
+        [PlayerGuildStats(player_id=player_id, guild_id=guild_id) for player_id in players_ids],
+        ignore_conflicts=True,
+    )
+    return {
+        stats.player_id: stats
+        for stats in PlayerGuildStats.objects.select_for_update().filter(guild_id=guild_id, player_id__in=players_ids)
+    }
+
+
+def get_players_ratings(guild_id: str, players_ids) -> dict[str, float]:
+    """
+    Get the ratings of players in a guild.
+
+    Args:
+    -----
+        guild_id (str): Guild ID.
+        players_ids (Iterable[str]): Player IDs.
+
+    Returns:
+    --------
+        dict[str, float]: Ratings keyed by player ID, players without stats are left out.
+    """
+    return dict(
+        PlayerGuildStats.objects.filter(guild_id=guild_id, player_id__in=players_ids).values_list("player_id", "rating")
+    )
+
+
+def update_map_ratings(map_result: MapResult) -> list[PlayerGuildStats]:
+    """
+    Add a map result to the stats of its players and update their ratings.
+
+    Every player gains or loses ``RATING_K_FACTOR * (score - expected score)``, the expected score
+    comes from the average ratings of both teams. Players without a linked player are skipped.
+    The result is flagged as rated in the same transaction, so it is only counted once, even by
+    concurrent or retried calls.
+
+    Args:
+    -----
+        map_result (MapResult): Map result.
+
+    Returns:
+    --------
+        list[PlayerGuildStats]: Updated stats, empty if the result was already rated.
+    """
+    guild_id = Match.objects.filter(pk=map_result.match_id).values_list("guild_id", flat=True).first()
+    if guild_id is None:
+        return []
+    lines = list(
+        map_result.players_stats.exclude(player=None).values("player_id", "team", *MAP_STATS_FIELDS)
+    )
+    if not lines:
+        return []
+    with transaction.atomic():
+        if not MapResult.objects.filter(pk=map_result.pk, rated=False).update(rated=True):
+            return []
+        map_result.rated = True
+        players_stats = lock_players_stats(guild_id, [line["player_id"] for line in lines])
+        teams_ratings = {}
+        for line in lines:
+            teams_ratings.setdefault(line["team"], []).append(players_stats[line["player_id"]].rating)
+        average_ratings = {team: sum(ratings) / len(ratings) for team, ratings in teams_ratings.items()}
+        for line in lines:
+            stats = players_stats[line["player_id"]]
+            team_rating = average_ratings[line["team"]]
+            opponent_ratings = [rating for team, rating in average_ratings.items() if team != line["team"]]
+            opponent_rating = opponent_ratings[0] if opponent_ratings else team_rating
+            score = get_team_score(line["team"], map_result.winner_team)
+            stats.rating += settings.RATING_K_FACTOR * (score - get_expected_score(team_rating, opponent_rating))
+            for field in MAP_STATS_FIELDS:
+                setattr(stats, field, getattr(stats, field) + line[field])
+            stats.maps_played += 1
+            stats.maps_won += score == 1.0
+            stats.updated_at = timezone.now()
+        PlayerGuildStats.objects.bulk_update(
+            players_stats.values(), [*MAP_STATS_FIELDS, "maps_played", "maps_won", "rating", "updated_at"]
+        )
+    return list(players_stats.values())
+
+
+def update_series_stats(match: Match, winner_team: str) -> list[PlayerGuildStats]:
+    """
+    Count a finished series in the stats of the players who played its maps.
+
+    Players are taken from the map stats of the match, with the team of the last map they played.
+
+    Args:
+    -----
+        match (Match): Finished match.
+        winner_team (str): ``team1`` or ``team2``.
+
+    Returns:
+    --------
+        list[PlayerGuildStats]: Updated stats.
+    """
+    if match.guild_id is None:
+        return []
+    players_teams = dict(
+        PlayerMapStats.objects.filter(match=match, player__isnull=False, team__in=("team1", "team2"))
+        .order_by("map_result__map_number")
+        .values_list("player_id", "team")
+    )
+    if not players_teams:
+        return []
+    with transaction.atomic():
+        players_stats = lock_players_stats(match.guild_id, players_teams.keys())
+        for player_id, stats in players_stats.items():
+            stats.matches_played += 1
+            stats.matches_won += players_teams[player_id] == winner_team
+            stats.updated_at = timezone.now()
+        PlayerGuildStats.objects.bulk_update(players_stats.values(), ["matches_played", "matches_won", "updated_at"])
+    return list(players_stats.values())
@@ -1,11 +1,15 @@
 from enum import Enum
 import re
+from django.db import models
 from rest_framework import serializers
 from rest_framework.reverse import reverse_lazy
 
+from accounts.utils import get_discord_users_tokens
+from api.serializers import DynamicFieldsMixin
+
 from guilds.serializers import GuildSerializer
-from matches.models import Map, MapBan, MapPick, Match, MatchType, MatchStatus
-from players.serializers import TeamSerializer, DiscordUserSerializer
+from matches.models import Map, MapBan, MapPick, Match, MatchType, MatchStatus, PlayerGuildStats
+from players.serializers import TeamSerializer, DiscordUserSerializer, PlayerSerializer
 from servers.serializers import ServerSerializer
 
 
@@ -60,7 +64,15 @@ class MatchConfigSerializer(serializers.Serializer):
     cvars = serializers.DictField(required=False)
 
 
-class MatchSerializer(serializers.ModelSerializer):
+class MatchListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        matches = data.all() if isinstance(data, models.manager.BaseManager) else data
+        if "load_match_command" in self.child.fields:
+            self.context["author_tokens"] = get_discord_users_tokens([match.author_id for match in matches])
+        return super().to_representation(matches)
+
+
+class MatchSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     team1 = TeamSerializer(read_only=True)
     team2 = TeamSerializer(read_only=True)
     maps = MapSerializer(many=True, read_only=True)
@@ -89,7 +101,8 @@ class MatchSerializer(serializers.ModelSerializer):
 
     def get_load_match_command(self, obj) -> str:
         config_url = self.get_config_url(obj)
-        return f'{obj.load_match_command_name} "{config_url}" "{obj.api_key_header}" "Bearer {obj.get_author_token()}"'
+        author_token = self.context.get("author_tokens", {}).get(obj.author_id) or obj.get_author_token()
+        return f'{obj.load_match_command_name} "{config_url}" "{obj.api_key_header}" "Bearer {author_token}"'
 
     def get_config(self, obj) -> MatchConfigSerializer:
         return MatchConfigSerializer(obj.get_config()).data
@@ -97,6 +110,20 @@ class MatchSerializer(serializers.ModelSerializer):
     class Meta:
         model = Match
         fields = "__all__"
+        list_serializer_class = MatchListSerializer
+        expandable_fields = (
+            "team1", "team2", "winner_team", "maps", "map_bans", "last_map_ban", "map_picks", "last_map_pick",
+            "author", "server", "guild",
+        )
+
+
+class MatchSummarySerializer(MatchSerializer):
+    class Meta(MatchSerializer.Meta):
+        fields = [
+            "id", "status", "type", "message_id", "author", "team1", "team2", "winner_team", "server", "guild",
+            "maplist", "num_maps", "players_per_team", "clinch_series", "map_sides", "created_at", "updated_at",
+        ]
+        default_expand = ()
 
 
 class MatchUpdateSerializer(serializers.Serializer):
@@ -139,6 +166,9 @@ class CreateMatchSerializer(serializers.Serializer):
         child=serializers.CharField(required=False), required=False
     )
     maplist = serializers.ListField(child=serializers.CharField(), required=False)
+    parties = serializers.ListField(
+        child=serializers.ListField(child=serializers.CharField()), required=False, default=list
+    )
 
 
 class MatchTeamWrapperSerializer(serializers.Serializer):
@@ -198,6 +228,12 @@ class InteractionUserSerializer(serializers.Serializer):
     interaction_user_id = serializers.CharField(required=True)
 
 
+class ShuffleTeamsSerializer(InteractionUserSerializer):
+    parties = serializers.ListField(
+        child=serializers.ListField(child=serializers.CharField()), required=False, default=list
+    )
+
+
 class MatchBanMapSerializer(InteractionUserSerializer):
     map_tag = serializers.CharField(required=True)
 
@@ -234,3 +270,46 @@ class MatchPickMapResultSerializer(serializers.Serializer):
 
 class MatchPlayerJoin(InteractionUserSerializer):
     pass
+
+
+class MatchmakingTicketSerializer(InteractionUserSerializer):
+    players_per_team = serializers.IntegerField(min_value=1, max_value=5, required=False)
+
+
+class MatchmakingTicketResultSerializer(serializers.Serializer):
+    player_id = serializers.CharField()
+    players_per_team = serializers.IntegerField()
+    rating = serializers.FloatField()
+    enqueued_at = serializers.FloatField()
+    position = serializers.IntegerField()
+    queue_size = serializers.IntegerField()
+
+
+class MatchLoadJobSerializer(serializers.Serializer):
+    id = serializers.CharField()
+    match_id = serializers.CharField()
+    status = serializers.CharField()
+    result = serializers.DictField(allow_null=True)
+    error = serializers.CharField(allow_null=True)
+
+
+class MatchEventsQuerySerializer(serializers.Serializer):
+    since = serializers.RegexField(r"^\d+(-\d+)?$", required=False)
+    count = serializers.IntegerField(min_value=1, max_value=1000, default=100)
+
+
+class MatchEventLogSerializer(serializers.Serializer):
+    id = serializers.CharField()
+    event = serializers.CharField()
+    match_id = serializers.CharField(allow_null=True)
+    data = serializers.JSONField(allow_null=True)
+
+
+class PlayerGuildStatsSerializer(serializers.ModelSerializer):
+    player = PlayerSerializer(read_only=True)
+    adr = serializers.FloatField(read_only=True)
+    kd = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = PlayerGuildStats
+        exclude = ["guild"]
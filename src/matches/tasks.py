@@ -0,0 +1,228 @@
+import json
+import uuid
+from time import sleep
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django_redis import get_redis_connection
+
+from api.aredis import get_async_redis
+from matches.models import Match
+from servers.models import Server
+
+JOBS_QUEUE = "queue.jobs"
+JOB_CACHE_KEY = "job:{}"
+
+
+class JobStatus:
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    FINISHED = "FINISHED"
+    FAILED = "FAILED"
+
+
+def get_job_cache_key(job_id: str) -> str:
+    return JOB_CACHE_KEY.format(job_id)
+
+
+def get_job(job_id: str) -> dict | None:
+    """
+    Get a job state.
+
+    Args:
+    -----
+        job_id (str): Job ID.
+
+    Returns:
+    --------
+        dict | None: Job state or None if the job does not exist or expired.
+    """
+    return cache.get(get_job_cache_key(job_id))
+
+
+def update_job(job: dict, **kwargs) -> dict:
+    """
+    Update a job state.
+
+    Args:
+    -----
+        job (dict): Job state.
+        **kwargs: Fields to update.
+
+    Returns:
+    --------
+        dict: Updated job state.
+    """
+    job.update(kwargs)
+    cache.set(get_job_cache_key(job["id"]), job, timeout=settings.JOB_RESULT_TIMEOUT)
+    return job
+
+
+def push_job(payload: dict) -> None:
+    """
+    Push a job payload to the jobs queue.
+
+    Args:
+    -----
+        payload (dict): Job payload.
+
+    Returns:
+    --------
+        None
+    """
+    get_redis_connection("default").lpush(JOBS_QUEUE, json.dumps(payload))
+
+
+async def apush_job(payload: dict) -> None:
+    """
+    Push a job payload to the jobs queue with the async Redis client of the running event loop, or the
+    shared sync pool in a thread without ``USE_ASYNC_CLIENTS``.
+
+    Args:
+    -----
+        payload (dict): Job payload.
+
+    Returns:
+    --------
+        None
+    """
+    if not settings.USE_ASYNC_CLIENTS:
+        await sync_to_async(push_job, thread_sensitive=False)(payload)
+        return
+    await get_async_redis().lpush(JOBS_QUEUE, json.dumps(payload))
+
+
+def pop_job(timeout: int = 0) -> dict | None:
+    """
+    Pop the oldest job payload from the jobs queue, blocking until one is available.
+
+    Args:
+    -----
+        timeout (int): Seconds to wait for a job, 0 waits forever.
+
+    Returns:
+    --------
+        dict | None: Job payload or None if the timeout expired.
+    """
+    item = get_redis_connection("default").brpop(JOBS_QUEUE, timeout=timeout)
+    return json.loads(item[1]) if item else None
+
+
+def enqueue_job(name: str, match_id: str, **kwargs) -> dict:
+    """
+    Create a job and queue it for the worker.
+
+    Args:
+    -----
+        name (str): Job name, one of JOB_HANDLERS.
+        match_id (str): Match ID the job is about.
+        **kwargs: Job arguments.
+
+    Returns:
+    --------
+        dict: Job state.
+    """
+    job = update_job(new_job(name, match_id))
+    push_job({"id": job["id"], "name": name, "match_id": match_id, "kwargs": kwargs})
+    return job
+
+
+async def aenqueue_job(name: str, match_id: str, **kwargs) -> dict:
+    """
+    Create a job and queue it for the worker without blocking the event loop.
+
+    Args:
+    -----
+        name (str): Job name, one of JOB_HANDLERS.
+        match_id (str): Match ID the job is about.
+        **kwargs: Job arguments.
+
+    Returns:
+    --------
+        dict: Job state.
+    """
+    job = new_job(name, match_id)
+    await cache.aset(get_job_cache_key(job["id"]), job, timeout=settings.JOB_RESULT_TIMEOUT)
+    await apush_job({"id": job["id"], "name": name, "match_id": match_id, "kwargs": kwargs})
+    return job
+
+
+def new_job(name: str, match_id: str) -> dict:
+    return {
+        "id": uuid.uuid4().hex,
+        "name": name,
+        "match_id": match_id,
+        "status": JobStatus.QUEUED,
+        "result": None,
+        "error": None,
+    }
+
+
+def load_match_job(match_id: str, server_id: str, base_url: str) -> dict:
+    """
+    End the current match on the server and load the match config.
+
+    The config URL and the author token are built here, the queued payload holds no credentials.
+
+    Args:
+    -----
+        match_id (str): Match ID.
+        server_id (str): ID of the server the match is loaded into.
+        base_url (str): Scheme and host of the API, used in the config URL given to the server.
+
+    Returns:
+    --------
+        dict: RCON responses.
+    """
+    from matches.utils import send_rcon_command
+
+    match = Match.objects.only("pk", "author").get(pk=match_id)
+    server = Server.objects.get(pk=server_id)
+    config_url = f"{base_url.rstrip('/')}{reverse('match-config', args=[match.pk])}"
+    args = [f'"{config_url}"', f'"{match.api_key_header}"', f'"Bearer {match.get_author_token()}"']
+    end_match_response = send_rcon_command(server.ip, server.port, server.rcon_password, "css_endmatch")
+    sleep(settings.LOAD_MATCH_DELAY)
+    load_match_response = send_rcon_command(
+        server.ip, server.port, server.rcon_password, match.load_match_command_name, *args
+    )
+    return {"end_match": end_match_response, "load_match": load_match_response}
+
+
+JOB_HANDLERS = {
+    "load_match": load_match_job,
+}
+
+
+def run_job(payload: dict) -> dict:
+    """
+    Run a queued job and publish its result.
+
+    Args:
+    -----
+        payload (dict): Job payload popped from the queue.
+
+    Returns:
+    --------
+        dict: Final job state.
+    """
+    from matches.utils import publish_event
+
+    job = get_job(payload["id"]) or {
+        "id": payload["id"],
+        "name": payload["name"],
+        "match_id": payload["match_id"],
+        "result": None,
+        "error": None,
+    }
+    update_job(job, status=JobStatus.RUNNING)
+    try:
+        result = JOB_HANDLERS[payload["name"]](payload["match_id"], **payload["kwargs"])
+        update_job(job, status=JobStatus.FINISHED, result=result)
+    except Exception as e:
+        update_job(job, status=JobStatus.FAILED, error=repr(e))
+    guild_id = Match.objects.filter(pk=payload["match_id"]).values_list("guild__guild_id", flat=True).first()
+    if guild_id:
+        publish_event(f"event.{guild_id}.{payload['name']}", job, match_id=payload["match_id"])
+    return job
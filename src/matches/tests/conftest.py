@@ -9,8 +9,8 @@ from guilds.tests.conftest import guild, guild_data
 @pytest.fixture
 def map_data():
     return {
-        "name": "Mirage",
-        "tag": "de_mirage"
+        "name": "Dust II",
+        "tag": "de_dust2"
     }
 
 
@@ -0,0 +1,89 @@
+import asyncio
+import os
+
+import pytest
+import redis
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+from matches.cache import (
+    aget_match_config_version,
+    bump_match_configs_versions,
+    delete_cached_matches_guild_ids,
+    get_cached_match_config,
+    get_match_config_version,
+    get_match_guild_cache_key,
+    set_cached_match_config,
+)
+from matches.matchmaking import MATCHMAKING_QUEUES_KEY, MATCHMAKING_TICKETS_KEY, MatchmakingQueue
+
+
+@pytest.fixture
+def redis_cache(settings):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/1"),
+            "KEY_PREFIX": "test_cache",
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+                "SOCKET_CONNECT_TIMEOUT": 1,
+            },
+        },
+    }
+    try:
+        get_redis_connection("default").ping()
+    except redis.ConnectionError:
+        pytest.skip("Redis is unreachable")
+    yield cache
+    cache.delete_pattern("*")
+
+
+@pytest.mark.django_db
+def test_match_config_version_is_bumped(redis_cache):
+    version = get_match_config_version(1)
+    assert get_match_config_version(1) == version
+    assert asyncio.run(aget_match_config_version(1)) == version
+    set_cached_match_config(1, version, {"matchid": 1}, "dc_user_1")
+    assert get_cached_match_config(1)[1]["data"] == {"matchid": 1}
+
+    bump_match_configs_versions([1, 1])
+    assert get_match_config_version(1) == version + 1
+    assert get_cached_match_config(1) == (version + 1, None)
+
+
+@pytest.mark.django_db
+def test_missing_match_config_version_is_recreated(redis_cache):
+    bump_match_configs_versions([2])
+    version = get_match_config_version(2)
+    redis_cache.delete("match_config_version:2")
+    bump_match_configs_versions([2])
+    assert get_match_config_version(2) > version
+
+
+@pytest.mark.django_db
+def test_delete_cached_matches_guild_ids(redis_cache):
+    redis_cache.set_many({get_match_guild_cache_key(match_id): "1" for match_id in (1, 2, 3)})
+    delete_cached_matches_guild_ids([1, 2])
+    assert redis_cache.get_many([get_match_guild_cache_key(match_id) for match_id in (1, 2, 3)]) == {
+        get_match_guild_cache_key(3): "1"
+    }
+
+
+@pytest.mark.django_db
+def test_matchmaking_queue_on_redis(redis_cache, players, guild):
+    queue = MatchmakingQueue(f"test_cache_{guild.pk}", 1)
+    client = get_redis_connection("default")
+    try:
+        queue.enqueue(players[0], 1000, enqueued_at=0)
+        queue.enqueue(players[1], 1010, enqueued_at=1)
+        assert queue.size() == 2
+        assert queue.find_groups(now=2) == [[players[0].id, players[1].id]]
+        assert queue.dequeue(players[0].id)
+        assert queue.size() == 1
+    finally:
+        for player in players[:2]:
+            queue.dequeue(player.id)
+        client.delete(queue.ratings_key, queue.waiting_key)
+        client.srem(MATCHMAKING_QUEUES_KEY, queue.name)
+        client.hdel(MATCHMAKING_TICKETS_KEY, *[player.id for player in players[:2]])
@@ -0,0 +1,247 @@
+import asyncio
+import json
+
+import pytest
+import redis
+from asgiref.sync import async_to_sync
+
+from matches import events
+from matches.events import EventPublisher, EventsMode, get_event_stream_key, get_match_event_stream_key
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+        self.stream_entries = []
+
+    def publish(self, channel, payload):
+        self.commands.append((channel, payload))
+
+    def xadd(self, name, fields, maxlen=None, approximate=True):
+        self.stream_entries.append((name, fields, maxlen))
+
+    def expire(self, name, time):
+        self.client.expirations[name] = time
+
+    def execute(self):
+        if self.client.down:
+            raise redis.ConnectionError("Connection refused")
+        self.client.executions += 1
+        self.client.published.extend(self.commands)
+        for name, fields, maxlen in self.stream_entries:
+            self.client.xadd(name, fields, maxlen=maxlen)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.down = False
+        self.executions = 0
+        self.published = []
+        self.streams = {}
+        self.groups = {}
+        self.expirations = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def xadd(self, name, fields, maxlen=None):
+        stream = self.streams.setdefault(name, [])
+        entry_id = f"{len(stream) + 1}-0".encode()
+        stream.append((entry_id, {key.encode(): value.encode() for key, value in fields.items()}))
+        if maxlen is not None:
+            del stream[:-maxlen]
+        return entry_id
+
+    def xrange(self, name, min="-", max="+", count=None):
+        entries = self.streams.get(name, [])
+        if min != "-":
+            since = tuple(int(part) for part in min.lstrip("(").split("-"))
+            entries = [entry for entry in entries if tuple(int(part) for part in entry[0].split(b"-")) > since]
+        return entries[:count]
+
+    def xgroup_create(self, name, groupname, id="$", mkstream=False):
+        if (name, groupname) in self.groups:
+            raise redis.ResponseError("BUSYGROUP Consumer Group name already exists")
+        self.streams.setdefault(name, [])
+        self.groups[(name, groupname)] = {"last_id": id, "pending": set()}
+
+    def xreadgroup(self, groupname, consumername, streams, count=None, block=None):
+        response = []
+        for name in streams:
+            group = self.groups[(name, groupname)]
+            entries = self.xrange(name, min=f"({group['last_id']}", count=count)
+            if entries:
+                group["last_id"] = entries[-1][0].decode()
+                group["pending"].update(entry_id.decode() for entry_id, _ in entries)
+                response.append([name.encode(), entries])
+        return response
+
+    def xack(self, name, groupname, *ids):
+        pending = self.groups[(name, groupname)]["pending"]
+        acked = pending.intersection(ids)
+        pending.difference_update(acked)
+        return len(acked)
+
+
+class FakeAsyncPipeline(FakePipeline):
+    async def execute(self):
+        super().execute()
+
+
+class FakeAsyncRedis(FakeRedis):
+    def pipeline(self, transaction=True):
+        return FakeAsyncPipeline(self)
+
+
+@pytest.fixture
+def publisher():
+    publisher = EventPublisher("redis://localhost:6379/0", buffer_size=3)
+    publisher.client = FakeRedis()
+    return publisher
+
+
+@pytest.mark.django_db
+def test_publish_event(publisher):
+    assert publisher.publish("event.1.going_live", {"map_number": 0}) is True
+    assert publisher.client.published == [("event.1.going_live", json.dumps({"map_number": 0}))]
+    assert not publisher.buffer
+
+
+@pytest.mark.django_db
+def test_publish_event_buffers_when_redis_is_down(publisher):
+    publisher.client.down = True
+    assert publisher.publish("event.1.round_end", {"round": 1}) is False
+    assert publisher.publish("event.1.round_end", {"round": 2}) is False
+    assert len(publisher.buffer) == 2
+
+    publisher.client.down = False
+    assert publisher.publish("event.1.round_end", {"round": 3}) is True
+    assert [json.loads(payload)["round"] for _, payload in publisher.client.published] == [1, 2, 3]
+    assert publisher.client.executions == 1
+    assert not publisher.buffer
+
+
+@pytest.mark.django_db
+def test_publish_event_buffer_drops_oldest_events(publisher):
+    publisher.client.down = True
+    for round_number in range(5):
+        publisher.publish("event.1.round_end", {"round": round_number})
+    publisher.client.down = False
+    assert publisher.flush() is True
+    assert [json.loads(payload)["round"] for _, payload in publisher.client.published] == [2, 3, 4]
+
+
+@pytest.mark.django_db
+def test_publish_event_with_linger_batches_events(publisher, mocker):
+    publisher.linger = 60
+    start_flusher = mocker.patch.object(publisher, "_start_flusher")
+    for round_number in range(3):
+        assert publisher.publish("event.1.round_end", {"round": round_number}) is True
+    assert start_flusher.call_count == 3
+    assert publisher.client.published == []
+    assert publisher.flush() is True
+    assert publisher.client.executions == 1
+    assert len(publisher.client.published) == 3
+
+
+@pytest.mark.django_db
+def test_publish_event_to_stream(publisher):
+    publisher.mode = EventsMode.STREAM
+    publisher.stream_maxlen = 2
+    for round_number in range(3):
+        publisher.publish("event.1.round_end", {"round": round_number}, match_id=7)
+    assert publisher.client.published == []
+    entries = publisher.client.streams[get_event_stream_key("1")]
+    assert len(entries) == 2
+    assert entries[-1][1] == {b"event": b"round_end", b"match_id": b"7", b"data": json.dumps({"round": 2}).encode()}
+
+
+@pytest.mark.django_db
+def test_publish_event_to_pubsub_and_stream(publisher):
+    publisher.mode = EventsMode.BOTH
+    publisher.publish("event.1.going_live", {"map_number": 0}, match_id=7)
+    assert publisher.client.executions == 1
+    assert len(publisher.client.published) == 1
+    assert len(publisher.client.streams[get_event_stream_key("1")]) == 1
+
+
+@pytest.mark.django_db
+def test_consumer_group_reads_and_acks_events(publisher):
+    publisher.mode = EventsMode.STREAM
+    assert publisher.create_consumer_group("1", "bot") is True
+    assert publisher.create_consumer_group("1", "bot") is False
+    publisher.publish("event.1.going_live", {"map_number": 0}, match_id=7)
+    publisher.publish("event.1.round_end", {"round": 1}, match_id=7)
+
+    events = publisher.read_group("1", "bot", "bot-1")
+    assert [event["event"] for event in events] == ["going_live", "round_end"]
+    assert events[0] == {"id": "1-0", "event": "going_live", "match_id": "7", "data": {"map_number": 0}}
+    assert publisher.read_group("1", "bot", "bot-1") == []
+    assert publisher.ack("1", "bot", *[event["id"] for event in events]) == 2
+
+
+@pytest.mark.django_db
+def test_read_match_events_since(publisher):
+    publisher.mode = EventsMode.STREAM
+    for round_number in range(4):
+        publisher.publish("event.1.round_end", {"round": round_number}, match_id=7 if round_number % 2 else 8)
+
+    events = publisher.read_match_events(7)
+    assert [event["data"]["round"] for event in events] == [1, 3]
+    assert [event["data"]["round"] for event in publisher.read_match_events(7, since=events[0]["id"])] == [3]
+    assert [event["data"]["round"] for event in publisher.read_match_events(7, count=1)] == [1]
+
+
+@pytest.mark.django_db
+def test_publish_event_to_match_stream(publisher):
+    publisher.mode = EventsMode.STREAM
+    publisher.match_stream_ttl = 60
+    publisher.publish("event.1.round_end", {"round": 1}, match_id=7)
+    publisher.publish("event.1.match_updated", {"status": "CREATED"})
+    assert len(publisher.client.streams[get_event_stream_key("1")]) == 2
+    assert len(publisher.client.streams[get_match_event_stream_key("7")]) == 1
+    assert publisher.client.expirations == {get_match_event_stream_key("7"): 60}
+
+
+@pytest.mark.django_db
+def test_get_event_publisher_uses_settings(settings, mocker):
+    mocker.patch.object(events, "_publisher", None)
+    settings.EVENTS_REDIS_URL = "redis://:secret@cache:6380/2"
+    publisher = events.get_event_publisher()
+    assert events.get_event_publisher() is publisher
+    connection_kwargs = publisher.client.connection_pool.connection_kwargs
+    assert connection_kwargs["host"] == "cache"
+    assert connection_kwargs["port"] == 6380
+    assert connection_kwargs["password"] == "secret"
+    assert connection_kwargs["db"] == 2
+
+
+@pytest.mark.django_db
+def test_apublish_event(publisher, mocker, settings):
+    settings.USE_ASYNC_CLIENTS = True
+    async_client = FakeAsyncRedis()
+    mocker.patch.object(publisher, "get_async_client", return_value=async_client)
+    assert asyncio.run(publisher.apublish("event.1.round_end", {"round": 1}, match_id=7)) is True
+    assert async_client.published == [("event.1.round_end", json.dumps({"round": 1}))]
+    assert publisher.client.published == []
+
+    async_client.down = True
+    assert asyncio.run(publisher.apublish("event.1.round_end", {"round": 2})) is False
+    assert len(publisher.buffer) == 1
+
+    # Buffered events are sent first, in order
+    assert asyncio.run(publisher.apublish("event.1.round_end", {"round": 3})) is True
+    assert [json.loads(payload)["round"] for _, payload in publisher.client.published] == [2, 3]
+    assert not publisher.buffer
+
+
+@pytest.mark.django_db
+def test_apublish_event_uses_sync_pool_without_async_clients(publisher, mocker, settings):
+    settings.USE_ASYNC_CLIENTS = False
+    get_async_client = mocker.patch.object(publisher, "get_async_client")
+    # Under WSGI, every async view runs on a new event loop
+    for round_number in range(3):
+        assert async_to_sync(publisher.apublish)("event.1.round_end", {"round": round_number}) is True
+    get_async_client.assert_not_called()
+    assert [json.loads(payload)["round"] for _, payload in publisher.client.published] == [0, 1, 2]
@@ -65,3 +65,10 @@ def test_create_map(client_with_api_key, map_data):
 def test_delete_map(client_with_api_key):
     response = client_with_api_key.delete(f"{API_ENDPOINT}{Map.objects.first().id}/")
     assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+@pytest.mark.django_db
+def test_create_map_with_existing_tag(client_with_api_key):
+    response = client_with_api_key.post(API_ENDPOINT, {"name": "Mirage", "tag": "de_mirage"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "tag" in response.data
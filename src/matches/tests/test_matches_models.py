@@ -4,7 +4,7 @@ from django.test import RequestFactory
 from rest_framework.authtoken.models import Token
 from rest_framework.reverse import reverse_lazy
 
-from matches.models import Match, MatchStatus, MatchType
+from matches.models import Map, MapResult, Match, MatchStatus, MatchType, PlayerMapStats, VetoError
 from servers.tests.conftest import server
 from players.tests.conftest import teams_with_players, default_author
 @pytest.mark.django_db
@@ -72,5 +72,91 @@ def test_match_model(teams_with_players, default_author, with_server, match_type
     assert new_match.api_key_header == "Authorization"
 
 
+@pytest.mark.django_db
+def test_match_veto_without_veto_state(teams_with_players, default_author):
+    team1, team2 = teams_with_players
+    mirage = Map.objects.get_or_create(tag="de_mirage", defaults={"name": "Mirage"})[0]
+    new_match = Match.objects.create(
+        team1=team1, team2=team2, author=default_author.player.discord_user, maplist=["de_mirage", "de_nuke", "de_inferno"]
+    )
+    assert new_match.veto_maps_left == []
+    new_match.ban_map(team1, mirage)
+    new_match.refresh_from_db()
+    assert new_match.veto_maps_left == ["de_nuke", "de_inferno"]
+    assert new_match.veto_banned_maps == ["de_mirage"]
+
+    with pytest.raises(VetoError) as e:
+        new_match.pick_map(team2, mirage)
+    assert e.value.message == "Map de_mirage is not available to be picked"
+    assert new_match.map_picks.count() == 0
+
+
+
+
+
 
+def get_map_result_data(match, map_number=0, kills=20):
+    def team(name, team):
+        return {
+            "name": name,
+            "series_score": 0,
+            "score": 13 if name == "team1" else 7,
+            "score_ct": 7,
+            "score_t": 6 if name == "team1" else 0,
+            "players": [
+                {
+                    "steamid": player.steam_user.steamid64,
+                    "name": player.steam_user.username,
+                    "stats": {"kills": kills, "deaths": "10", "damage": 2100, "rounds_played": 20, "mvp": 3},
+                }
+                for player in team.players.select_related("steam_user")
+            ],
+        }
 
+    return {
+        "matchid": str(match.pk),
+        "event": "map_result",
+        "map_number": map_number,
+        "team1": team("team1", match.team1),
+        "team2": team("team2", match.team2),
+        "winner": {"side": "ct", "team": "team1"},
+    }
+
+
+@pytest.mark.django_db
+def test_create_map_result_from_event(match, django_assert_num_queries):
+    data = get_map_result_data(match)
+    # players, savepoint, stored result, map result, stats, release
+    with django_assert_num_queries(6):
+        map_result, created = MapResult.objects.create_from_event(match.pk, data)
+    assert created
+    assert map_result.team1_score == 13
+    assert map_result.team2_score == 7
+    assert map_result.winner_team == "team1"
+    assert match.map_results.count() == 1
+    stats = match.players_stats.select_related("player__steam_user")
+    assert stats.count() == 10
+    for stat_line in stats:
+        assert stat_line.player.steam_user.steamid64 == stat_line.steamid64
+        assert (stat_line.kills, stat_line.deaths, stat_line.damage, stat_line.rounds_played) == (20, 10, 2100, 20)
+        assert stat_line.stats["mvp"] == 3
+
+
+@pytest.mark.django_db
+def test_create_map_result_from_event_replaces_result(match):
+    MapResult.objects.create_from_event(match.pk, get_map_result_data(match))
+    _, created = MapResult.objects.create_from_event(match.pk, get_map_result_data(match, kills=25))
+    assert not created
+    MapResult.objects.create_from_event(match.pk, get_map_result_data(match, map_number=1))
+    assert list(match.map_results.order_by("map_number").values_list("map_number", flat=True)) == [0, 1]
+    assert PlayerMapStats.objects.filter(match=match).count() == 20
+    assert set(PlayerMapStats.objects.filter(map_result__map_number=0).values_list("kills", flat=True)) == {25}
+
+
+@pytest.mark.django_db
+def test_create_map_result_from_event_unknown_player(match):
+    data = get_map_result_data(match)
+    data["team2"]["players"][0]["steamid"] = "76561190000000000"
+    map_result, _ = MapResult.objects.create_from_event(match.pk, data)
+    stat_line = map_result.players_stats.get(steamid64="76561190000000000")
+    assert stat_line.player is None
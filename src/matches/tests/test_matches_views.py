@@ -1,10 +1,17 @@
+import json
 import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from unittest.mock import patch
 
 from cs2_battle_bot.tests.conftest import api_client, client_with_api_key, client_with_token
-from matches.models import Match, MatchType, MatchStatus, Map
+from matches.models import Match, MatchType, MatchStatus, Map, PlayerGuildStats
 from matches.serializers import MatchSerializer
+from players.models import Player, Team
+from players.steam import refresh_steam_users
+from servers.a2s import get_server_status_cache_key
 from servers.models import Server
 
 API_ENDPOINT = '/api/matches/'
@@ -62,24 +69,89 @@ def test_get_matches_list(client_with_api_key, match, match_with_server):
     assert response.data["results"][0]["id"] == match.pk
     assert response.data["results"][0]["status"] == match.status
     assert response.data["results"][0]["type"] == match.type
-    assert response.data["results"][0]["author"]["id"] == match.author.pk
-    assert response.data["results"][0]["team1"]["id"] == match.team1.pk
-    assert response.data["results"][0]["team2"]["name"] == match.team2.name
-    assert response.data["results"][0]["team2"]["id"] == match.team2.pk
-    assert response.data["results"][0]["team2"]["name"] == match.team2.name
+    assert response.data["results"][0]["author"] == match.author.pk
+    assert response.data["results"][0]["team1"] == match.team1.pk
+    assert response.data["results"][0]["team2"] == match.team2.pk
     assert response.data["results"][0]["players_per_team"] == match.players_per_team
     assert response.data["results"][0]["clinch_series"] == match.clinch_series
     assert response.data["results"][0]["map_sides"] == match.map_sides
     assert response.data["results"][0]["created_at"] is not None
     assert response.data["results"][0]["updated_at"] is not None
+    assert "config" not in response.data["results"][0]
+    assert "load_match_command" not in response.data["results"][0]
 
     assert response.data["results"][1]["id"] == match_with_server.pk
-    assert response.data["results"][1]["server"]["id"] == match_with_server.server.pk
-    assert "rcon_password" not in response.data["results"][1]["server"]
+    assert response.data["results"][1]["server"] == match_with_server.server.pk
+    assert response.data["next"] is None
+    assert response.data["previous"] is None
+
+    assert response.data["results"][0]["guild"] == match.guild.pk
+
+
+@pytest.mark.django_db
+def test_get_matches_list_cursor_pagination(client_with_api_key, match, match_with_server):
+    response = client_with_api_key.get(f"{API_ENDPOINT}?pagination=cursor&expand=team1")
+    assert response.status_code == status.HTTP_200_OK
+    assert "count" not in response.data
+    assert [result["id"] for result in response.data["results"]] == [match.pk, match_with_server.pk]
+    assert response.data["results"][0]["team1"]["id"] == match.team1.pk
     assert response.data["next"] is None
     assert response.data["previous"] is None
 
+
+@pytest.mark.django_db
+def test_get_matches_list_expand(client_with_api_key, match, match_with_server):
+    response = client_with_api_key.get(f"{API_ENDPOINT}?expand=author,team2,server,guild")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"][0]["author"]["id"] == match.author.pk
+    assert response.data["results"][0]["team1"] == match.team1.pk
+    assert response.data["results"][0]["team2"]["id"] == match.team2.pk
+    assert response.data["results"][0]["team2"]["name"] == match.team2.name
     assert response.data["results"][0]["guild"]["id"] == match.guild.pk
+    assert response.data["results"][1]["server"]["id"] == match_with_server.server.pk
+    assert "rcon_password" not in response.data["results"][1]["server"]
+
+
+@pytest.mark.django_db
+def test_get_matches_list_fields(client_with_api_key, match, match_with_server):
+    response = client_with_api_key.get(f"{API_ENDPOINT}?fields=id,status,config_url,team1")
+    assert response.status_code == status.HTTP_200_OK
+    assert set(response.data["results"][0]) == {"id", "status", "config_url", "team1"}
+    assert response.data["results"][0]["config_url"].endswith(f"/api/matches/{match.pk}/config/")
+    assert response.data["results"][0]["team1"]["id"] == match.team1.pk
+
+    response = client_with_api_key.get(f"{API_ENDPOINT}?fields=id,team1&expand=")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"][0] == {"id": match.pk, "team1": match.team1.pk}
+
+
+@pytest.mark.django_db
+def test_get_match_fields(client_with_api_key, match, mocker):
+    get_config = mocker.patch.object(Match, "get_config")
+    get_author_token = mocker.patch.object(Match, "get_author_token")
+    response = client_with_api_key.get(f"{API_ENDPOINT}{match.pk}/?fields=id,maplist,team1&expand=")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {"id": match.pk, "maplist": match.maplist, "team1": match.team1.pk}
+    get_config.assert_not_called()
+    get_author_token.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_get_matches_list_summary_query_count(client_with_api_key, match, match_with_server):
+    cache.clear()
+    with CaptureQueriesContext(connection) as two_matches_queries:
+        response = client_with_api_key.get(API_ENDPOINT)
+    assert response.status_code == status.HTTP_200_OK
+
+    for _ in range(8):
+        Match.objects.create_match(team1=match.team1, team2=match.team2, author=match.author, guild=match.guild)
+    cache.clear()
+    with CaptureQueriesContext(connection) as ten_matches_queries:
+        response = client_with_api_key.get(API_ENDPOINT)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["results"]) == 10
+    # count, matches
+    assert len(ten_matches_queries) == len(two_matches_queries) == 2
 
 
 @pytest.mark.django_db
@@ -160,6 +232,18 @@ def test_create_match_with_server_offline(client_with_api_key, match_data, serve
     assert response.data["message"] == "Server is not online. Cannot create match"
 
 
+@pytest.mark.django_db
+def test_create_match_with_cached_server_status(client_with_api_key, match_data, server, mocker):
+    match_data["server_id"] = server.pk
+    check_online = mocker.patch.object(Server, "check_online", return_value=True)
+    cache.set(get_server_status_cache_key(server.pk), {"online": False})
+    response = client_with_api_key.post(API_ENDPOINT, match_data)
+    cache.delete(get_server_status_cache_key(server.pk))
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data["message"] == "Server is not online. Cannot create match"
+    check_online.assert_not_called()
+
+
 @pytest.mark.django_db
 def test_create_match_with_invalid_server(client_with_api_key, match_data):
     match_data["server_id"] = 999
@@ -611,6 +695,57 @@ def test_match_shuffle_with_invalid_author(client_with_api_key, match):
     assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
+@pytest.mark.django_db
+def test_match_shuffle_balances_ratings(client_with_api_key, match):
+    players = sorted(Player.objects.filter(teams__in=[match.team1, match.team2]).distinct(), key=lambda p: p.id)
+    PlayerGuildStats.objects.bulk_create(
+        [PlayerGuildStats(player=player, guild=match.guild, rating=1000 + i * 100) for i, player in enumerate(players)]
+    )
+    party = [players[-1].discord_user.user_id, players[-2].discord_user.user_id]
+    response = client_with_api_key.post(f"{API_ENDPOINT}{match.pk}/shuffle/", data={
+        "interaction_user_id": match.author.user_id,
+        "parties": [party],
+    }, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    ratings = {player.id: 1000 + i * 100 for i, player in enumerate(players)}
+    teams = [{player["id"] for player in response.data[team]["players"]} for team in ("team1", "team2")]
+    assert {players[-1].id, players[-2].id} <= teams[0] or {players[-1].id, players[-2].id} <= teams[1]
+    assert abs(sum(ratings[i] for i in teams[0]) - sum(ratings[i] for i in teams[1])) <= 100
+
+
+@pytest.mark.django_db
+def test_match_shuffle_with_invalid_party(client_with_api_key, match):
+    response = client_with_api_key.post(f"{API_ENDPOINT}{match.pk}/shuffle/", data={
+        "interaction_user_id": match.author.user_id,
+        "parties": [[match.author.user_id, "123"]],
+    }, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data == {"message": "Party members are not players of the match", "users": ["123"]}
+
+
+@pytest.mark.django_db
+def test_create_match_with_parties(client_with_api_key, match_data):
+    party = match_data["discord_users_ids"][:5]
+    match_data["parties"] = [party]
+    response = client_with_api_key.post(API_ENDPOINT, match_data, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+    teams = [
+        {player["discord_user"]["user_id"] for player in response.data[team]["players"]} for team in ("team1", "team2")
+    ]
+    assert set(party) in teams
+
+    match_data["parties"] = [match_data["discord_users_ids"][:6]]
+    response = client_with_api_key.post(API_ENDPOINT, match_data, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data["message"] == "Party is larger than a team"
+
+    discord_users_ids = match_data["discord_users_ids"]
+    match_data["parties"] = [discord_users_ids[start:start + 3] for start in (0, 3, 6)]
+    response = client_with_api_key.post(API_ENDPOINT, match_data, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data["message"] == "Parties can't be divided into teams of 5 and 5 players"
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize("with_server", [True, False])
 def test_match_recreate(client_with_api_key, match, match_with_server, with_server):
@@ -679,3 +814,326 @@ def test_update_match(client_with_api_key, match, server):
     assert response.data["cvars"] == cvars
     assert response.data["message_id"] == message_id
     assert response.data["server"]["id"] == server_id
+
+
+@pytest.mark.django_db
+def test_get_matches_list_query_count_is_page_size_independent(client_with_api_key, match, match_with_server):
+    mirage = Map.objects.get(tag="de_mirage")
+    match.ban_map(match.team1, mirage)
+    match_with_server.ban_map(match_with_server.team1, mirage)
+    cache.clear()
+    url = f"{API_ENDPOINT}?fields=id,team1,team2,map_bans,last_map_ban,config,load_match_command"
+    with CaptureQueriesContext(connection) as two_matches_queries:
+        response = client_with_api_key.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["results"]) == 2
+
+    for _ in range(8):
+        extra_match = Match.objects.create_match(
+            team1=match.team1,
+            team2=match.team2,
+            author=match.author,
+            guild=match.guild,
+            server=match_with_server.server,
+        )
+        extra_match.ban_map(match.team1, mirage)
+    cache.clear()
+    with CaptureQueriesContext(connection) as ten_matches_queries:
+        response = client_with_api_key.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["results"]) == 10
+    assert response.data["results"][-1]["last_map_ban"]["map"]["tag"] == "de_mirage"
+    assert response.data["results"][-1]["load_match_command"].endswith(f'"Bearer {match.get_author_token()}"')
+    assert len(ten_matches_queries) == len(two_matches_queries)
+
+    with CaptureQueriesContext(connection) as cached_tokens_queries:
+        response = client_with_api_key.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert not any("authtoken_token" in query["sql"] for query in cached_tokens_queries)
+    assert len(cached_tokens_queries) == len(ten_matches_queries) - 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("with_server", [True, False])
+def test_get_match_query_count(client_with_api_key, match, match_with_server, with_server, django_assert_num_queries):
+    match_to_test = match if not with_server else match_with_server
+    match_to_test.ban_map(match_to_test.team1, Map.objects.get(tag="de_mirage"))
+    cache.clear()
+    # match, maps, players of team1/team2/last ban team, bans, bans teams players, picks, author token
+    with django_assert_num_queries(9):
+        response = client_with_api_key.get(f"{API_ENDPOINT}{match_to_test.pk}/")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["config"]["team1"]["players"] == match_to_test.team1.get_players_dict()
+
+
+@pytest.mark.django_db
+def test_load_match(client_with_api_key, match_with_server, mocker):
+    push_job = mocker.patch("matches.tasks.apush_job")
+    response = client_with_api_key.post(f"{API_ENDPOINT}{match_with_server.pk}/load/")
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.data["status"] == "QUEUED"
+    assert response.data["match_id"] == str(match_with_server.pk)
+    payload = push_job.call_args.args[0]
+    assert payload["id"] == response.data["id"]
+    assert payload["name"] == "load_match"
+    assert payload["kwargs"] == {"server_id": match_with_server.server_id, "base_url": "http://testserver/"}
+    assert match_with_server.get_author_token() not in json.dumps(payload)
+
+    status_response = client_with_api_key.get(f"{API_ENDPOINT}{match_with_server.pk}/load/{response.data['id']}/")
+    assert status_response.status_code == status.HTTP_200_OK
+    assert status_response.data == response.data
+
+
+@pytest.mark.django_db
+def test_load_match_without_server(client_with_api_key, match, mocker):
+    push_job = mocker.patch("matches.tasks.apush_job")
+    response = client_with_api_key.post(f"{API_ENDPOINT}{match.pk}/load/")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data["message"] == "Match has no server assigned. Cannot load match"
+    push_job.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_load_match_status_not_found(client_with_api_key, match):
+    response = client_with_api_key.get(f"{API_ENDPOINT}{match.pk}/load/deadbeef/")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_get_match_events(client_with_api_key, match, mocker):
+    read_match_events = mocker.patch(
+        "matches.events.EventPublisher.read_match_events",
+        return_value=[{"id": "2-0", "event": "going_live", "match_id": str(match.pk), "data": {"map_number": 0}}],
+    )
+    response = client_with_api_key.get(f"{API_ENDPOINT}{match.pk}/events/?since=1-0&count=10")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == [{"id": "2-0", "event": "going_live", "match_id": str(match.pk), "data": {"map_number": 0}}]
+    read_match_events.assert_called_once_with(str(match.pk), since="1-0", count=10)
+
+
+@pytest.mark.django_db
+def test_get_match_events_invalid_since(client_with_api_key, match):
+    response = client_with_api_key.get(f"{API_ENDPOINT}{match.pk}/events/?since=abc")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_get_match_events_not_found(client_with_api_key):
+    response = client_with_api_key.get(f"{API_ENDPOINT}999999/events/")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_create_match_query_count_does_not_depend_on_players(client_with_api_key, match_data, players):
+    queries_count = []
+    for discord_users_ids in (match_data["discord_users_ids"][:2], match_data["discord_users_ids"]):
+        Team.objects.filter(name__in=["Team 1", "Team 2"]).delete()
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = client_with_api_key.post(API_ENDPOINT, {**match_data, "discord_users_ids": discord_users_ids})
+        assert response.status_code == status.HTTP_201_CREATED
+        queries_count.append(len(context.captured_queries))
+    assert queries_count[0] == queries_count[1]
+    assert response.data["players_per_team"] == 5
+
+
+@pytest.mark.django_db
+def test_create_match_with_unlinked_player(client_with_api_key, match_data, players):
+    players[3].steam_user = None
+    players[3].save()
+    response = client_with_api_key.post(API_ENDPOINT, match_data)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.data["message"] == f"Discord user {players[3].discord_user.username} has no connected player"
+    assert response.data["user_id"] == players[3].discord_user.user_id
+
+
+@pytest.mark.django_db
+def test_match_join(client_with_api_key, match):
+    player = match.team1.players.exclude(pk=match.team1.leader_id).first()
+    match.team1.players.remove(player)
+    response = client_with_api_key.post(f"{API_ENDPOINT}{match.pk}/join/", data={
+        "interaction_user_id": player.discord_user.user_id
+    })
+    assert response.status_code == status.HTTP_200_OK
+    assert match.team1.players.filter(pk=player.pk).exists()
+
+    response = client_with_api_key.post(f"{API_ENDPOINT}{match.pk}/join/", data={
+        "interaction_user_id": player.discord_user.user_id
+    })
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data["message"] == f"Player {player.steam_user.username} is already in team 1"
+
+
+@pytest.mark.django_db
+def test_match_join_with_invalid_discord_user(client_with_api_key, match):
+    response = client_with_api_key.post(f"{API_ENDPOINT}{match.pk}/join/", data={"interaction_user_id": "1"})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.data["message"] == "Discord user not found"
+
+
+@pytest.mark.django_db
+def test_match_ban_map_query_count_is_constant(client_with_api_key, match):
+    leaders = [match.team1.leader.discord_user.user_id, match.team2.leader.discord_user.user_id]
+    queries_count = set()
+    for step, map_tag in enumerate(["de_anubis", "de_mirage", "de_overpass", "de_ancient"]):
+        with CaptureQueriesContext(connection) as context:
+            response = client_with_api_key.post(f"{API_ENDPOINT}{match.pk}/ban/", {
+                "interaction_user_id": leaders[step % 2],
+                "map_tag": map_tag,
+            })
+        assert response.status_code == status.HTTP_200_OK
+        queries_count.add(len(context.captured_queries))
+    assert len(queries_count) == 1
+
+
+@pytest.mark.django_db
+def test_match_b05_map_veto_flow(client_with_api_key, match):
+    match.type = MatchType.BO5
+    match.save()
+    leaders = [match.team1.leader.discord_user.user_id, match.team2.leader.discord_user.user_id]
+    actions = [
+        ("ban", "de_anubis"),
+        ("ban", "de_overpass"),
+        ("pick", "de_nuke"),
+        ("pick", "de_mirage"),
+        ("pick", "de_ancient"),
+        ("pick", "de_inferno"),
+    ]
+    for step, (action, map_tag) in enumerate(actions):
+        response = client_with_api_key.post(f"{API_ENDPOINT}{match.pk}/{action}/", {
+            "interaction_user_id": leaders[step % 2],
+            "map_tag": map_tag,
+        })
+        assert response.status_code == status.HTTP_200_OK
+
+    response = client_with_api_key.post(f"{API_ENDPOINT}{match.pk}/ban/", {
+        "interaction_user_id": leaders[0],
+        "map_tag": "de_vertigo",
+    })
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data["message"] == "Only one map left. You can't ban more maps"
+    updated_match = Match.objects.get(pk=match.pk)
+    assert updated_match.maplist == ["de_nuke", "de_mirage", "de_ancient", "de_inferno", "de_vertigo"]
+    assert updated_match.map_bans.count() == 2
+    assert updated_match.map_picks.count() == 4
+
+
+@pytest.mark.django_db
+def test_match_ban_map_by_team_member(client_with_api_key, match):
+    member = match.team1.players.exclude(pk=match.team1.leader_id).first()
+    response = client_with_api_key.post(f"{API_ENDPOINT}{match.pk}/ban/", {
+        "interaction_user_id": member.discord_user.user_id,
+        "map_tag": "de_mirage",
+    })
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data["message"] == f"User {member.discord_user.username} is not the leader of team {match.team1.name}"
+
+
+@pytest.mark.django_db
+def test_match_ban_map_reads_and_writes_veto_state_once(client_with_api_key, match):
+    with CaptureQueriesContext(connection) as context:
+        response = client_with_api_key.post(f"{API_ENDPOINT}{match.pk}/ban/", {
+            "interaction_user_id": match.team1.leader.discord_user.user_id,
+            "map_tag": "de_mirage",
+        })
+    assert response.status_code == status.HTTP_200_OK
+    match_queries = [query["sql"] for query in context.captured_queries if 'FROM "matches_match"' in query["sql"]
+                     or query["sql"].startswith('UPDATE "matches_match"')]
+    assert len(match_queries) == 2
+    updated_match = Match.objects.get(pk=match.pk)
+    assert updated_match.veto_step == 1
+    assert updated_match.veto_banned_maps == ["de_mirage"]
+    assert updated_match.veto_maps_left == response.data["maps_left"]
+    assert updated_match.maplist == updated_match.veto_picked_maps + updated_match.veto_maps_left
+
+
+@pytest.mark.django_db
+def test_get_match_config_is_cached(client_with_token, match):
+    response = client_with_token.get(f"{API_ENDPOINT}{match.pk}/config/")
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["ETag"]
+
+    with CaptureQueriesContext(connection) as context:
+        cached_response = client_with_token.get(f"{API_ENDPOINT}{match.pk}/config/")
+    assert cached_response.status_code == status.HTTP_200_OK
+    assert cached_response.data == response.data
+    assert cached_response.headers["ETag"] == etag
+    assert not [query for query in context.captured_queries if "matches_" in query["sql"] or "players_team" in query["sql"]]
+
+    not_modified_response = client_with_token.get(f"{API_ENDPOINT}{match.pk}/config/", HTTP_IF_NONE_MATCH=etag)
+    assert not_modified_response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not_modified_response.headers["ETag"] == etag
+    assert not not_modified_response.content
+
+
+@pytest.mark.django_db
+def test_get_match_config_is_invalidated_by_veto(client_with_token, client_with_api_key, match):
+    etag = client_with_token.get(f"{API_ENDPOINT}{match.pk}/config/").headers["ETag"]
+    client_with_api_key.post(f"{API_ENDPOINT}{match.pk}/ban/", {
+        "interaction_user_id": match.team1.leader.discord_user.user_id,
+        "map_tag": "de_mirage",
+    })
+    response = client_with_token.get(f"{API_ENDPOINT}{match.pk}/config/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+    assert "de_mirage" not in response.data["maplist"]
+
+
+@pytest.mark.django_db
+def test_get_match_config_is_invalidated_by_team_change(client_with_token, match):
+    response = client_with_token.get(f"{API_ENDPOINT}{match.pk}/config/")
+    player = match.team2.players.exclude(pk=match.team2.leader_id).first()
+    match.team2.players.remove(player)
+    updated_response = client_with_token.get(f"{API_ENDPOINT}{match.pk}/config/")
+    assert updated_response.headers["ETag"] != response.headers["ETag"]
+    assert player.steam_user.steamid64 not in updated_response.data["team2"]["players"]
+
+    player.steam_user.username = "renamed"
+    player.steam_user.save()
+    match.team1.players.add(player)
+    response = client_with_token.get(f"{API_ENDPOINT}{match.pk}/config/")
+    assert response.data["team1"]["players"][player.steam_user.steamid64] == "renamed"
+
+
+@pytest.mark.django_db
+def test_get_match_config_is_invalidated_by_steam_profiles_refresh(client_with_token, match, mocker, settings):
+    settings.STEAM_PROFILE_REFRESH_AGE = 0
+    steam_user = match.team1.leader.steam_user
+    webapi = mocker.Mock()
+    webapi.call.return_value = {
+        "response": {
+            "players": [{
+                "steamid": steam_user.steamid64,
+                "personaname": "refreshed",
+                "profileurl": steam_user.profile_url,
+                "avatarfull": steam_user.avatar,
+            }]
+        }
+    }
+    mocker.patch("players.steam.get_steam_webapi", return_value=webapi)
+    response = client_with_token.get(f"{API_ENDPOINT}{match.pk}/config/")
+    assert response.data["team1"]["players"][steam_user.steamid64] == steam_user.username
+
+    assert refresh_steam_users(min_interval=0) > 0
+    updated_response = client_with_token.get(f"{API_ENDPOINT}{match.pk}/config/")
+    assert updated_response.headers["ETag"] != response.headers["ETag"]
+    assert updated_response.data["team1"]["players"][steam_user.steamid64] == "refreshed"
+
+
+@pytest.mark.django_db
+def test_get_match_config_cached_for_author_only(client_with_token, api_client, match, players):
+    client_with_token.get(f"{API_ENDPOINT}{match.pk}/config/")
+    match.author = players[3].discord_user
+    match.save(update_fields=["author"])
+    response = client_with_token.get(f"{API_ENDPOINT}{match.pk}/config/")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_async_action_checks_permissions_and_methods(api_client, client_with_api_key, match):
+    response = api_client.post(f"{API_ENDPOINT}{match.pk}/load/")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    response = client_with_api_key.get(f"{API_ENDPOINT}{match.pk}/load/")
+    assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+    response = client_with_api_key.options(f"{API_ENDPOINT}{match.pk}/load/")
+    assert response.status_code == status.HTTP_200_OK
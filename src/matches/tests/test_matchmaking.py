@@ -0,0 +1,286 @@
+import pytest
+from rest_framework import status
+
+from cs2_battle_bot.tests.conftest import client_with_api_key
+from matches.matchmaking import (
+    MATCHMAKING_TICKETS_KEY,
+    MatchmakingQueue,
+    QueueError,
+    create_queued_match,
+    join_queue,
+    run_matchmaking,
+)
+from matches.models import Match, PlayerGuildStats
+from servers.models import Server
+
+GUILDS_API_ENDPOINT = "/api/guilds/"
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return command
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.hashes = {}
+        self.sets = {}
+        self.zsets = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def hsetnx(self, name, key, value):
+        values = self.hashes.setdefault(name, {})
+        if key in values:
+            return 0
+        values[key] = value.encode()
+        return 1
+
+    def hget(self, name, key):
+        return self.hashes.get(name, {}).get(key)
+
+    def hmget(self, name, keys):
+        return [self.hget(name, key) for key in keys]
+
+    def hdel(self, name, *keys):
+        values = self.hashes.get(name, {})
+        return sum(values.pop(key, None) is not None for key in keys)
+
+    def sadd(self, name, *values):
+        self.sets.setdefault(name, set()).update(values)
+
+    def smembers(self, name):
+        return {value.encode() for value in self.sets.get(name, set())}
+
+    def zadd(self, name, mapping, nx=False):
+        zset = self.zsets.setdefault(name, {})
+        added = 0
+        for member, score in mapping.items():
+            if nx and member in zset:
+                continue
+            added += member not in zset
+            zset[member] = float(score)
+        return added
+
+    def zscore(self, name, member):
+        return self.zsets.get(name, {}).get(member)
+
+    def zmscore(self, name, members):
+        return [self.zscore(name, member) for member in members]
+
+    def zrem(self, name, *members):
+        zset = self.zsets.get(name, {})
+        return sum(zset.pop(member, None) is not None for member in members)
+
+    def zcard(self, name):
+        return len(self.zsets.get(name, {}))
+
+    def sorted_items(self, name):
+        return sorted(self.zsets.get(name, {}).items(), key=lambda item: (item[1], item[0]))
+
+    def zrank(self, name, member):
+        members = [item[0] for item in self.sorted_items(name)]
+        return members.index(member) if member in members else None
+
+    def zrange(self, name, start, end, withscores=False):
+        items = [(member.encode(), score) for member, score in self.sorted_items(name)]
+        return items[start:None if end == -1 else end + 1]
+
+    def zrangebyscore(self, name, min, max, start=None, num=None, withscores=False):
+        items = [(member.encode(), score) for member, score in self.sorted_items(name) if min <= score <= max]
+        return items[start:start + num]
+
+    def zrevrangebyscore(self, name, max, min, start=None, num=None, withscores=False):
+        items = [(member.encode(), score) for member, score in self.sorted_items(name) if min <= score <= max]
+        return items[::-1][start:start + num]
+
+
+@pytest.fixture
+def redis_client(mocker):
+    client = FakeRedis()
+    mocker.patch("matches.matchmaking.get_redis_connection", return_value=client)
+    return client
+
+
+@pytest.mark.django_db
+def test_enqueue_and_dequeue(redis_client, players, guild):
+    queue = MatchmakingQueue(guild.pk, 5)
+    ticket = queue.enqueue(players[0], 1100, enqueued_at=10)
+    assert ticket.rating == 1100
+    assert ticket.discord_user_id == players[0].discord_user.user_id
+    # Joining again keeps the place in the queue
+    assert queue.enqueue(players[0], 1200, enqueued_at=20).enqueued_at == 10
+    queue.enqueue(players[1], 1000, enqueued_at=15)
+    assert queue.size() == 2
+    assert queue.position(players[1].id) == 1
+
+    with pytest.raises(QueueError) as e:
+        MatchmakingQueue(guild.pk, 2).enqueue(players[0], 1100)
+    assert e.value.status == 409
+
+    assert queue.dequeue(players[0].id)
+    assert not queue.dequeue(players[0].id)
+    assert queue.size() == 1
+    assert redis_client.hget(MATCHMAKING_TICKETS_KEY, players[0].id) is None
+
+
+@pytest.mark.django_db
+def test_join_queue_uses_guild_rating(redis_client, players, guild):
+    PlayerGuildStats.objects.create(player=players[0], guild=guild, rating=1234)
+    assert join_queue(guild, players[0], 5).rating == 1234
+    assert join_queue(guild, players[1], 5).rating == 1000
+
+
+@pytest.mark.django_db
+def test_find_groups_matches_close_ratings(redis_client, players, guild):
+    queue = MatchmakingQueue(guild.pk, 4)
+    ratings = [1000, 1500, 1010, 990, 1020, 980, 1030, 970, 1040, 960]
+    for i, (player, rating) in enumerate(zip(players, ratings)):
+        queue.enqueue(player, rating, enqueued_at=i)
+    groups = queue.find_groups(now=len(players))
+    assert len(groups) == 1
+    group = groups[0]
+    assert group[0] == players[0].id
+    assert len(group) == 8
+    assert players[1].id not in group
+    assert set(group) >= {player.id for player in players[2:8]}
+
+
+@pytest.mark.django_db
+def test_find_groups_widens_window_with_wait_time(redis_client, players, guild, settings):
+    settings.MATCHMAKING_RATING_WINDOW = 100
+    settings.MATCHMAKING_RATING_WINDOW_GROWTH = 5
+    queue = MatchmakingQueue(guild.pk, 1)
+    queue.enqueue(players[0], 1000, enqueued_at=0)
+    queue.enqueue(players[1], 1300, enqueued_at=1)
+    assert queue.find_groups(now=10) == []
+    assert queue.find_groups(now=40) == [[players[0].id, players[1].id]]
+
+
+@pytest.mark.django_db
+def test_run_matchmaking_creates_match(redis_client, players, guild, server, mocker):
+    mocker.patch.object(Server, "is_online", return_value=True)
+    queue = MatchmakingQueue(guild.pk, 5)
+    for i, player in enumerate(players[:10]):
+        queue.enqueue(player, 1000 + i, enqueued_at=i)
+
+    matches = run_matchmaking(now=10)
+    assert len(matches) == 1
+    match = Match.objects.select_related("team1", "team2").get(pk=matches[0].pk)
+    assert match.server == server
+    assert match.guild == guild
+    assert match.author == players[0].discord_user
+    assert match.team1.players.count() == match.team2.players.count() == 5
+    assert match.cvars["matchzy_remote_log_url"] == f"http://localhost:8000/api/matches/{match.pk}/webhook/"
+    assert queue.size() == 0
+    assert redis_client.hashes[MATCHMAKING_TICKETS_KEY] == {}
+
+
+@pytest.mark.django_db
+def test_run_matchmaking_creates_matches_with_own_teams(redis_client, players, guild, server, mocker):
+    mocker.patch.object(Server, "is_online", return_value=True)
+    Server.objects.create(name="Second server", ip="127.0.0.2", port=27015, password="", guild=guild)
+    queue = MatchmakingQueue(guild.pk, 1)
+    for i, rating in enumerate([1000, 1010, 2000, 2010]):
+        queue.enqueue(players[i], rating, enqueued_at=0)
+
+    matches = run_matchmaking(now=1)
+    assert len(matches) == 2
+    rosters = [
+        set(team.players.values_list("id", flat=True))
+        for match in Match.objects.select_related("team1", "team2").filter(pk__in=[match.pk for match in matches])
+        for team in (match.team1, match.team2)
+    ]
+    assert len({match.team1_id for match in matches} | {match.team2_id for match in matches}) == 4
+    assert set.union(*rosters) == {player.id for player in players[:4]}
+    assert sum(len(roster) for roster in rosters) == 4
+
+
+@pytest.mark.django_db
+def test_run_matchmaking_waits_for_server(redis_client, players, guild, server, mocker):
+    mocker.patch.object(Server, "is_online", return_value=False)
+    queue = MatchmakingQueue(guild.pk, 1)
+    queue.enqueue(players[0], 1000, enqueued_at=0)
+    queue.enqueue(players[1], 1000, enqueued_at=1)
+    assert run_matchmaking(now=2) == []
+    assert queue.size() == 2
+    assert not Match.objects.exists()
+
+
+@pytest.mark.django_db
+def test_run_matchmaking_requeues_rejected_group(redis_client, players, guild, server, mocker):
+    mocker.patch.object(Server, "is_online", return_value=True)
+    queue = MatchmakingQueue(guild.pk, 1)
+    queue.enqueue(players[0], 1000, enqueued_at=0)
+    queue.enqueue(players[1], 1000, enqueued_at=1)
+    players[1].discord_user.delete()
+    assert run_matchmaking(now=2) == []
+    assert queue.size() == 2
+    assert queue.position(players[0].id) == 0
+
+
+
+@pytest.mark.django_db
+def test_run_matchmaking_requeues_invalid_match_type(redis_client, players, guild, server, mocker, settings):
+    settings.MATCHMAKING_MATCH_TYPE = "BO2"
+    mocker.patch.object(Server, "is_online", return_value=True)
+    queue = MatchmakingQueue(guild.pk, 1)
+    queue.enqueue(players[0], 1000, enqueued_at=0)
+    queue.enqueue(players[1], 1000, enqueued_at=1)
+    assert run_matchmaking(now=2) == []
+    assert queue.size() == 2
+
+
+@pytest.mark.django_db
+def test_create_queued_match_requeues_on_failure(redis_client, players, guild, server, mocker):
+    queue = MatchmakingQueue(guild.pk, 1)
+    queue.enqueue(players[0], 1000, enqueued_at=0)
+    queue.enqueue(players[1], 1000, enqueued_at=1)
+    server_id = server.pk
+    server.delete()
+    assert create_queued_match(queue, guild, [players[0].id, players[1].id], Server(pk=server_id)) is None
+    assert queue.size() == 2
+    assert queue.position(players[0].id) == 0
+
+    mocker.patch("matches.matchmaking.create_new_match", side_effect=RuntimeError)
+    assert create_queued_match(queue, guild, [players[0].id, players[1].id], Server(pk=server_id)) is None
+    assert queue.size() == 2
+    assert not Match.objects.exists()
+
+
+@pytest.mark.django_db
+def test_guild_queue_endpoint(client_with_api_key, redis_client, players, guild):
+    url = f"{GUILDS_API_ENDPOINT}{guild.guild_id}/queue/"
+    data = {"interaction_user_id": players[0].discord_user.user_id, "players_per_team": 2}
+    response = client_with_api_key.post(url, data, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["player_id"] == players[0].id
+    assert response.data["position"] == 0
+    assert response.data["queue_size"] == 1
+    assert response.data["rating"] == 1000
+
+    response = client_with_api_key.post(
+        url, {"interaction_user_id": players[0].discord_user.user_id}, format="json"
+    )
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    response = client_with_api_key.delete(url, data, format="json")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    response = client_with_api_key.delete(url, data, format="json")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = client_with_api_key.post(url, {"interaction_user_id": "123"}, format="json")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.data["message"] == "Discord user not found"
@@ -0,0 +1,163 @@
+import pytest
+from rest_framework import status
+
+from cs2_battle_bot.tests.conftest import client_with_token
+from matches.models import MapResult, MatchStatus, PlayerGuildStats
+from matches.ratings import get_expected_score, update_map_ratings, update_series_stats
+from matches.tests.test_matches_models import get_map_result_data
+from matches.utils import finish_series, store_map_result
+from players.models import DiscordUser, Player
+
+API_ENDPOINT = "/api/matches/"
+
+
+def get_guild_stats(match):
+    return {stats.player_id: stats for stats in PlayerGuildStats.objects.filter(guild=match.guild)}
+
+
+@pytest.mark.django_db
+def test_get_expected_score():
+    assert get_expected_score(1000, 1000) == 0.5
+    assert get_expected_score(1200, 1000) + get_expected_score(1000, 1200) == pytest.approx(1)
+    assert get_expected_score(1200, 1000) > 0.5
+
+
+@pytest.mark.django_db
+def test_update_map_ratings(match, settings):
+    settings.RATING_K_FACTOR = 32
+    map_result, _ = MapResult.objects.create_from_event(match.pk, get_map_result_data(match))
+    update_map_ratings(map_result)
+    stats = get_guild_stats(match)
+    assert len(stats) == 10
+    winners = set(match.team1.players.values_list("id", flat=True))
+    for player_id, player_stats in stats.items():
+        if player_id in winners:
+            assert player_stats.rating == 1016
+            assert player_stats.maps_won == 1
+        else:
+            assert player_stats.rating == 984
+            assert player_stats.maps_won == 0
+        assert player_stats.maps_played == 1
+        assert player_stats.kills == 20
+        assert player_stats.deaths == 10
+        assert player_stats.rounds_played == 20
+        assert player_stats.adr == 105
+        assert player_stats.kd == 2
+
+    map_result, _ = MapResult.objects.create_from_event(match.pk, get_map_result_data(match, map_number=1))
+    update_map_ratings(map_result)
+    stats = get_guild_stats(match)
+    for player_id, player_stats in stats.items():
+        assert player_stats.maps_played == 2
+        assert player_stats.kills == 40
+        if player_id in winners:
+            # Favourites gain less than on the first map
+            assert 1016 < player_stats.rating < 1032
+        else:
+            assert 968 < player_stats.rating < 984
+    assert sum(player_stats.rating for player_stats in stats.values()) == pytest.approx(10_000)
+
+
+@pytest.mark.django_db
+def test_update_map_ratings_without_guild(match):
+    match.guild = None
+    match.save()
+    map_result, _ = MapResult.objects.create_from_event(match.pk, get_map_result_data(match))
+    assert update_map_ratings(map_result) == []
+    assert not PlayerGuildStats.objects.exists()
+
+
+@pytest.mark.django_db
+def test_update_series_stats(match):
+    MapResult.objects.create_from_event(match.pk, get_map_result_data(match))
+    update_series_stats(match, "team2")
+    stats = get_guild_stats(match)
+    assert len(stats) == 10
+    winners = set(match.team2.players.values_list("id", flat=True))
+    for player_id, player_stats in stats.items():
+        assert player_stats.matches_played == 1
+        assert player_stats.matches_won == (1 if player_id in winners else 0)
+        assert player_stats.rating == 1000
+
+
+@pytest.mark.django_db
+def test_update_series_stats_credits_players_of_the_maps(match, players):
+    MapResult.objects.create_from_event(match.pk, get_map_result_data(match))
+    played = {player.id for player in players}
+    substitute = Player.objects.create(discord_user=DiscordUser.objects.create(user_id="1", username="substitute"))
+    match.team1.players.add(substitute)
+    update_series_stats(match, "team1")
+    stats = get_guild_stats(match)
+    assert set(stats) == played
+    winners = set(match.team1.players.exclude(pk=substitute.pk).values_list("id", flat=True))
+    assert {player_id for player_id, player_stats in stats.items() if player_stats.matches_won} == winners
+
+
+@pytest.mark.django_db
+def test_update_series_stats_without_maps(match):
+    assert update_series_stats(match, "team1") == []
+
+
+@pytest.mark.django_db
+def test_webhook_updates_stats_once(client_with_token, match, mocker):
+    mocker.patch("matches.utils.apublish_event")
+    url = f"{API_ENDPOINT}{match.pk}/webhook/"
+    map_result = get_map_result_data(match)
+    for _ in range(2):
+        response = client_with_token.post(url, map_result, format="json")
+        assert response.status_code == status.HTTP_200_OK
+    series_end = {
+        "matchid": str(match.pk),
+        "event": "series_end",
+        "team1_series_score": 1,
+        "team2_series_score": 0,
+        "winner": {"side": "ct", "team": "team1"},
+        "time_until_restore": 10,
+    }
+    for _ in range(2):
+        response = client_with_token.post(url, series_end, format="json")
+        assert response.status_code == status.HTTP_200_OK
+    stats = get_guild_stats(match)
+    assert len(stats) == 10
+    assert all(player_stats.maps_played == 1 for player_stats in stats.values())
+    assert all(player_stats.kills == 20 for player_stats in stats.values())
+    assert all(player_stats.matches_played == 1 for player_stats in stats.values())
+    assert sum(player_stats.matches_won for player_stats in stats.values()) == 5
+
+
+@pytest.mark.django_db
+def test_update_map_ratings_once(match):
+    map_result, _ = MapResult.objects.create_from_event(match.pk, get_map_result_data(match))
+    assert len(update_map_ratings(map_result)) == 10
+    assert update_map_ratings(map_result) == []
+    assert all(player_stats.maps_played == 1 for player_stats in get_guild_stats(match).values())
+
+    # A replaced result stays rated
+    map_result, created = MapResult.objects.create_from_event(match.pk, get_map_result_data(match, kills=25))
+    assert not created
+    assert map_result.rated
+    assert update_map_ratings(map_result) == []
+
+
+@pytest.mark.django_db
+def test_store_map_result_rates_retry_after_failure(match, mocker):
+    data = get_map_result_data(match)
+    mocker.patch("matches.ratings.lock_players_stats", side_effect=RuntimeError)
+    with pytest.raises(RuntimeError):
+        store_map_result(match.pk, data)
+    assert not MapResult.objects.get(match=match).rated
+    mocker.stopall()
+
+    map_result = store_map_result(match.pk, data)
+    assert map_result.rated
+    assert all(player_stats.maps_played == 1 for player_stats in get_guild_stats(match).values())
+
+
+@pytest.mark.django_db
+def test_finish_series_once(match):
+    MapResult.objects.create_from_event(match.pk, get_map_result_data(match))
+    assert finish_series(match, "team1")
+    assert not finish_series(match, "team1")
+    match.refresh_from_db()
+    assert match.status == MatchStatus.FINISHED
+    assert all(player_stats.matches_played == 1 for player_stats in get_guild_stats(match).values())
@@ -0,0 +1,91 @@
+import asyncio
+import io
+
+import pytest
+from django.core.management import call_command
+
+from matches.tasks import JobStatus, aenqueue_job, apush_job, enqueue_job, get_job, run_job
+
+
+@pytest.mark.django_db
+def test_run_load_match_job(match_with_server, mocker):
+    push_job = mocker.patch("matches.tasks.push_job")
+    sleep = mocker.patch("matches.tasks.sleep")
+    send_rcon_command = mocker.patch("matches.utils.send_rcon_command", side_effect=["ended", "loaded"])
+    publish_event = mocker.patch("matches.utils.publish_event")
+    server = match_with_server.server
+
+    job = enqueue_job("load_match", match_with_server.pk, server_id=server.pk, base_url="http://testserver/")
+    assert get_job(job["id"])["status"] == JobStatus.QUEUED
+
+    job = run_job(push_job.call_args.args[0])
+    assert job["status"] == JobStatus.FINISHED
+    assert job["result"] == {"end_match": "ended", "load_match": "loaded"}
+    assert get_job(job["id"]) == job
+    sleep.assert_called_once()
+    send_rcon_command.assert_any_call(server.ip, server.port, server.rcon_password, "css_endmatch")
+    send_rcon_command.assert_any_call(
+        server.ip,
+        server.port,
+        server.rcon_password,
+        "matchzy_loadmatch_url",
+        f'"http://testserver/api/matches/{match_with_server.pk}/config/"',
+        '"Authorization"',
+        f'"Bearer {match_with_server.get_author_token()}"',
+    )
+    publish_event.assert_called_once_with(
+        f"event.{match_with_server.guild.guild_id}.load_match", job, match_id=match_with_server.pk
+    )
+
+
+@pytest.mark.django_db
+def test_run_load_match_job_failure(match_with_server, mocker):
+    push_job = mocker.patch("matches.tasks.push_job")
+    mocker.patch("matches.tasks.sleep")
+    mocker.patch("matches.utils.send_rcon_command", side_effect=ConnectionRefusedError)
+    publish_event = mocker.patch("matches.utils.publish_event")
+
+    enqueue_job("load_match", match_with_server.pk, server_id=match_with_server.server_id, base_url="http://testserver/")
+    job = run_job(push_job.call_args.args[0])
+    assert job["status"] == JobStatus.FAILED
+    assert "ConnectionRefusedError" in job["error"]
+    publish_event.assert_called_once()
+
+
+@pytest.mark.django_db
+def test_aenqueue_job(match_with_server, mocker):
+    apush_job = mocker.patch("matches.tasks.apush_job")
+    job = asyncio.run(aenqueue_job("load_match", match_with_server.pk, server_id=match_with_server.server_id, base_url="/"))
+    assert get_job(job["id"]) == job
+    assert job["status"] == JobStatus.QUEUED
+    payload = apush_job.call_args.args[0]
+    assert payload == {
+        "id": job["id"],
+        "name": "load_match",
+        "match_id": match_with_server.pk,
+        "kwargs": {"server_id": match_with_server.server_id, "base_url": "/"},
+    }
+
+
+@pytest.mark.django_db
+def test_apush_job_uses_sync_pool_without_async_clients(mocker, settings):
+    settings.USE_ASYNC_CLIENTS = False
+    push_job = mocker.patch("matches.tasks.push_job")
+    get_async_redis = mocker.patch("matches.tasks.get_async_redis")
+    asyncio.run(apush_job({"id": "1"}))
+    push_job.assert_called_once_with({"id": "1"})
+    get_async_redis.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_run_worker_closes_old_connections_around_jobs(mocker):
+    payload = {"id": "1", "name": "load_match", "match_id": "1", "kwargs": {}}
+    mocker.patch("matches.management.commands.run_worker.pop_job", side_effect=[payload, None])
+    close_old_connections = mocker.patch("matches.management.commands.run_worker.close_old_connections")
+    run_job = mocker.patch(
+        "matches.management.commands.run_worker.run_job",
+        side_effect=lambda payload: close_old_connections.assert_called_once() or {**payload, "status": "FINISHED"},
+    )
+    call_command("run_worker", burst=True, stdout=io.StringIO())
+    run_job.assert_called_once_with(payload)
+    assert close_old_connections.call_count == 2
@@ -0,0 +1,31 @@
+import pytest
+
+from matches.models import MatchType
+from matches.veto import VetoAction, VetoError, get_veto_sequence
+
+BAN, PICK = VetoAction.BAN, VetoAction.PICK
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("match_type, maps_count, sequence", [
+    (MatchType.BO1, 7, (BAN, BAN, BAN, BAN, BAN, BAN)),
+    (MatchType.BO3, 7, (BAN, BAN, PICK, PICK, BAN, BAN)),
+    (MatchType.BO5, 7, (BAN, BAN, PICK, PICK, PICK, PICK)),
+    (MatchType.BO3, 3, (PICK, PICK)),
+    (MatchType.BO3, 4, (BAN, PICK, PICK)),
+    (MatchType.BO5, 5, (PICK, PICK, PICK, PICK)),
+    (MatchType.BO1, 1, ()),
+])
+def test_get_veto_sequence(match_type, maps_count, sequence):
+    assert get_veto_sequence(match_type, maps_count) == sequence
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("match_type, maps_count", [
+    (MatchType.BO1, 0),
+    (MatchType.BO3, 2),
+    (MatchType.BO5, 4),
+])
+def test_get_veto_sequence_not_enough_maps(match_type, maps_count):
+    with pytest.raises(VetoError):
+        get_veto_sequence(match_type, maps_count)
@@ -0,0 +1,246 @@
+import asyncio
+import copy
+
+import httpx
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers, status
+
+from cs2_battle_bot.asgi import application
+from cs2_battle_bot.tests.conftest import client_with_token
+from matches.cache import get_match_guild_cache_key
+from matches.models import Match, MatchStatus
+from matches.serializers import (
+    MatchEventEnum,
+    MatchEventGoingLiveSerializer,
+    MatchEventMapResultSerializer,
+    MatchEventSeriesEndSerializer,
+    MatchEventSeriesStartSerializer,
+)
+from matches.webhook import WEBHOOK_EVENTS_SCHEMAS, get_match_guild_id, get_serializer_schema, validate_webhook_event
+
+API_ENDPOINT = "/api/matches/"
+
+MAP_RESULT_TEAM = {
+    "name": "team1",
+    "series_score": 1,
+    "score": 13,
+    "score_ct": "7",
+    "score_t": 6,
+    "players": [
+        {"steamid": 76561198000000001, "name": " player1 ", "stats": {"kills": 20, "deaths": 10}},
+        {"steamid": "76561198000000002", "name": "player2", "stats": {}},
+    ],
+}
+EVENTS_PAYLOADS = {
+    MatchEventEnum.SERIES_START: (
+        MatchEventSeriesStartSerializer,
+        {"event": "series_start", "num_maps": 3, "team1": {"name": "team1"}, "team2": {"name": "team2"}},
+    ),
+    MatchEventEnum.SERIES_END: (
+        MatchEventSeriesEndSerializer,
+        {
+            "event": "series_end",
+            "team1_series_score": 2,
+            "team2_series_score": 1.0,
+            "winner": {"side": "ct", "team": "team1"},
+            "time_until_restore": 10,
+        },
+    ),
+    MatchEventEnum.MAP_RESULT: (
+        MatchEventMapResultSerializer,
+        {
+            "event": "map_result",
+            "map_number": 0,
+            "team1": MAP_RESULT_TEAM,
+            "team2": {
+                **MAP_RESULT_TEAM,
+                "name": "team2",
+                "players": [{"steamid": "76561198000000003", "name": "player3", "stats": {"kills": 5}}],
+            },
+            "winner": {"side": "t", "team": "team2"},
+            "extra": "ignored",
+        },
+    ),
+    MatchEventEnum.GOING_LIVE: (MatchEventGoingLiveSerializer, {"event": "going_live", "map_number": "1"}),
+}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("event", EVENTS_PAYLOADS.keys())
+def test_validate_webhook_event_matches_serializer(event):
+    serializer_class, payload = EVENTS_PAYLOADS[event]
+    payload = {"matchid": 1, **payload}
+    serializer = serializer_class(data=payload)
+    assert serializer.is_valid()
+    validated_event, data = validate_webhook_event(payload)
+    assert validated_event == event
+    assert data == serializer.validated_data
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"map_number": "one"},
+        {"map_number": None},
+        {"team1": "team1"},
+        {"team1": {**MAP_RESULT_TEAM, "players": [{"steamid": "1", "name": "", "stats": []}]}},
+        {"team2": {**MAP_RESULT_TEAM, "players": "player1"}},
+        {"winner": {"side": True, "team": "team2"}},
+        {"winner": {"side": "ct\x00", "team": "team2"}},
+        {"winner": {"side": "ct", "team": "team\ud800"}},
+    ],
+)
+def test_validate_webhook_event_errors_match_serializer(changes):
+    payload = {"matchid": "1", **copy.deepcopy(EVENTS_PAYLOADS[MatchEventEnum.MAP_RESULT][1]), **changes}
+    serializer = MatchEventMapResultSerializer(data=payload)
+    assert not serializer.is_valid()
+    with pytest.raises(Exception) as e:
+        validate_webhook_event(payload)
+    assert e.value.detail == serializer.errors
+
+
+@pytest.mark.django_db
+def test_validate_webhook_event_missing_fields():
+    with pytest.raises(Exception) as e:
+        validate_webhook_event({"event": "going_live"})
+    assert e.value.detail == {"matchid": ["This field is required."], "map_number": ["This field is required."]}
+
+
+@pytest.mark.django_db
+def test_webhook_schemas_are_generated_from_serializers():
+    assert WEBHOOK_EVENTS_SCHEMAS[MatchEventEnum.SERIES_END] == {
+        "matchid": str,
+        "event": str,
+        "team1_series_score": int,
+        "team2_series_score": int,
+        "winner": {"side": str, "team": str},
+        "time_until_restore": int,
+    }
+    assert WEBHOOK_EVENTS_SCHEMAS[MatchEventEnum.MAP_RESULT]["team1"]["players"] == [
+        {"steamid": str, "name": str, "stats": dict}
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "field",
+    [
+        serializers.IntegerField(min_value=0),
+        serializers.IntegerField(required=False),
+        serializers.CharField(allow_blank=True),
+        serializers.FloatField(),
+        serializers.ListField(child=serializers.CharField(), allow_empty=False),
+        serializers.DictField(child=serializers.IntegerField()),
+    ],
+)
+def test_get_serializer_schema_rejects_unsupported_fields(field):
+    class EventSerializer(serializers.Serializer):
+        value = field
+
+    with pytest.raises(ImproperlyConfigured):
+        get_serializer_schema(EventSerializer())
+
+
+@pytest.mark.django_db
+def test_get_match_guild_id_is_cached(match, django_assert_num_queries):
+    cache.clear()
+    with django_assert_num_queries(1):
+        assert get_match_guild_id(str(match.pk)) == match.guild.guild_id
+    with django_assert_num_queries(0):
+        assert get_match_guild_id(str(match.pk)) == match.guild.guild_id
+    guild = match.guild
+    guild.guild_id = "123"
+    guild.save()
+    assert get_match_guild_id(str(match.pk)) == "123"
+    match.guild = None
+    match.save()
+    assert cache.get(get_match_guild_cache_key(match.pk)) is None
+    assert get_match_guild_id(str(match.pk)) == ""
+    match_id = match.pk
+    match.delete()
+    assert get_match_guild_id(str(match_id)) is None
+    assert get_match_guild_id("not-a-match") is None
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "event,match_status",
+    [
+        (MatchEventEnum.SERIES_START, MatchStatus.STARTED),
+        (MatchEventEnum.GOING_LIVE, MatchStatus.LIVE),
+        (MatchEventEnum.SERIES_END, MatchStatus.FINISHED),
+        (MatchEventEnum.MAP_RESULT, MatchStatus.CREATED),
+    ],
+)
+def test_webhook(client_with_token, match, mocker, event, match_status):
+    publish_event = mocker.patch("matches.utils.apublish_event")
+    payload = {"matchid": str(match.pk), **EVENTS_PAYLOADS[event][1]}
+    response = client_with_token.post(f"{API_ENDPOINT}{match.pk}/webhook/", payload, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    channel = f"event.{match.guild.guild_id}.{event.value}"
+    assert response.data["event"] == channel
+    assert response.data["data"] == validate_webhook_event(payload)[1]
+    publish_event.assert_called_once_with(channel, response.data["data"], match_id=match.pk)
+    match.refresh_from_db()
+    assert match.status == match_status
+    assert match.map_results.count() == (1 if event == MatchEventEnum.MAP_RESULT else 0)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("event", [MatchEventEnum.ROUND_END, MatchEventEnum.SIDE_PICKED])
+def test_webhook_does_not_load_match(client_with_token, match, mocker, event):
+    publish_event = mocker.patch("matches.utils.apublish_event")
+    payload = {"matchid": str(match.pk), "event": event.value, "round_number": 3}
+    client_with_token.post(f"{API_ENDPOINT}{match.pk}/webhook/", payload, format="json")
+    with CaptureQueriesContext(connection) as context:
+        response = client_with_token.post(f"{API_ENDPOINT}{match.pk}/webhook/", payload, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert not any('"matches_match"' in query["sql"] for query in context.captured_queries)
+    expected_data = payload if event == MatchEventEnum.ROUND_END else None
+    publish_event.assert_called_with(f"event.{match.guild.guild_id}.{event.value}", expected_data, match_id=match.pk)
+
+
+@pytest.mark.django_db
+def test_webhook_invalid(client_with_token, match, mocker):
+    publish_event = mocker.patch("matches.utils.apublish_event")
+    url = f"{API_ENDPOINT}{match.pk}/webhook/"
+    response = client_with_token.post(url, {"matchid": str(match.pk), "event": "going_live"}, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data == {"map_number": ["This field is required."]}
+
+    response = client_with_token.post(url, {"matchid": "0", "event": "round_end"}, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = client_with_token.post(
+        f"{API_ENDPOINT}0/webhook/", {"matchid": "0", "event": "round_end"}, format="json"
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    publish_event.assert_not_called()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_webhook_asgi_concurrent_events(match, default_author, mocker):
+    cache.clear()
+    apublish_event = mocker.patch("matches.utils.apublish_event")
+    url = f"{API_ENDPOINT}{match.pk}/webhook/"
+    headers = {"Authorization": f"Bearer {default_author.get_token()}"}
+
+    async def post_events(payloads):
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            return await asyncio.gather(*[client.post(url, json=payload, headers=headers) for payload in payloads])
+
+    rounds = [{"matchid": str(match.pk), "event": "round_end", "round_number": i} for i in range(5)]
+    responses = asyncio.run(post_events(rounds))
+    assert [response.status_code for response in responses] == [status.HTTP_200_OK] * 5
+    assert sorted(call.args[1]["round_number"] for call in apublish_event.call_args_list) == list(range(5))
+
+    going_live = {"matchid": str(match.pk), "event": "going_live", "map_number": 0}
+    assert asyncio.run(post_events([going_live]))[0].status_code == status.HTTP_200_OK
+    match.refresh_from_db()
+    assert match.status == MatchStatus.LIVE
@@ -1,43 +1,54 @@
-import json
 import math
-from time import sleep
+
+import redis
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.shortcuts import get_object_or_404
-from rcon import Client, EmptyResponse, SessionTimeout, WrongPassword
-import redis
+from django.db import transaction
+from django.http import Http404
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.utils import timezone
+from django.utils.http import parse_etags
 from rest_framework.authtoken.models import Token
 from rest_framework.reverse import reverse_lazy
 
 from guilds.models import Guild
+from matches.cache import MATCH_GUILD_NOT_SET
+from matches.creation import MatchCreationError, create_new_match
+from matches.events import get_event_publisher
 from matches.models import (
-    Map,
+    MapResult,
     Match,
-    MapBan,
-    MapPick,
     MatchStatus,
-    MatchType,
 )
 from matches.serializers import (
     CreateMatchSerializer,
     MatchBanMapSerializer,
     MatchEventEnum,
-    MatchEventGoingLiveSerializer,
-    MatchEventMapResultSerializer,
-    MatchEventSerializer,
-    MatchEventSeriesEndSerializer,
-    MatchEventSeriesStartSerializer,
     MatchPickMapSerializer,
     MatchPlayerJoin,
     MatchSerializer, MatchBanMapResultSerializer, MatchPickMapResultSerializer, InteractionUserSerializer,
-    MapSerializer,
+    ShuffleTeamsSerializer, MatchmakingTicketSerializer, MatchmakingTicketResultSerializer,
+    MapSerializer, MatchLoadJobSerializer, MatchEventsQuerySerializer, MatchEventLogSerializer,
+)
+from matches.matchmaking import MatchmakingQueue, QueueError, join_queue
+from matches.ratings import get_players_ratings, update_map_ratings, update_series_stats
+from matches.tasks import aenqueue_job, get_job
+from matches.webhook import (
+    WEBHOOK_EVENTS_SCHEMAS,
+    WEBHOOK_EVENTS_STATUSES,
+    WEBHOOK_RAW_EVENTS,
+    aget_match_guild_id,
+    validate_webhook_event,
 )
+from matches.veto import VetoAction, VetoError, veto_map
 from players.models import DiscordUser, Player, Team
 from players.serializers import TeamSerializer
-from players.utils import create_default_teams, divide_players
+from players.utils import PartyError, divide_players, resolve_parties, resolve_players
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from servers.rcon_pool import send_rcon_command as send_pooled_rcon_command
 from servers.models import Server
 from steam import game_servers as gs
 
@@ -54,19 +65,10 @@ def send_rcon_command(host: str, port: str, rcon_password: str, command: str, *a
 
     Returns:
     --------
-        None
+        str | None: Command response or None if the command failed.
 
     """
-    try:
-        with Client(
-                host,
-                int(port),
-                passwd=rcon_password,
-        ) as client:
-            return client.run(command, *args)
-    except (EmptyResponse, SessionTimeout, WrongPassword) as e:
-        print(f"Error sending RCON command: {e}")
-        return None
+    return send_pooled_rcon_command(host, port, rcon_password, command, *args)
 
 
 def check_server_is_available_for_match(server: Server) -> bool:
@@ -101,94 +103,23 @@ def create_match(request: Request) -> Response:
     """
     serializer = CreateMatchSerializer(data=request.data, context={"request": request})
     serializer.is_valid(raise_exception=True)
-    discord_users_ids = serializer.validated_data.get("discord_users_ids")
-    match_type = serializer.validated_data.get("match_type", "BO1")
-    clinch_series = serializer.validated_data.get("clinch_series", False)
-    map_sides = serializer.validated_data.get(
-        "map_sides", ["knife", "team1_ct", "team2_ct"]
-    )
-    discord_users_ids = list(set(discord_users_ids))
-    author_id = serializer.validated_data.get("author_id")
-    server_id = serializer.validated_data.get("server_id")
-    guild_id = serializer.validated_data.get("guild_id")
-    cvars = serializer.validated_data.get("cvars")
-    maplist = serializer.validated_data.get("maplist")
-    if len(discord_users_ids) < 2:
-        return Response({"message": "At least 2 players are required"}, status=400)
-    server = None
-    if server_id:
-        server = get_object_or_404(Server, pk=server_id)
-        if not server.check_online():
-            return Response(
-                {"message": "Server is not online. Cannot create match"}, status=400
-            )
-        if not Match.objects.check_server_is_available_for_match(server):
-            return Response(
-                {"message": "Server is not available for a match. Another match is already running"},
-                status=400,
-            )
-    discord_users_list: list[DiscordUser] = []
-    discord_users_not_found: list[str] = []
-    for discord_user_id in discord_users_ids:
-        try:
-            discord_user = DiscordUser.objects.get(user_id=discord_user_id)
-            discord_users_list.append(discord_user)
-        except DiscordUser.DoesNotExist as e:
-            discord_users_not_found.append(discord_user_id)
-    if discord_users_not_found:
-        return Response(
-            {
-                "message": f"Discord users not found",
-                "users": discord_users_not_found,
-            },
-            status=404,
-        )
     try:
-        author = DiscordUser.objects.get(user_id=author_id)
-    except DiscordUser.DoesNotExist as e:
-        return Response(
-            {
-                "message": "Author not found",
-                "user_id": author_id,
-            },
-            status=404,
-        )
-
-    players_list: list[Player] = []
-    for discord_user in discord_users_list:
-        player: Player = get_object_or_404(Player, discord_user=discord_user)
-        if player.steam_user is None:
-            return Response(
-                {
-                    "message": f"Discord user {discord_user.username} has no connected player",
-                    "user_id": discord_user.user_id,
-                },
-                status=404,
-            )
-        players_list.append(player)
-
-    team1, team2 = create_default_teams("Team 1", "Team 2", players_list)
-    guild = get_object_or_404(Guild, pk=guild_id)
-    new_match: Match = Match.objects.create_match(
-        team1=team1,
-        team2=team2,
-        author=author,
-        type=match_type,
-        clinch_series=clinch_series,
-        map_sides=map_sides,
-        server=server,
-        cvars=cvars,
-        guild=guild,
-        maplist=maplist
-    )
-    new_match.create_webhook_cvars(webhook_url=str(reverse_lazy("match-webhook", args=[new_match.pk], request=request)))
+        new_match = create_new_match(base_url=request.build_absolute_uri("/"), **serializer.validated_data)
+    except MatchCreationError as e:
+        return Response(e.data, status=e.status)
+    new_match = Match.objects.with_serializer_relations().get(pk=new_match.pk)
     new_match_serializer = MatchSerializer(new_match, context={"request": request})
     return Response(new_match_serializer.data, status=201)
 
 
-def load_match(pk: int, request) -> Response:
+async def load_match(pk: int, request) -> Response:
     """
-    Load a match into the server.
+    Queue loading a match into the server.
+
+    The server is told to end its current match and load the match config by a worker,
+    the result is published to the ``event.{guild_id}.load_match`` channel. The match is read
+    with the async ORM and the job is pushed with the async Redis client, the worker builds
+    the config URL and the author token.
 
     Args:
     -----
@@ -196,26 +127,86 @@ def load_match(pk: int, request) -> Response:
 
     Returns:
     --------
-        Response: Response object.
+        Response: Response object with the queued job.
     """
-    match = get_object_or_404(Match, pk=pk)
-    if not match.server:
+    match = await aget_object_or_404(Match.objects.only("pk", "server"), pk=pk)
+    if not match.server_id:
         return Response(
             {"message": "Match has no server assigned. Cannot load match"}, status=400
         )
-    # return f"matchzy_loadmatch_url {match_url} {api_key_header} {api_key}"
-    load_match_command_split = match.get_load_match_command().split(" ")
-    load_match_command = load_match_command_split[0]
-    match_url = load_match_command_split[1]
-    api_key_header = load_match_command_split[2]
-    api_key = load_match_command_split[3]
-
-    send_rcon_command(match.server.ip, match.server.port, match.server.rcon_password, "css_endmatch")
-    sleep(5)
-    match_serializer = MatchSerializer(match, context={"request": request})
-    send_rcon_command(match.server.ip, match.server.port, match.server.rcon_password, load_match_command, match_url,
-                      api_key_header, api_key)
-    return Response(match_serializer.data, status=200)
+    job = await aenqueue_job(
+        "load_match", match.pk, server_id=match.server_id, base_url=request.build_absolute_uri("/")
+    )
+    return Response(MatchLoadJobSerializer(job).data, status=202)
+
+
+def get_load_match_job(pk: int, job_id: str) -> Response:
+    """
+    Get the state of a load match job.
+
+    Args:
+    -----
+        pk (int): Match ID.
+        job_id (str): Job ID.
+
+    Returns:
+    --------
+        Response: Response object.
+    """
+    job = get_job(job_id)
+    if not job or str(job["match_id"]) != str(pk):
+        return Response({"message": "Job not found"}, status=404)
+    return Response(MatchLoadJobSerializer(job).data, status=200)
+
+
+def get_match_config_response(request: Request, config: dict) -> Response:
+    """
+    Respond with a cached match config, or 304 if the client already has it.
+
+    Args:
+    -----
+        request (Request): Request object.
+        config (dict): Cached config entry.
+
+    Returns:
+    --------
+        Response: Response object.
+    """
+    headers = {"ETag": config["etag"], "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        etags = [etag.removeprefix("W/") for etag in parse_etags(if_none_match)]
+        if "*" in etags or config["etag"] in etags:
+            return Response(status=304, headers=headers)
+    return Response(config["data"], status=200, headers=headers)
+
+
+def get_match_events(request: Request, pk: int) -> Response:
+    """
+    Replay the events of a match stored in its match event stream.
+
+    Args:
+    -----
+        request (Request): Request object.
+        pk (int): Match ID.
+
+    Returns:
+    --------
+        Response: Response object.
+    """
+    query_serializer = MatchEventsQuerySerializer(data=request.query_params)
+    query_serializer.is_valid(raise_exception=True)
+    if not Match.objects.filter(pk=pk).exists():
+        return Response({"message": "Match not found"}, status=404)
+    try:
+        events = get_event_publisher().read_match_events(
+            pk,
+            since=query_serializer.validated_data.get("since"),
+            count=query_serializer.validated_data["count"],
+        )
+    except (redis.ConnectionError, redis.TimeoutError):
+        return Response({"message": "Events are unavailable"}, status=503)
+    return Response(MatchEventLogSerializer(events, many=True).data, status=200)
 
 
 def ban_map(request: Request, pk: int) -> Response:
@@ -231,87 +222,24 @@ def ban_map(request: Request, pk: int) -> Response:
     --------
         Response: Response object.
     """
-    match: Match = get_object_or_404(Match, pk=pk)
     match_map_ban_serializer = MatchBanMapSerializer(data=request.data)
     match_map_ban_serializer.is_valid(raise_exception=True)
-    interaction_user_id = match_map_ban_serializer.validated_data.get("interaction_user_id")
-    try:
-        player = Player.objects.get(discord_user__user_id=interaction_user_id)
-    except Player.DoesNotExist as e:
-        return Response({"message": e.args}, status=404)
     try:
-        user_team = Team.objects.get(players__discord_user__user_id=interaction_user_id)
-    except Team.DoesNotExist as e:
-        return Response({"message": e.args}, status=404)
-    if not user_team != match.team1 and not user_team != match.team2:
-        return Response(
-            {"message": f"User {player.discord_user.username} is not part of match {match.id}"},
-            status=400,
-        )
-    map_tag = match_map_ban_serializer.validated_data.get("map_tag")
-    map = get_object_or_404(Map, tag=map_tag)
-    if player.pk != user_team.leader.pk:
-        print(player.discord_user.username)
-        print(user_team.leader.discord_user.username)
-        return Response(
-            {"message": f"User {player.discord_user.username} is not the leader of team {user_team.name}"},
-            status=400,
+        veto_result = veto_map(
+            pk,
+            match_map_ban_serializer.validated_data.get("interaction_user_id"),
+            match_map_ban_serializer.validated_data.get("map_tag"),
+            VetoAction.BAN,
         )
-    if match.map_bans.filter(map=map).exists():
-        return Response(
-            {"message": f"Map {map_tag} already banned"},
-            status=400,
-        )
-    last_match_map_ban = match.map_bans.all().order_by("-created_at").first()
-    map_bans_count = match.map_bans.count()
-    if map_bans_count > 0 and last_match_map_ban.team == user_team:
-        return Response(
-            {
-                "message": f"Team {user_team.name} already banned a map. Wait for the other team to ban a map."
-            },
-            status=400,
-        )
-    if map_bans_count == 0 and user_team == match.team2:
-        return Response(
-            {
-                "message": f"Team {user_team.name} is not allowed to ban a map. Team 1 has to ban first"
-            },
-            status=400,
-        )
-    if match.maps.count() == 1:
-        return Response(
-            {"message": "Only one map left. You can't ban more maps"}, status=400
-        )
-    if match.type == MatchType.BO3 and match.maps.count() == 3:
-        return Response({"message": "Both teams already banned 3 maps"}, status=400)
-    if match.map_picks.filter(map=map).exists():
-        return Response(
-            {"message": f"Map {map_tag} cannot be banned. It was already picked"},
-            status=400,
-        )
-
-    if (
-            map_bans_count == 2
-            and match.type == MatchType.BO3
-            and match.map_picks.count() < 2
-    ):
-        return Response(
-            {
-                "message": "Both teams already banned 2 maps. Wait for both teams to pick a map"
-            },
-            status=400,
-        )
-    match.ban_map(user_team, map)
-    maps_left_without_picked_map = match.maplist.copy()
-    for map_pick in match.map_picks.all():
-        maps_left_without_picked_map.remove(map_pick.map.tag)
+    except VetoError as e:
+        return Response({"message": e.message}, status=e.status)
     ban_result_serializer = MatchBanMapResultSerializer(
-        context={"banned_map": map, "next_ban_team": match.team1 if match.team2 == user_team else match.team2,},
+        context={"banned_map": veto_result.map, "next_ban_team": veto_result.next_team},
         data={
-            "maps_left": maps_left_without_picked_map,
-            "map_bans_count": match.map_bans.count(),
+            "maps_left": veto_result.maps_left,
+            "map_bans_count": veto_result.map_bans_count,
         }
-        )
+    )
     ban_result_serializer.is_valid(raise_exception=True)
     return Response(ban_result_serializer.data, status=200)
 
@@ -330,84 +258,22 @@ def pick_map(request: Request, pk: int) -> Response["MatchPickMapResultSerialize
     --------
         Response: Response object.
     """
-    match: Match = get_object_or_404(Match, pk=pk)
     match_map_pick_serializer = MatchPickMapSerializer(data=request.data)
     match_map_pick_serializer.is_valid(raise_exception=True)
-    interaction_user_id = match_map_pick_serializer.validated_data.get("interaction_user_id")
-
-    if match.type == MatchType.BO1:
-        return Response({"message": "Cannot pick a map in a BO1 match"}, status=400)
-
-    try:
-        player = Player.objects.get(discord_user__user_id=interaction_user_id)
-    except Player.DoesNotExist as e:
-        return Response({"message": e.args}, status=404)
     try:
-        user_team = Team.objects.get(players__discord_user__user_id=interaction_user_id)
-    except Team.DoesNotExist as e:
-        return Response({"message": e.args}, status=404)
-
-    if not user_team != match.team1 and not user_team != match.team2:
-        return Response(
-            {"message": f"User {player.discord_user.username} is not part of match {match.id}"},
-            status=400,
+        veto_result = veto_map(
+            pk,
+            match_map_pick_serializer.validated_data.get("interaction_user_id"),
+            match_map_pick_serializer.validated_data.get("map_tag"),
+            VetoAction.PICK,
         )
-
-    map_tag = match_map_pick_serializer.validated_data.get("map_tag")
-    map = get_object_or_404(Map, tag=map_tag)
-    if player.pk != user_team.leader.pk:
-        print(player.discord_user.username)
-        print(user_team.leader.discord_user.username)
-        return Response(
-            {"message": f"User {player.discord_user.username} is not the leader of team {user_team.name}"},
-            status=400,
-        )
-    if match.map_picks.filter(map=map).exists():
-        return Response(
-            {"message": f"Map {map_tag} already picked by team"},
-            status=400,
-        )
-    last_pick = match.map_picks.all().order_by("-created_at").first()
-    map_picks_count = match.map_picks.count()
-    map_bans_count = match.map_bans.count()
-
-    if map_bans_count < 2:
-        return Response(
-            {"message": "Both teams have to ban 1 map before picking a map"}, status=400
-        )
-
-    if map_picks_count > 0 and last_pick.team == user_team:
-        return Response(
-            {
-                "message": f"Team {user_team.name} already picked a map. Wait for the other team to pick a map."
-            },
-            status=400,
-        )
-    if map_picks_count == 0 and user_team == match.team2:
-        return Response(
-            {
-                "message": f"Team {user_team.name} is not allowed to pick a map. Team 1 has to pick first"
-            },
-            status=400,
-        )
-    if map_picks_count == 2:
-        return Response({"message": "Both teams already picked a map"}, status=400)
-    if not match.maps.filter(tag=map_tag).exists():
-        return Response(
-            {"message": f"Map {map_tag} is not available to be picked"},
-            status=400,
-        )
-
-    match.pick_map(user_team, map)
-    maps_left_without_picked_map = match.maplist.copy()
-    for map_pick in match.map_picks.all():
-        maps_left_without_picked_map.remove(map_pick.map.tag)
-
+    except VetoError as e:
+        return Response({"message": e.message}, status=e.status)
     map_pick_result_serializer = MatchPickMapResultSerializer(
-        context={"picked_map": map, "next_pick_team": match.team1 if match.team2 == user_team else match.team2,},
+        context={"picked_map": veto_result.map, "next_pick_team": veto_result.next_team},
         data={
-            "maps_left": maps_left_without_picked_map,
-            "map_picks_count": match.map_picks.count(),
+            "maps_left": veto_result.maps_left,
+            "map_picks_count": veto_result.map_picks_count,
         }
     )
     map_pick_result_serializer.is_valid(raise_exception=True)
@@ -416,7 +282,7 @@ def pick_map(request: Request, pk: int) -> Response["MatchPickMapResultSerialize
 
 def shuffle_teams(request, pk: int) -> Response:
     """
-    Shuffle the teams of a match.
+    Divide the players of a match again into teams with the closest guild ratings, keeping parties together.
 
     Args:
     -----
@@ -426,29 +292,39 @@ def shuffle_teams(request, pk: int) -> Response:
     --------
         Response: Response object.
     """
-    match: Match = get_object_or_404(Match, pk=pk)
-    serializer = InteractionUserSerializer(data=request.data)
+    match: Match = get_object_or_404(Match.objects.select_related("author", "team1", "team2"), pk=pk)
+    serializer = ShuffleTeamsSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     interaction_user_id = serializer.validated_data.get("interaction_user_id")
-    author = get_object_or_404(DiscordUser, user_id=interaction_user_id)
-    if author.pk != match.author.pk:
+    if match.author is None or str(interaction_user_id) != match.author.user_id:
         return Response(
             {"message": "Only the author of the match can shuffle the teams"},
             status=400,
         )
-    players = match.team1.players.all() | match.team2.players.all()
-    players = list(players)
-    team1, team2 = divide_players(players)
+    players = list(
+        Player.objects.filter(teams__in=[match.team1_id, match.team2_id]).select_related("discord_user").distinct()
+    )
+    try:
+        parties = resolve_parties(
+            serializer.validated_data.get("parties", []),
+            {player.discord_user.user_id: player for player in players if player.discord_user is not None},
+        )
+    except PartyError as e:
+        return Response({"message": e.message, "users": e.users}, status=400)
+    ratings = get_players_ratings(match.guild_id, [player.id for player in players]) if match.guild_id else {}
+    team1, team2 = divide_players(players, ratings, parties)
     match.team1.players.set(team1)
     match.team1.leader = team1[0]
     match.team2.players.set(team2)
     match.team2.leader = team2[0]
+    Team.objects.bulk_update([match.team1, match.team2], ["leader"])
     match.save()
+    match = Match.objects.with_serializer_relations().get(pk=match.pk)
     match_serializer = MatchSerializer(match, context={"request": request})
     return Response(match_serializer.data, status=200)
 
 
-def publish_event(event: str, data: dict):
+def publish_event(event: str, data: dict, match_id: int | None = None):
     """
     Publish an event to the Redis server.
 
@@ -456,19 +332,40 @@ def publish_event(event: str, data: dict):
     -----
         event (str): Event name.
         data (dict): Event data.
+        match_id (int | None): Match the event is about, used to replay the match events.
 
     Returns:
     --------
-        None
+        bool: True if the event was published or queued, False if Redis is unavailable and the event was buffered.
     """
-    redis_client = redis.StrictRedis(host="redis", port=6379, db=0)
-    redis_client.publish(event, json.dumps(data))
+    return get_event_publisher().publish(event, data, match_id=match_id)
 
 
-def process_webhook(request: Request, pk) -> Response:
+async def apublish_event(event: str, data: dict, match_id: int | None = None):
+    """
+    Publish an event to the Redis server without blocking the event loop.
+
+    Args:
+    -----
+        event (str): Event name.
+        data (dict): Event data.
+        match_id (int | None): Match the event is about, used to replay the match events.
+
+    Returns:
+    --------
+        bool: True if the event was published or queued, False if Redis is unavailable and the event was buffered.
+    """
+    return await get_event_publisher().apublish(event, data, match_id=match_id)
+
+
+async def process_webhook(request: Request, pk) -> Response:
     """
     Process a webhook event.
 
+    The payload is validated once with the precompiled validator of its event. The guild of the match
+    is resolved from the cache, the match is only loaded by the events changing its status. Stats and
+    ratings are updated in a thread as they need transactions, the async ORM does not support them.
+
     Args:
     -----
         request (Request): Request object.
@@ -477,60 +374,87 @@ def process_webhook(request: Request, pk) -> Response:
     --------
         Response: Response object.
     """
-    match_event_serializer = MatchEventSerializer(data=request.data)
-    match_event_serializer.is_valid(raise_exception=True)
-    match_id = match_event_serializer.validated_data.get("matchid")
-    if match_id != pk:
+    event, data = validate_webhook_event(request.data)
+    match_id = data["matchid"]
+    if match_id != str(pk):
         return Response(
             {"message": "Match ID in the request does not match the URL"},
             status=400,
         )
-    match: Match = get_object_or_404(Match, pk=match_id)
-    data = None
-    redis_event = None
-    match match_event_serializer.validated_data.get("event"):
-        case MatchEventEnum.SERIES_START:
-            series_start_serializer = MatchEventSeriesStartSerializer(data=request.data)
-            series_start_serializer.is_valid(raise_exception=True)
-            data = series_start_serializer.validated_data
-            match.status = MatchStatus.STARTED
-            match.save()
-            redis_event = f"event.{match.guild.guild_id}.{MatchEventEnum.SERIES_START.value}"
-        case MatchEventEnum.SERIES_END:
-            series_end_serializer = MatchEventSeriesEndSerializer(data=request.data)
-            series_end_serializer.is_valid(raise_exception=True)
-            data = series_end_serializer.validated_data
-            match.status = MatchStatus.FINISHED
-            match.save()
-            redis_event = f"event.{match.guild.guild_id}.{MatchEventEnum.SERIES_END.value}"
-
-        case MatchEventEnum.MAP_RESULT:
-            map_result_serializer = MatchEventMapResultSerializer(data=request.data)
-            map_result_serializer.is_valid(raise_exception=True)
-            data = map_result_serializer.validated_data
-            redis_event = f"event.{match.guild.guild_id}.{MatchEventEnum.MAP_RESULT.value}"
-        case MatchEventEnum.SIDE_PICKED:
-            redis_event = f"event.{match.guild.guild_id}.{MatchEventEnum.SIDE_PICKED.value}"
-        case MatchEventEnum.MAP_PICKED:
-            redis_event = f"event.{match.guild.guild_id}.{MatchEventEnum.MAP_PICKED.value}"
-        case MatchEventEnum.MAP_VETOED:
-            redis_event = f"event.{match.guild.guild_id}.{MatchEventEnum.MAP_VETOED.value}"
-        case MatchEventEnum.ROUND_END:
-            data = request.data
-            redis_event = f"event.{match.guild.guild_id}.{MatchEventEnum.ROUND_END.value}"
-        case MatchEventEnum.GOING_LIVE:
-            going_live_serializer = MatchEventGoingLiveSerializer(data=request.data)
-            going_live_serializer.is_valid(raise_exception=True)
-            data = going_live_serializer.validated_data
-            match.status = MatchStatus.LIVE
-            match.save()
-            redis_event = f"event.{match.guild.guild_id}.{MatchEventEnum.GOING_LIVE.value}"
-
-    publish_event(redis_event, data)
-    print(f"Published event: {redis_event} with data: {data}")
+    guild_id = await aget_match_guild_id(match_id)
+    if guild_id is None:
+        raise Http404("No Match matches the given query.")
+    if event in WEBHOOK_EVENTS_STATUSES:
+        match: Match = await aget_object_or_404(
+            Match.objects.only("pk", "status", "guild", "team1", "team2"), pk=match_id
+        )
+        if event == MatchEventEnum.SERIES_END:
+            await sync_to_async(finish_series)(match, data["winner"]["team"])
+        else:
+            match.status = WEBHOOK_EVENTS_STATUSES[event]
+            await match.asave(update_fields=["status", "updated_at"])
+    if event is None:
+        return Response({"event": None, "data": None}, status=200)
+    if event == MatchEventEnum.MAP_RESULT:
+        await sync_to_async(store_map_result)(int(match_id), data)
+    if event in WEBHOOK_RAW_EVENTS:
+        data = request.data
+    elif event not in WEBHOOK_EVENTS_SCHEMAS:
+        data = None
+    redis_event = f"event.{guild_id}.{event.value}"
+    if guild_id != MATCH_GUILD_NOT_SET:
+        await apublish_event(redis_event, data, match_id=int(match_id))
+        print(f"Published event: {redis_event}")
     return Response({"event": redis_event, "data": data}, status=200)
 
 
+def store_map_result(match_id: int, data: dict) -> MapResult:
+    """
+    Store a map result from a MAP_RESULT event and update the ratings of its players once.
+
+    Args:
+    -----
+        match_id (int): Match ID.
+        data (dict): Validated MAP_RESULT event data.
+
+    Returns:
+    --------
+        MapResult: Stored map result.
+    """
+    map_result, _ = MapResult.objects.create_from_event(match_id, data)
+    if not map_result.rated:
+        update_map_ratings(map_result)
+    return map_result
+
+
+def finish_series(match: Match, winner_team: str) -> bool:
+    """
+    Finish a match from a SERIES_END event and count the series in the stats of its players once.
+
+    The status is switched with a conditional update in the transaction of the stats, so only the
+    request finishing the match counts the series, concurrent and retried events do not.
+
+    Args:
+    -----
+        match (Match): Match.
+        winner_team (str): ``team1`` or ``team2``.
+
+    Returns:
+    --------
+        bool: True if the match was finished by this call.
+    """
+    with transaction.atomic():
+        finished = (
+            Match.objects.filter(pk=match.pk)
+            .exclude(status=MatchStatus.FINISHED)
+            .update(status=MatchStatus.FINISHED, updated_at=timezone.now())
+        )
+        if finished:
+            update_series_stats(match, winner_team)
+    match.status = MatchStatus.FINISHED
+    return bool(finished)
+
+
 def join_match(request: Request, pk: int) -> Response:
     """
     Join a match.
@@ -544,28 +468,46 @@ def join_match(request: Request, pk: int) -> Response:
     --------
         Response: Response object.
     """
-    match: Match = get_object_or_404(Match, pk=pk)
+    match: Match = get_object_or_404(Match.objects.select_related("team1", "team2"), pk=pk)
     match_player_join_serializer = MatchPlayerJoin(data=request.data)
     if not match_player_join_serializer.is_valid():
         return Response(match_player_join_serializer.errors, status=400)
 
-    discord_user_id = match_player_join_serializer.validated_data.get("interaction_user_id")
-    player = get_object_or_404(Player, discord_user__user_id=discord_user_id)
-    if match.team1.players.filter(pk=player.id).exists():
+    discord_user_id = str(match_player_join_serializer.validated_data.get("interaction_user_id"))
+    resolved_players = resolve_players([discord_user_id])
+    if resolved_players.missing:
+        return Response({"message": "Discord user not found", "user_id": discord_user_id}, status=404)
+    if resolved_players.unlinked:
+        player = resolved_players.unlinked[discord_user_id]
+        return Response(
+            {
+                "message": f"Discord user {player.discord_user.username} has no connected player",
+                "user_id": discord_user_id,
+            },
+            status=404,
+        )
+    player = resolved_players.found[discord_user_id]
+    teams_players = Team.players.through.objects.filter(team_id__in=[match.team1_id, match.team2_id]).values_list(
+        "team_id", "player_id"
+    )
+    team1_players = {player_id for team_id, player_id in teams_players if team_id == match.team1_id}
+    team2_players = {player_id for team_id, player_id in teams_players if team_id == match.team2_id}
+    if player.pk in team1_players:
         return Response(
             {"message": f"Player {player.steam_user.username} is already in team 1"},
             status=400,
         )
-    if match.team2.players.filter(pk=player.id).exists():
+    if player.pk in team2_players:
         return Response(
             {"message": f"Player {player.steam_user.username} is already in team 2"},
             status=400,
         )
-    if match.team1.players.count() < match.team2.players.count():
+    if len(team1_players) < len(team2_players):
         match.team1.players.add(player)
     else:
         match.team2.players.add(player)
     match.save()
+    match = Match.objects.with_serializer_relations().get(pk=match.pk)
     match_serializer = MatchSerializer(match, context={"request": request})
     return Response(match_serializer.data, status=200)
 
@@ -603,3 +545,81 @@ def recreate_match(request, pk: int) -> Response:
     new_match.create_webhook_cvars(str(reverse_lazy("match-webhook", args=[new_match.pk], request=request)))
     new_match_serializer = MatchSerializer(new_match, context={"request": request})
     return Response(new_match_serializer.data, status=201)
+
+
+def get_matchmaking_ticket_player(request: Request) -> tuple[Player, int]:
+    """
+    Get the player and team size of a matchmaking ticket request.
+
+    Args:
+    -----
+        request (Request): Request object.
+
+    Returns:
+    --------
+        tuple[Player, int]: Player of the interaction user and players per team.
+
+    Raises:
+    -------
+        QueueError: The interaction user has no player.
+    """
+    serializer = MatchmakingTicketSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    players_per_team = serializer.validated_data.get("players_per_team", settings.MATCHMAKING_PLAYERS_PER_TEAM)
+    discord_user_id = str(serializer.validated_data.get("interaction_user_id"))
+    resolved_players = resolve_players([discord_user_id])
+    if resolved_players.missing:
+        raise QueueError("Discord user not found", status=404)
+    return resolved_players.found.get(discord_user_id) or resolved_players.unlinked[discord_user_id], players_per_team
+
+
+def join_matchmaking_queue(request: Request, guild: Guild) -> Response:
+    """
+    Add the interaction user to the matchmaking queue of a guild.
+
+    Args:
+    -----
+        request (Request): Request object.
+        guild (Guild): Guild of the queue.
+
+    Returns:
+    --------
+        Response: Response object.
+    """
+    try:
+        player, players_per_team = get_matchmaking_ticket_player(request)
+        ticket = join_queue(guild, player, players_per_team)
+    except QueueError as e:
+        return Response({"message": e.message}, status=e.status)
+    queue = MatchmakingQueue(guild.pk, players_per_team)
+    serializer = MatchmakingTicketResultSerializer(
+        {
+            **ticket._asdict(),
+            "players_per_team": players_per_team,
+            "position": queue.position(ticket.player_id),
+            "queue_size": queue.size(),
+        }
+    )
+    return Response(serializer.data, status=200)
+
+
+def leave_matchmaking_queue(request: Request, guild: Guild) -> Response:
+    """
+    Remove the interaction user from the matchmaking queue of a guild.
+
+    Args:
+    -----
+        request (Request): Request object.
+        guild (Guild): Guild of the queue.
+
+    Returns:
+    --------
+        Response: Response object.
+    """
+    try:
+        player, players_per_team = get_matchmaking_ticket_player(request)
+    except QueueError as e:
+        return Response({"message": e.message}, status=e.status)
+    if not MatchmakingQueue(guild.pk, players_per_team).dequeue(player.id):
+        return Response({"message": "Player is not waiting in the queue"}, status=404)
+    return Response(status=204)
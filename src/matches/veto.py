@@ -0,0 +1,181 @@
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.shortcuts import get_object_or_404
+
+from matches.models import Map, Match, MatchType, VetoError
+from players.models import Player, Team
+
+
+class VetoAction:
+    BAN = "ban"
+    PICK = "pick"
+
+
+# Picks of each match type, they follow the opening bans of both teams.
+VETO_PICKS = {
+    MatchType.BO1: 0,
+    MatchType.BO3: 2,
+    MatchType.BO5: 4,
+}
+VETO_OPENING_BANS = 2
+
+
+@dataclass
+class VetoResult:
+    match: Match
+    map: Map
+    team: Team
+    next_team: Team
+    maps_left: list[str]
+    map_bans_count: int
+    map_picks_count: int
+
+
+@lru_cache
+def get_veto_sequence(match_type: str, maps_count: int) -> tuple[str, ...]:
+    """
+    Get the veto sequence of a match type, teams take turns starting with team 1.
+
+    Both teams ban a map, then pick the maps of the series and ban the rest until only the decider is left.
+    The opening bans are skipped when the pool only holds the picks and the decider.
+
+    Args:
+    -----
+        match_type (str): Match type.
+        maps_count (int): Number of maps in the pool before the veto.
+
+    Returns:
+    --------
+        tuple[str, ...]: Veto actions in order.
+
+    Raises:
+    -------
+        VetoError: If the pool has fewer maps than the series plays.
+    """
+    picks = VETO_PICKS.get(match_type, 0)
+    if maps_count < picks + 1:
+        raise VetoError(f"Not enough maps to play a {match_type} match")
+    opening = [VetoAction.BAN] * min(VETO_OPENING_BANS, maps_count - picks - 1) if picks else []
+    sequence = opening + [VetoAction.PICK] * picks
+    sequence += [VetoAction.BAN] * (maps_count - 1 - len(sequence))
+    return tuple(sequence)
+
+
+def get_step_team(match: Match, step: int) -> Team:
+    return match.team1 if step % 2 == 0 else match.team2
+
+
+def veto_map(match_id: int, interaction_user_id: str, map_tag: str, action: str) -> VetoResult:
+    """
+    Ban or pick a map.
+
+    The match row is locked for the whole action, so concurrent actions are applied one by one.
+    The turn and the map are validated against the veto state stored on the match, which is
+    read with the lock and written back once.
+
+    Args:
+    -----
+        match_id (int): Match ID.
+        interaction_user_id (str): Discord user ID of the team leader.
+        map_tag (str): Map tag.
+        action (str): VetoAction.
+
+    Returns:
+    --------
+        VetoResult: Veto result.
+
+    Raises:
+    -------
+        VetoError: If the action is not allowed.
+    """
+    with transaction.atomic():
+        match: Match = get_object_or_404(
+            Match.objects.select_for_update(of=("self",)).select_related(
+                "team1__leader__discord_user", "team2__leader__discord_user"
+            ),
+            pk=match_id,
+        )
+        if action == VetoAction.PICK and match.type == MatchType.BO1:
+            raise VetoError("Cannot pick a map in a BO1 match")
+        user_team = get_leader_team(match, str(interaction_user_id))
+        match.init_veto_state()
+        maps_count = len(match.veto_maps_left) + len(match.veto_banned_maps) + len(match.veto_picked_maps)
+        sequence = get_veto_sequence(match.type, maps_count)
+        if action == VetoAction.BAN:
+            validate_ban(match, map_tag, sequence)
+        else:
+            validate_pick(match, map_tag, sequence)
+        if user_team != get_step_team(match, match.veto_step):
+            raise VetoError(get_wrong_turn_message(match, user_team, action))
+
+        map = get_object_or_404(Map, tag=map_tag)
+        if action == VetoAction.BAN:
+            match.ban_map(user_team, map)
+        else:
+            match.pick_map(user_team, map)
+
+    next_team = get_step_team(match, match.veto_step)
+    prefetch_related_objects(
+        [next_team],
+        "leader__steam_user",
+        Prefetch("players", queryset=Player.objects.select_related("discord_user", "steam_user")),
+    )
+    return VetoResult(
+        match=match,
+        map=map,
+        team=user_team,
+        next_team=next_team,
+        maps_left=list(match.veto_maps_left),
+        map_bans_count=len(match.veto_banned_maps),
+        map_picks_count=len(match.veto_picked_maps),
+    )
+
+
+def get_leader_team(match: Match, interaction_user_id: str) -> Team:
+    for team in (match.team1, match.team2):
+        if team is not None and team.leader is not None and team.leader.discord_user.user_id == interaction_user_id:
+            return team
+    player = Player.objects.select_related("discord_user").filter(discord_user__user_id=interaction_user_id).first()
+    if player is None:
+        raise VetoError(f"Player {interaction_user_id} not found", status=404)
+    team = Team.objects.filter(pk__in=[match.team1_id, match.team2_id], players=player).first()
+    if team is None:
+        raise VetoError(f"User {player.discord_user.username} is not part of match {match.id}")
+    raise VetoError(f"User {player.discord_user.username} is not the leader of team {team.name}")
+
+
+def validate_ban(match: Match, map_tag: str, sequence: tuple[str, ...]) -> None:
+    if map_tag in match.veto_banned_maps:
+        raise VetoError(f"Map {map_tag} already banned")
+    if map_tag in match.veto_picked_maps:
+        raise VetoError(f"Map {map_tag} cannot be banned. It was already picked")
+    if match.veto_step >= len(sequence):
+        raise VetoError("Only one map left. You can't ban more maps")
+    if sequence[match.veto_step] != VetoAction.BAN:
+        raise VetoError("Both teams already banned their maps. Wait for both teams to pick a map")
+    if map_tag not in match.veto_maps_left:
+        raise VetoError(f"Map {map_tag} is not available to be banned")
+
+
+def validate_pick(match: Match, map_tag: str, sequence: tuple[str, ...]) -> None:
+    if map_tag in match.veto_picked_maps:
+        raise VetoError(f"Map {map_tag} already picked by team")
+    if match.veto_step >= len(sequence) or sequence[match.veto_step] != VetoAction.PICK:
+        if not match.veto_picked_maps:
+            raise VetoError("Both teams have to ban 1 map before picking a map")
+        raise VetoError("Both teams already picked a map")
+    if map_tag not in match.veto_maps_left:
+        raise VetoError(f"Map {map_tag} is not available to be picked")
+
+
+def get_wrong_turn_message(match: Match, team: Team, action: str) -> str:
+    if action == VetoAction.BAN:
+        if not match.veto_banned_maps:
+            return f"Team {team.name} is not allowed to ban a map. Team 1 has to ban first"
+        return f"Team {team.name} already banned a map. Wait for the other team to ban a map."
+    if not match.veto_picked_maps:
+        return f"Team {team.name} is not allowed to pick a map. Team 1 has to pick first"
+    return f"Team {team.name} already picked a map. Wait for the other team to pick a map."
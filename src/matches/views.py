@@ -1,16 +1,22 @@
+from asgiref.sync import sync_to_async
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import extend_schema, extend_schema_view
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from accounts.auth import BearerTokenAuthentication
+from api.views import AsyncActionsMixin
+from api.pagination import CursorOrPageNumberPagination
+from api.serializers import SPARSE_FIELDS_PARAMETERS
 from guilds.models import Guild
 from matches.models import (
     Map,
     Match,
 )
+from matches.cache import aget_cached_match_config, set_cached_match_config
 from matches.permissions import IsAuthor
 from matches.serializers import (
     MapBanSerializer,
@@ -18,11 +24,15 @@ from matches.serializers import (
     MatchConfigSerializer,
     MatchMapSelectedSerializer,
     MatchSerializer, CreateMatchSerializer, MatchBanMapSerializer, MatchPickMapSerializer, MatchBanMapResultSerializer,
-    MatchPickMapResultSerializer, InteractionUserSerializer, MatchUpdateSerializer,
+    MatchPickMapResultSerializer, InteractionUserSerializer, ShuffleTeamsSerializer, MatchUpdateSerializer, MatchLoadJobSerializer,
+    MatchEventsQuerySerializer, MatchEventLogSerializer, MatchSummarySerializer,
 )
 from matches.utils import (
     ban_map,
     create_match,
+    get_load_match_job,
+    get_match_config_response,
+    get_match_events,
     join_match,
     load_match,
     pick_map,
@@ -30,13 +40,35 @@ from matches.utils import (
     recreate_match,
     shuffle_teams,
 )
-from players.models import Team, DiscordUser
+from players.models import Team, DiscordUser, Player
 from servers.models import Server
 
 
-class MatchViewSet(viewsets.ModelViewSet):
+@extend_schema_view(
+    list=extend_schema(parameters=SPARSE_FIELDS_PARAMETERS),
+    retrieve=extend_schema(parameters=SPARSE_FIELDS_PARAMETERS),
+)
+class MatchViewSet(AsyncActionsMixin, viewsets.ModelViewSet):
     queryset = Match.objects.all().order_by("created_at")
     serializer_class = MatchSerializer
+    pagination_class = CursorOrPageNumberPagination
+
+    def get_serializer_class(self):
+        if self.action == "list" and "fields" not in self.request.query_params:
+            return MatchSummarySerializer
+        return super().get_serializer_class()
+
+    def get_queryset(self):
+        if self.action == "list" and not {"fields", "expand"} & self.request.query_params.keys():
+            return super().get_queryset()
+        if self.action in ("list", "retrieve"):
+            return Match.objects.with_serializer_relations().order_by("created_at")
+        if self.action == "config":
+            players = Player.objects.select_related("steam_user")
+            return Match.objects.select_related("team1", "team2").prefetch_related(
+                Prefetch("team1__players", queryset=players), Prefetch("team2__players", queryset=players)
+            )
+        return super().get_queryset()
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -87,13 +119,32 @@ class MatchViewSet(viewsets.ModelViewSet):
 
 
 
+    @extend_schema(
+        request=None,
+        responses={202: MatchLoadJobSerializer}
+    )
     @action(detail=True, methods=["POST"])
-    def load(self, request, pk=None):
-        return load_match(pk, request)
+    async def load(self, request, pk=None):
+        return await load_match(pk, request)
+
+    @extend_schema(
+        responses={200: MatchLoadJobSerializer}
+    )
+    @action(detail=True, methods=["GET"], url_path=r"load/(?P<job_id>[0-9a-f]+)")
+    def load_status(self, request, pk=None, job_id=None):
+        return get_load_match_job(pk, job_id)
+
+    @extend_schema(
+        parameters=[MatchEventsQuerySerializer],
+        responses={200: MatchEventLogSerializer(many=True)}
+    )
+    @action(detail=True, methods=["GET"])
+    def events(self, request, pk=None):
+        return get_match_events(request, pk)
 
     @action(detail=True, methods=["POST"], permission_classes=[IsAuthenticated, IsAuthor], authentication_classes=[BearerTokenAuthentication])
-    def webhook(self, request, pk):
-        return process_webhook(request, pk)
+    async def webhook(self, request, pk):
+        return await process_webhook(request, pk)
 
     @extend_schema(
         request=MatchBanMapSerializer,
@@ -116,7 +167,7 @@ class MatchViewSet(viewsets.ModelViewSet):
         return recreate_match(request, pk)
 
     @extend_schema(
-        request=InteractionUserSerializer,
+        request=ShuffleTeamsSerializer,
         responses={200: MatchSerializer}
     )
     @action(detail=True, methods=["POST"])
@@ -168,12 +219,22 @@ class MatchViewSet(viewsets.ModelViewSet):
     )
     @action(detail=True, methods=["GET"], permission_classes=[IsAuthor],
             authentication_classes=[BearerTokenAuthentication])
-    def config(self, request, pk):
+    async def config(self, request, pk):
+        version, config = await aget_cached_match_config(pk)
+        if config is None:
+            config = await sync_to_async(self.build_config)(version)
+            if "errors" in config:
+                return Response(config["errors"], status=400)
+        else:
+            self.check_object_permissions(request, Match(pk=pk, author_id=config["author_id"]))
+        return get_match_config_response(request, config)
+
+    def build_config(self, version: int) -> dict:
         match = self.get_object()
         serializer = MatchConfigSerializer(data=match.get_config())
         if not serializer.is_valid():
-            return Response(serializer.errors, status=400)
-        return Response(serializer.data, status=200)
+            return {"errors": serializer.errors}
+        return set_cached_match_config(match.pk, version, serializer.data, match.author_id)
 
 
 class MapViewSet(viewsets.ModelViewSet):
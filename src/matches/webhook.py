@@ -0,0 +1,271 @@
+import re
+from collections.abc import Mapping
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.validators import ProhibitNullCharactersValidator
+from rest_framework import serializers
+from rest_framework.exceptions import ErrorDetail, ValidationError
+from rest_framework.fields import _UnvalidatedField as UnvalidatedField
+from rest_framework.validators import ProhibitSurrogateCharactersValidator
+
+from matches.cache import MATCH_GUILD_NOT_SET, get_match_guild_cache_key
+from matches.models import Match, MatchStatus
+from matches.serializers import (
+    MatchEventEnum,
+    MatchEventGoingLiveSerializer,
+    MatchEventMapResultSerializer,
+    MatchEventSerializer,
+    MatchEventSeriesEndSerializer,
+    MatchEventSeriesStartSerializer,
+)
+
+
+def get_serializer_schema(field):
+    """
+    Get the schema of a serializer, or of one of its fields, for ``compile_validator``.
+
+    Args:
+    -----
+        field (Field): Serializer or field, only required fields with default options are supported.
+
+    Returns:
+    --------
+        Schema: ``int``, ``str`` or ``dict`` for a scalar, a dict of schemas for an object or a one item
+        list for a list of items.
+
+    Raises:
+    -------
+        ImproperlyConfigured: If a field can't be validated the way the serializer does.
+    """
+    # Every CharField gets these validators, validate_str applies them
+    validators = [
+        validator for validator in field.validators
+        if not isinstance(validator, (ProhibitNullCharactersValidator, ProhibitSurrogateCharactersValidator))
+    ]
+    if not field.required or field.allow_null or validators:
+        raise ImproperlyConfigured(f"Field {field.field_name} of the webhook serializers is not supported")
+    if isinstance(field, serializers.Serializer):
+        return {name: get_serializer_schema(child) for name, child in field.fields.items()}
+    if isinstance(field, serializers.ListField) and field.allow_empty:
+        return [get_serializer_schema(field.child)]
+    if isinstance(field, serializers.DictField) and isinstance(field.child, UnvalidatedField):
+        return dict
+    if type(field) is serializers.IntegerField:
+        return int
+    if type(field) is serializers.CharField and field.trim_whitespace and not field.allow_blank:
+        return str
+    raise ImproperlyConfigured(f"Field {field.field_name} of the webhook serializers is not supported")
+
+
+# Schemas of the MatchZy events, generated from their serializers.
+MATCH_EVENT_SCHEMA = get_serializer_schema(MatchEventSerializer())
+WEBHOOK_EVENTS_SERIALIZERS = {
+    MatchEventEnum.SERIES_START: MatchEventSeriesStartSerializer,
+    MatchEventEnum.SERIES_END: MatchEventSeriesEndSerializer,
+    MatchEventEnum.MAP_RESULT: MatchEventMapResultSerializer,
+    MatchEventEnum.GOING_LIVE: MatchEventGoingLiveSerializer,
+}
+WEBHOOK_EVENTS_SCHEMAS = {
+    event: get_serializer_schema(serializer_class()) for event, serializer_class in WEBHOOK_EVENTS_SERIALIZERS.items()
+}
+# Events changing the match status, the other ones are published without loading the match.
+WEBHOOK_EVENTS_STATUSES = {
+    MatchEventEnum.SERIES_START: MatchStatus.STARTED,
+    MatchEventEnum.GOING_LIVE: MatchStatus.LIVE,
+    MatchEventEnum.SERIES_END: MatchStatus.FINISHED,
+}
+# Events published with the request data as is.
+WEBHOOK_RAW_EVENTS = {MatchEventEnum.ROUND_END}
+
+RE_DECIMAL = re.compile(r"\.0*\s*$")
+REQUIRED_ERROR = "This field is required."
+NULL_ERROR = "This field may not be null."
+
+Validator = Callable[[Any], Any]
+
+
+def validate_int(value) -> int:
+    if type(value) is int:
+        return value
+    try:
+        return int(RE_DECIMAL.sub("", str(value)))
+    except (ValueError, TypeError):
+        raise ValidationError(["A valid integer is required."], code="invalid")
+
+
+def validate_str(value) -> str:
+    if type(value) is str:
+        value = value.strip()
+    elif isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValidationError(["Not a valid string."], code="invalid")
+    else:
+        value = str(value).strip()
+    if not value:
+        raise ValidationError(["This field may not be blank."], code="blank")
+    if "\x00" in value:
+        raise ValidationError(["Null characters are not allowed."], code="null_characters_not_allowed")
+    if not value.isascii():
+        for char in value:
+            if 0xD800 <= ord(char) <= 0xDFFF:
+                raise ValidationError(
+                    [f"Surrogate characters are not allowed: U+{ord(char):X}."], code="surrogate_characters_not_allowed"
+                )
+    return value
+
+
+def validate_dict(value) -> dict:
+    if not isinstance(value, dict):
+        raise ValidationError(
+            [f'Expected a dictionary of items but got type "{type(value).__name__}".'], code="not_a_dict"
+        )
+    return {str(key): item for key, item in value.items()}
+
+
+def compile_list_validator(item_validator: Validator) -> Validator:
+    def validate_list(value) -> list:
+        if isinstance(value, (str, Mapping)) or not hasattr(value, "__iter__"):
+            raise ValidationError(
+                [f'Expected a list of items but got type "{type(value).__name__}".'], code="not_a_list"
+            )
+        items, errors = [], {}
+        for index, item in enumerate(value):
+            try:
+                items.append(item_validator(item))
+            except ValidationError as e:
+                errors[index] = e.detail
+        if errors:
+            raise ValidationError(errors)
+        return items
+
+    return validate_list
+
+
+def compile_object_validator(fields: list[tuple[str, Validator]]) -> Validator:
+    def validate_object(value) -> dict:
+        if not isinstance(value, Mapping):
+            raise ValidationError(
+                {"non_field_errors": [f"Invalid data. Expected a dictionary, but got {type(value).__name__}."]},
+                code="invalid",
+            )
+        data, errors = {}, {}
+        for name, validator in fields:
+            if name not in value:
+                errors[name] = [ErrorDetail(REQUIRED_ERROR, code="required")]
+            elif value[name] is None:
+                errors[name] = [ErrorDetail(NULL_ERROR, code="null")]
+            else:
+                try:
+                    data[name] = validator(value[name])
+                except ValidationError as e:
+                    errors[name] = e.detail
+        if errors:
+            raise ValidationError(errors)
+        return data
+
+    return validate_object
+
+
+def compile_validator(schema) -> Validator:
+    """
+    Compile a schema into a validator function.
+
+    Args:
+    -----
+        schema: ``int``, ``str`` or ``dict`` for a scalar, a dict of schemas for an object or a one item
+            list for a list of items.
+
+    Returns:
+    --------
+        Callable: Function returning the validated value or raising ValidationError with the errors of
+        the equivalent serializer.
+    """
+    if schema is int:
+        return validate_int
+    if schema is str:
+        return validate_str
+    if schema is dict:
+        return validate_dict
+    if isinstance(schema, list):
+        return compile_list_validator(compile_validator(schema[0]))
+    return compile_object_validator([(name, compile_validator(field)) for name, field in schema.items()])
+
+
+validate_match_event = compile_validator(MATCH_EVENT_SCHEMA)
+WEBHOOK_EVENTS_VALIDATORS = {
+    event: compile_validator({**MATCH_EVENT_SCHEMA, **WEBHOOK_EVENTS_SCHEMAS.get(event, {})})
+    for event in MatchEventEnum
+}
+
+
+def validate_webhook_event(payload) -> tuple[MatchEventEnum | None, dict]:
+    """
+    Validate a webhook payload with the validator of its event in a single pass.
+
+    Args:
+    -----
+        payload (dict): Request data.
+
+    Returns:
+    --------
+        tuple[MatchEventEnum | None, dict]: Event, None if it is unknown, and validated data.
+    """
+    event = payload.get("event") if isinstance(payload, Mapping) else None
+    try:
+        event = MatchEventEnum(event)
+    except ValueError:
+        return None, validate_match_event(payload)
+    return event, WEBHOOK_EVENTS_VALIDATORS[event](payload)
+
+
+def get_match_guild_id(match_id: str) -> str | None:
+    """
+    Get the Discord guild ID of a match, cached until the match or its guild is changed, or deleted,
+    and for at most ``MATCH_GUILD_CACHE_TIMEOUT`` seconds.
+
+    Args:
+    -----
+        match_id (str): Match ID.
+
+    Returns:
+    --------
+        str | None: Discord guild ID, MATCH_GUILD_NOT_SET if the match has no guild or None if the match does not exist.
+    """
+    if not match_id.isdigit():
+        return None
+    key = get_match_guild_cache_key(match_id)
+    guild_id = cache.get(key)
+    if guild_id is None:
+        row = Match.objects.filter(pk=match_id).values_list("guild__guild_id").first()
+        if row is None:
+            return None
+        guild_id = row[0] or MATCH_GUILD_NOT_SET
+        cache.set(key, guild_id, timeout=settings.MATCH_GUILD_CACHE_TIMEOUT)
+    return guild_id
+
+
+async def aget_match_guild_id(match_id: str) -> str | None:
+    """
+    Async variant of ``get_match_guild_id``.
+
+    Args:
+    -----
+        match_id (str): Match ID.
+
+    Returns:
+    --------
+        str | None: Discord guild ID, MATCH_GUILD_NOT_SET if the match has no guild or None if the match does not exist.
+    """
+    if not match_id.isdigit():
+        return None
+    key = get_match_guild_cache_key(match_id)
+    guild_id = await cache.aget(key)
+    if guild_id is None:
+        row = await Match.objects.filter(pk=match_id).values_list("guild__guild_id").afirst()
+        if row is None:
+            return None
+        guild_id = row[0] or MATCH_GUILD_NOT_SET
+        await cache.aset(key, guild_id, timeout=settings.MATCH_GUILD_CACHE_TIMEOUT)
+    return guild_id
@@ -0,0 +1,226 @@
+import random
+import time
+from typing import Hashable, Iterable, NamedTuple
+
+# Up to this many players every division is tried, larger pools use greedy and local search.
+EXACT_SEARCH_MAX_PLAYERS = 10
+DEFAULT_TIME_BUDGET = 0.05
+# Rating sums closer than this are balanced enough to stop searching.
+DIFFERENCE_TOLERANCE = 1.0
+
+
+class BalancedTeams(NamedTuple):
+    """
+    Players divided into two teams.
+
+    Attributes
+    ----------
+        team1 (list): Players of the first team, it gets the smaller half of an odd pool.
+        team2 (list): Players of the second team.
+        difference (float): Absolute difference between the rating sums of both teams.
+    """
+    team1: list
+    team2: list
+    difference: float
+
+
+class Unit(NamedTuple):
+    """Players who have to play in the same team."""
+    players: list
+    rating: float
+
+
+class Division:
+    """Units split between two teams, with rating sums and player counts kept up to date."""
+
+    def __init__(self, units: list[Unit], in_team1: list[bool]):
+        self.units = units
+        self.in_team1 = in_team1
+        self.size1 = sum(len(unit.players) for unit, team1 in zip(units, in_team1) if team1)
+        self.rating1 = sum(unit.rating for unit, team1 in zip(units, in_team1) if team1)
+        self.total_rating = sum(unit.rating for unit in units)
+
+    @property
+    def difference(self) -> float:
+        return abs(self.total_rating - 2 * self.rating1)
+
+    def cost(self, target_size: int) -> tuple[int, float]:
+        return abs(self.size1 - target_size), self.difference
+
+    def to_teams(self) -> BalancedTeams:
+        team1, team2 = [], []
+        for unit, in_team1 in zip(self.units, self.in_team1):
+            (team1 if in_team1 else team2).extend(unit.players)
+        return BalancedTeams(team1, team2, self.difference)
+
+
+def get_units(ratings: dict[Hashable, float], parties: Iterable[Iterable[Hashable]]) -> list[Unit]:
+    """
+    Group players into units, parties sharing a player are merged.
+
+    Args:
+    -----
+        ratings (dict[Hashable, float]): Ratings keyed by player.
+        parties (Iterable[Iterable[Hashable]]): Groups of players who have to play together.
+
+    Returns:
+    --------
+        list[Unit]: Units in the order of their first player in ``ratings``.
+    """
+    groups = {player: player for player in ratings}
+
+    def find(player):
+        while groups[player] != player:
+            groups[player] = groups[groups[player]]
+            player = groups[player]
+        return player
+
+    for party in parties:
+        party = [player for player in party if player in ratings]
+        for player in party[1:]:
+            groups[find(player)] = find(party[0])
+    units: dict[Hashable, list] = {}
+    for player in ratings:
+        units.setdefault(find(player), []).append(player)
+    return [Unit(players, sum(ratings[player] for player in players)) for players in units.values()]
+
+
+def exact_search(units: list[Unit], target_size: int) -> Division:
+    best_mask, best_cost = 0, None
+    total_rating = sum(unit.rating for unit in units)
+    for mask in range(1 << len(units)):
+        size = rating = 0
+        for index, unit in enumerate(units):
+            if mask >> index & 1:
+                size += len(unit.players)
+                rating += unit.rating
+        cost = (abs(size - target_size), abs(total_rating - 2 * rating))
+        if best_cost is None or cost < best_cost:
+            best_mask, best_cost = mask, cost
+    return Division(units, [bool(best_mask >> index & 1) for index in range(len(units))])
+
+
+def greedy_division(units: list[Unit], target_size: int) -> Division:
+    capacities = [target_size, sum(len(unit.players) for unit in units) - target_size]
+    ratings = [0.0, 0.0]
+    in_team1 = [False] * len(units)
+    order = sorted(range(len(units)), key=lambda index: (len(units[index].players), units[index].rating), reverse=True)
+    for index in order:
+        size = len(units[index].players)
+        fitting = [team for team in (0, 1) if capacities[team] >= size]
+        if fitting:
+            team = min(fitting, key=lambda team: ratings[team])
+        else:
+            team = max((0, 1), key=lambda team: capacities[team])
+        capacities[team] -= size
+        ratings[team] += units[index].rating
+        in_team1[index] = team == 0
+    return Division(units, in_team1)
+
+
+def find_sized_division(units: list[Unit], target_size: int) -> Division | None:
+    """
+    Put units of exactly ``target_size`` players in team 1, ignoring ratings.
+
+    Args:
+    -----
+        units (list[Unit]): Units to divide.
+        target_size (int): Players of team 1.
+
+    Returns:
+    --------
+        Division | None: Division or None if the sizes of the units can't add up to ``target_size``.
+    """
+    # Size reached by team 1 -> size before adding the unit that reached it, and that unit.
+    reached = {0: None}
+    for index, unit in enumerate(units):
+        for size in list(reached):
+            new_size = size + len(unit.players)
+            if new_size <= target_size and new_size not in reached:
+                reached[new_size] = (size, index)
+    if target_size not in reached:
+        return None
+    in_team1 = [False] * len(units)
+    size = target_size
+    while reached[size] is not None:
+        size, index = reached[size]
+        in_team1[index] = True
+    return Division(units, in_team1)
+
+
+def local_search(division: Division, target_size: int, deadline: float) -> Division:
+    """Swap units of both teams, and move units while it evens the sizes, until nothing improves."""
+    units = division.units
+    while time.perf_counter() < deadline:
+        best_cost, best_change = division.cost(target_size), None
+        team1 = [index for index, in_team1 in enumerate(division.in_team1) if in_team1]
+        team2 = [index for index, in_team1 in enumerate(division.in_team1) if not in_team1]
+        for index in team1 + team2:
+            sign = -1 if division.in_team1[index] else 1
+            size1 = division.size1 + sign * len(units[index].players)
+            rating1 = division.rating1 + sign * units[index].rating
+            cost = (abs(size1 - target_size), abs(division.total_rating - 2 * rating1))
+            if cost < best_cost:
+                best_cost, best_change = cost, (index,)
+        for index1 in team1:
+            unit1 = units[index1]
+            for index2 in team2:
+                unit2 = units[index2]
+                size1 = division.size1 - len(unit1.players) + len(unit2.players)
+                rating1 = division.rating1 - unit1.rating + unit2.rating
+                cost = (abs(size1 - target_size), abs(division.total_rating - 2 * rating1))
+                if cost < best_cost:
+                    best_cost, best_change = cost, (index1, index2)
+        if best_change is None:
+            break
+        for index in best_change:
+            sign = -1 if division.in_team1[index] else 1
+            division.size1 += sign * len(units[index].players)
+            division.rating1 += sign * units[index].rating
+            division.in_team1[index] = not division.in_team1[index]
+    return division
+
+
+def balance_teams(
+    ratings: dict[Hashable, float],
+    parties: Iterable[Iterable[Hashable]] = (),
+    time_budget: float = DEFAULT_TIME_BUDGET,
+) -> BalancedTeams:
+    """
+    Divide players into two teams with the closest rating sums.
+
+    Pools of up to ``EXACT_SEARCH_MAX_PLAYERS`` players are searched exhaustively. Larger pools start
+    from a greedy division improved by swapping players between the teams, restarted from shuffled
+    divisions until the rating sums are within ``DIFFERENCE_TOLERANCE`` or the time budget runs out.
+    Players with equal ratings are shuffled, so the teams are still random when nobody has a rating yet.
+    If the search misses team sizes the parties allow, it restarts from a division of those sizes.
+
+    Args:
+    -----
+        ratings (dict[Hashable, float]): Ratings keyed by player.
+        parties (Iterable[Iterable[Hashable]]): Groups of players who have to play in the same team.
+        time_budget (float): Seconds the local search may take.
+
+    Returns:
+    --------
+        BalancedTeams: Both teams and the difference of their rating sums. Team sizes differ by at
+        most one unless the parties make it impossible.
+    """
+    deadline = time.perf_counter() + time_budget
+    units = get_units(ratings, parties)
+    random.shuffle(units)
+    target_size = len(ratings) // 2
+    if len(ratings) <= EXACT_SEARCH_MAX_PLAYERS:
+        return exact_search(units, target_size).to_teams()
+    best = local_search(greedy_division(units, target_size), target_size, deadline)
+    while best.cost(target_size) >= (0, DIFFERENCE_TOLERANCE) and time.perf_counter() < deadline:
+        in_team1 = list(best.in_team1)
+        random.shuffle(in_team1)
+        division = local_search(Division(units, in_team1), target_size, deadline)
+        if division.cost(target_size) < best.cost(target_size):
+            best = division
+    if best.size1 != target_size:
+        division = find_sized_division(units, target_size)
+        if division is not None:
+            best = local_search(division, target_size, deadline)
+    return best.to_teams()
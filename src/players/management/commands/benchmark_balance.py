@@ -0,0 +1,40 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from players.balance import balance_teams
+
+
+class Command(BaseCommand):
+    help = "Measure the rating difference and latency of the team balancing against a random division"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pools", type=int, nargs="+", default=[10, 20, 64], help="Players per pool")
+        parser.add_argument("--repeat", type=int, default=50, help="Pools per measurement")
+        parser.add_argument("--time-budget", type=float, default=0.05, help="Seconds per division")
+        parser.add_argument("--party-size", type=int, default=2, help="Players per party")
+        parser.add_argument("--parties", type=int, default=2, help="Parties per pool")
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        for players_count in options["pools"]:
+            random_differences, differences, durations = [], [], []
+            for _ in range(options["repeat"]):
+                ratings = {f"player{i}": rng.gauss(1000, 150) for i in range(players_count)}
+                players = list(ratings)
+                parties = [
+                    players[i:i + options["party_size"]]
+                    for i in range(0, options["parties"] * options["party_size"], options["party_size"])
+                ]
+                rng.shuffle(players)
+                random_differences.append(abs(sum(ratings[p] for p in players[::2]) - sum(ratings[p] for p in players[1::2])))
+                started_at = time.perf_counter()
+                differences.append(balance_teams(ratings, parties, options["time_budget"]).difference)
+                durations.append(time.perf_counter() - started_at)
+            self.stdout.write(
+                f"{players_count:>3} players  random {statistics.median(random_differences):8.1f}  "
+                f"balanced {statistics.median(differences):8.3f}  "
+                f"median {statistics.median(durations) * 1_000:6.2f} ms  max {max(durations) * 1_000:6.2f} ms"
+            )
@@ -0,0 +1,32 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from players.steam import SteamAPIError, refresh_steam_users
+
+
+class Command(BaseCommand):
+    help = "Refresh the usernames and avatars of Steam users with batched GetPlayerSummaries calls"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.STEAM_PROFILE_REFRESH_INTERVAL,
+            help="Seconds between refreshes",
+        )
+        parser.add_argument("--limit", type=int, default=None, help="Maximum Steam users per refresh")
+        parser.add_argument("--once", action="store_true", help="Refresh once and exit")
+
+    def handle(self, *args, **options):
+        while True:
+            started_at = time.monotonic()
+            try:
+                refreshed = refresh_steam_users(limit=options["limit"])
+                self.stdout.write(f"Refreshed {refreshed} Steam users")
+            except SteamAPIError as e:
+                self.stderr.write(e.message)
+            if options["once"]:
+                return
+            time.sleep(max(options["interval"] - (time.monotonic() - started_at), 0))
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.14 on 2026-10-18 10:56
+
+from django.db import migrations, models
+
+
+def merge_duplicates(apps, schema_editor, model_name, field_name):
+    """Keep the oldest row of every duplicated value, rows pointing to the others are moved to it."""
+    model = apps.get_model('players', model_name)
+    if schema_editor.connection.vendor == "postgresql":
+        # Check the moved foreign keys now, pending trigger events would block the ALTER TABLE below
+        schema_editor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+    duplicated_values = list(
+        model.objects.exclude(**{f"{field_name}__isnull": True})
+        .values(field_name)
+        .annotate(count=models.Count("pk"))
+        .filter(count__gt=1)
+        .values_list(field_name, flat=True)
+    )
+    for value in duplicated_values:
+        kept, *duplicates = model.objects.filter(**{field_name: value}).order_by("created_at", "pk")
+        for relation in model._meta.related_objects:
+            if relation.many_to_many:
+                continue
+            relation.related_model.objects.filter(**{f"{relation.field.name}__in": duplicates}).update(
+                **{relation.field.name: kept}
+            )
+        model.objects.filter(pk__in=[duplicate.pk for duplicate in duplicates]).delete()
+
+
+def merge_duplicated_users(apps, schema_editor):
+    merge_duplicates(apps, schema_editor, "DiscordUser", "user_id")
+    merge_duplicates(apps, schema_editor, "SteamUser", "steamid64")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0005_alter_player_steam_user'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicated_users, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='discorduser',
+            name='user_id',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='steamuser',
+            name='steamid64',
+            field=models.CharField(max_length=255, null=True, unique=True),
+        ),
+    ]
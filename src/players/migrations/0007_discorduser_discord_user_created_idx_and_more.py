@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0006_alter_discorduser_user_id_alter_steamuser_steamid64'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='discorduser',
+            index=models.Index(fields=['created_at', 'id'], name='discord_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['created_at', 'id'], name='player_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='steamuser',
+            index=models.Index(fields=['created_at', 'id'], name='steam_user_created_idx'),
+        ),
+    ]
@@ -5,11 +5,16 @@ from prefix_id import PrefixIDField
 # Create your models here.
 class DiscordUser(models.Model):
     id = PrefixIDField(primary_key=True, prefix="dc_user")
-    user_id = models.CharField(max_length=255)
+    user_id = models.CharField(max_length=255, unique=True)
     username = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="discord_user_created_idx"),
+        ]
+
     def __str__(self):
         return f"<{self.id} - {self.user_id} - {self.username}>"
 
@@ -17,13 +22,18 @@ class DiscordUser(models.Model):
 class SteamUser(models.Model):
     id = PrefixIDField(primary_key=True, prefix="steam_user")
     username = models.CharField(max_length=255)
-    steamid64 = models.CharField(max_length=255, null=True)
+    steamid64 = models.CharField(max_length=255, null=True, unique=True)
     steamid32 = models.CharField(max_length=255, null=True)
     profile_url = models.CharField(max_length=255, null=True)
     avatar = models.CharField(max_length=255, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="steam_user_created_idx"),
+        ]
+
     def __str__(self):
         return f"<{self.id} - {self.steamid64} - {self.username}>"
 
@@ -35,6 +45,11 @@ class Player(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="player_created_idx"),
+        ]
+
     def __str__(self):
         return (
             f"<{self.id} - {self.discord_user.username} - {self.steam_user.username}>" if self.steam_user else  f"<{self.id} - {self.discord_user.username}>"
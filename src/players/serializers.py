@@ -1,6 +1,8 @@
 from players.models import Player, Team, DiscordUser, SteamUser
 from rest_framework import serializers
 
+from api.serializers import DynamicFieldsMixin
+
 
 class DiscordUserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -14,19 +16,21 @@ class SteamUserSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class PlayerSerializer(serializers.ModelSerializer):
+class PlayerSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     discord_user = DiscordUserSerializer()
     steam_user = SteamUserSerializer(allow_null=True)
 
     class Meta:
         model = Player
         fields = "__all__"
+        expandable_fields = ("discord_user", "steam_user")
 
 
-class TeamSerializer(serializers.ModelSerializer):
+class TeamSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     players = PlayerSerializer(many=True, read_only=True)
     leader = PlayerSerializer()
 
     class Meta:
         model = Team
         fields = "__all__"
+        expandable_fields = ("players", "leader")
@@ -0,0 +1,227 @@
+import threading
+import time
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.dispatch import Signal
+from django.utils import timezone
+from steam.steamid import SteamID
+
+from accounts.clients import get_steam_webapi
+from players.models import SteamUser
+
+STEAM_SUMMARY_CACHE_KEY = "steam_summary:{}"
+# Steam IDs accepted by a single ISteamUser.GetPlayerSummaries call.
+PLAYER_SUMMARIES_MAX_STEAMIDS = 100
+PROFILE_FIELDS = ["username", "profile_url", "avatar"]
+
+# Sent with ``steam_users_ids`` after refresh_steam_users changed profiles, bulk_update sends no post_save.
+steam_users_refreshed = Signal()
+
+
+class SteamAPIError(Exception):
+    """Steam Web API call failed after all retries."""
+
+    def __init__(self, message: str, status: int | None = None) -> None:
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+class SteamRateLimiter:
+    """
+    Spaces the Steam Web API calls of a process and holds them back after Steam asked to slow down.
+
+    Methods
+    -------
+        wait: Sleep until the next call is allowed.
+        back_off: Hold back all calls for some seconds.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the SteamRateLimiter."""
+        self._next_call_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self, min_interval: float = 0.0) -> None:
+        with self._lock:
+            now = time.monotonic()
+            call_at = max(now, self._next_call_at)
+            self._next_call_at = call_at + min_interval
+        if call_at > now:
+            time.sleep(call_at - now)
+
+    def back_off(self, seconds: float) -> None:
+        with self._lock:
+            self._next_call_at = max(self._next_call_at, time.monotonic() + seconds)
+
+
+steam_rate_limiter = SteamRateLimiter()
+
+
+def get_steam_summary_cache_key(steamid64: str) -> str:
+    return STEAM_SUMMARY_CACHE_KEY.format(steamid64)
+
+
+def get_retry_after(response, attempt: int) -> float:
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    try:
+        return max(float(retry_after), 0.0)
+    except (TypeError, ValueError):
+        return float(2 ** attempt)
+
+
+def to_profile(summary: dict) -> dict:
+    """
+    Convert a player summary of the Steam Web API to the fields of a SteamUser.
+
+    Args:
+    -----
+        summary (dict): Player of a ``GetPlayerSummaries`` response.
+
+    Returns:
+    --------
+        dict: Username, steamid64, steamid32, profile URL and avatar.
+    """
+    return {
+        "username": summary["personaname"],
+        "steamid64": summary["steamid"],
+        "steamid32": SteamID(summary["steamid"]).as_steam2,
+        "profile_url": summary["profileurl"],
+        "avatar": summary["avatarfull"],
+    }
+
+
+def call_player_summaries(steamids: list[str], min_interval: float, retries: int) -> list[dict]:
+    for attempt in range(retries + 1):
+        steam_rate_limiter.wait(min_interval)
+        try:
+            results = get_steam_webapi().call("ISteamUser.GetPlayerSummaries", steamids=",".join(steamids))
+            return results["response"]["players"]
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            retryable = status == 429 or (status is not None and status >= 500)
+            if not retryable or attempt == retries:
+                raise SteamAPIError(f"GetPlayerSummaries failed: {e}", status) from e
+            steam_rate_limiter.back_off(get_retry_after(e.response, attempt))
+        except requests.RequestException as e:
+            if attempt == retries:
+                raise SteamAPIError(f"GetPlayerSummaries failed: {e}") from e
+            steam_rate_limiter.back_off(get_retry_after(None, attempt))
+    return []
+
+
+def fetch_player_summaries(
+    steamids, min_interval: float = 0.0, retries: int | None = None
+) -> dict[str, dict]:
+    """
+    Fetch the profiles of Steam users, ``PLAYER_SUMMARIES_MAX_STEAMIDS`` per API call, and cache them.
+
+    Rate limited (429) and failed (5xx) calls are retried after the ``Retry-After`` of the response,
+    or an exponential back-off, and hold back the other calls of the process meanwhile.
+
+    Args:
+    -----
+        steamids (Iterable[str]): Steam IDs 64.
+        min_interval (float): Minimum seconds between two API calls.
+        retries (int | None): Retries of a call, ``STEAM_API_RETRIES`` by default.
+
+    Returns:
+    --------
+        dict[str, dict]: Profiles keyed by steamid64, unknown Steam IDs are left out.
+
+    Raises:
+    -------
+        SteamAPIError: If a call still fails after all retries.
+    """
+    if retries is None:
+        retries = settings.STEAM_API_RETRIES
+    steamids = list(dict.fromkeys(steamids))
+    profiles = {}
+    for start in range(0, len(steamids), PLAYER_SUMMARIES_MAX_STEAMIDS):
+        batch = steamids[start:start + PLAYER_SUMMARIES_MAX_STEAMIDS]
+        for summary in call_player_summaries(batch, min_interval, retries):
+            profile = to_profile(summary)
+            profiles[profile["steamid64"]] = profile
+    cache.set_many(
+        {get_steam_summary_cache_key(steamid64): profile for steamid64, profile in profiles.items()},
+        timeout=settings.STEAM_SUMMARY_CACHE_TIMEOUT,
+    )
+    return profiles
+
+
+def get_player_summary(steamid64: str) -> dict | None:
+    """
+    Get the profile of a Steam user, cached for ``STEAM_SUMMARY_CACHE_TIMEOUT`` seconds.
+
+    Args:
+    -----
+        steamid64 (str): Steam ID 64.
+
+    Returns:
+    --------
+        dict | None: Profile or None if the Steam ID does not exist.
+    """
+    profile = cache.get(get_steam_summary_cache_key(steamid64))
+    if profile is None:
+        profile = fetch_player_summaries([steamid64]).get(steamid64)
+    return profile
+
+
+def refresh_steam_users(limit: int | None = None, min_interval: float | None = None) -> int:
+    """
+    Refresh the username, profile URL and avatar of Steam users not updated for ``STEAM_PROFILE_REFRESH_AGE``.
+
+    The least recently updated users go first, every batch of ``PLAYER_SUMMARIES_MAX_STEAMIDS`` users
+    costs one API call and one ``bulk_update``. Users missing from the response keep their profile and
+    are checked again after ``STEAM_PROFILE_REFRESH_AGE``. ``steam_users_refreshed`` is sent with the
+    users whose profile changed.
+
+    Args:
+    -----
+        limit (int | None): Maximum number of users to refresh.
+        min_interval (float | None): Minimum seconds between two API calls, ``STEAM_API_MIN_INTERVAL`` by default.
+
+    Returns:
+    --------
+        int: Number of refreshed users.
+    """
+    if min_interval is None:
+        min_interval = settings.STEAM_API_MIN_INTERVAL
+    stale_before = timezone.now() - timedelta(seconds=settings.STEAM_PROFILE_REFRESH_AGE)
+    queryset = (
+        SteamUser.objects.exclude(steamid64=None)
+        .filter(updated_at__lt=stale_before)
+        .order_by("updated_at", "id")
+        .values_list("id", flat=True)
+    )
+    if limit is not None:
+        queryset = queryset[:limit]
+    ids = list(queryset)
+    refreshed = 0
+    for start in range(0, len(ids), PLAYER_SUMMARIES_MAX_STEAMIDS):
+        steam_users = list(
+            SteamUser.objects.filter(id__in=ids[start:start + PLAYER_SUMMARIES_MAX_STEAMIDS]).only(
+                "id", "steamid64", *PROFILE_FIELDS, "updated_at"
+            )
+        )
+        profiles = fetch_player_summaries(
+            [steam_user.steamid64 for steam_user in steam_users], min_interval=min_interval
+        )
+        now = timezone.now()
+        changed_ids = []
+        for steam_user in steam_users:
+            profile = profiles.get(steam_user.steamid64)
+            if profile is not None:
+                if any(getattr(steam_user, field) != profile[field] for field in PROFILE_FIELDS):
+                    changed_ids.append(steam_user.id)
+                for field in PROFILE_FIELDS:
+                    setattr(steam_user, field, profile[field])
+                refreshed += 1
+            steam_user.updated_at = now
+        SteamUser.objects.bulk_update(steam_users, [*PROFILE_FIELDS, "updated_at"])
+        if changed_ids:
+            steam_users_refreshed.send(sender=SteamUser, steam_users_ids=changed_ids)
+    return refreshed
@@ -0,0 +1,83 @@
+import itertools
+import random
+
+import pytest
+
+from players.balance import balance_teams, find_sized_division, get_units
+
+
+def get_best_difference(ratings: dict) -> float:
+    players = list(ratings)
+    total = sum(ratings.values())
+    return min(
+        abs(total - 2 * sum(ratings[player] for player in team1))
+        for team1 in itertools.combinations(players, len(players) // 2)
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("players_count", [2, 5, 9, 10])
+def test_balance_teams_exact(players_count):
+    ratings = {f"player{i}": random.uniform(800, 1600) for i in range(players_count)}
+    team1, team2, difference = balance_teams(ratings)
+    assert len(team1) == players_count // 2
+    assert sorted(team1 + team2) == sorted(ratings)
+    assert difference == pytest.approx(get_best_difference(ratings))
+    assert difference == pytest.approx(abs(sum(ratings[p] for p in team1) - sum(ratings[p] for p in team2)))
+
+
+@pytest.mark.django_db
+def test_balance_teams_keeps_parties_together():
+    ratings = {"a": 2000, "b": 1900, "c": 1000, "d": 1000, "e": 1000, "f": 1000}
+    team1, team2, difference = balance_teams(ratings, [["a", "b"]])
+    team = team1 if "a" in team1 else team2
+    assert "b" in team
+    assert len(team1) == len(team2) == 3
+    # a, b and the weakest player against the other three
+    assert difference == 1900
+
+
+@pytest.mark.django_db
+def test_get_units_merges_parties():
+    units = get_units({"a": 1, "b": 2, "c": 3, "d": 4}, [["a", "b"], ["b", "c"], ["x"]])
+    assert sorted((sorted(unit.players), unit.rating) for unit in units) == [(["a", "b", "c"], 6), (["d"], 4)]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("players_count", [20, 64])
+def test_balance_teams_heuristic(players_count):
+    ratings = {f"player{i}": random.uniform(800, 1600) for i in range(players_count)}
+    parties = [[f"player{i}", f"player{i + 1}"] for i in range(0, 8, 2)]
+    team1, team2, difference = balance_teams(ratings, parties, time_budget=0.05)
+    assert len(team1) == len(team2) == players_count // 2
+    assert sorted(team1 + team2) == sorted(ratings)
+    for party in parties:
+        assert set(party) <= set(team1) or set(party) <= set(team2)
+    # Far closer than any single swap of players could be
+    assert difference < 10
+
+
+@pytest.mark.django_db
+def test_balance_teams_is_random_without_ratings():
+    ratings = {f"player{i}": 1000 for i in range(10)}
+    divisions = {frozenset(balance_teams(ratings).team1) for _ in range(20)}
+    assert len(divisions) > 1
+
+
+@pytest.mark.django_db
+def test_find_sized_division():
+    units = get_units({f"player{i}": 1000 for i in range(10)}, [["player0", "player1", "player2"], ["player3", "player4"]])
+    assert find_sized_division(units, 5).size1 == 5
+    units = get_units({f"player{i}": 1000 for i in range(10)}, [[f"player{i}" for i in range(start, start + 3)] for start in (0, 3, 6)])
+    assert find_sized_division(units, 5) is None
+
+
+@pytest.mark.django_db
+def test_balance_teams_restarts_from_sized_division(mocker):
+    ratings = {f"player{i}": 1000 + i for i in range(20)}
+    parties = [[f"player{i}" for i in range(start, start + 3)] for start in (0, 3, 6)] + [["player9", "player10"]]
+    # Searches never improving a division of the wrong sizes
+    mocker.patch("players.balance.local_search", side_effect=lambda division, target_size, deadline: division)
+    mocker.patch("players.balance.greedy_division", side_effect=lambda units, target_size: find_sized_division(units, 0))
+    team1, team2, _ = balance_teams(ratings, parties, time_budget=0)
+    assert len(team1) == len(team2) == 10
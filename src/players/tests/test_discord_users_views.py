@@ -1,4 +1,6 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 
 from players.models import DiscordUser
@@ -49,6 +51,39 @@ def test_get_discord_users_list(client_with_api_key, discord_user_data):
     assert response.data["previous"] is None
 
 
+@pytest.mark.django_db
+def test_get_discord_users_list_cursor_pagination(client_with_api_key):
+    discord_users = DiscordUser.objects.bulk_create(
+        [DiscordUser(user_id=str(i), username=f"user{i}") for i in range(35)]
+    )
+    url = f"{API_ENDPOINT}?pagination=cursor"
+    pages = []
+    with CaptureQueriesContext(connection) as context:
+        while url:
+            response = client_with_api_key.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert "count" not in response.data
+            pages.append(response.data)
+            url = response.data["next"]
+    assert not any("COUNT(" in query["sql"] for query in context.captured_queries)
+    assert [len(page["results"]) for page in pages] == [15, 15, 5]
+    assert [result["id"] for page in pages for result in page["results"]] == [user.id for user in discord_users]
+    assert pages[0]["previous"] is None
+
+    response = client_with_api_key.get(pages[-1]["previous"])
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"] == pages[1]["results"]
+
+
+@pytest.mark.django_db
+def test_get_discord_users_list_page_number_pagination_is_default(client_with_api_key):
+    DiscordUser.objects.bulk_create([DiscordUser(user_id=str(i), username=f"user{i}") for i in range(20)])
+    response = client_with_api_key.get(f"{API_ENDPOINT}?page=2")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["count"] == 20
+    assert len(response.data["results"]) == 5
+
+
 @pytest.mark.django_db
 def test_get_discord_user(client_with_api_key, discord_user_data):
     discord_user = DiscordUser.objects.create(**discord_user_data)
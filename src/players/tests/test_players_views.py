@@ -66,4 +66,12 @@ def test_create_player(client_with_api_key):
 def test_delete_player(client_with_api_key, player):
     response = client_with_api_key.delete(f"{API_ENDPOINT}{player.id}/")
     assert response.status_code == status.HTTP_204_NO_CONTENT
-    assert Player.objects.count() == 0
\ No newline at end of file
+    assert Player.objects.count() == 0
+
+@pytest.mark.django_db
+def test_get_players_list_fields_and_expand(client_with_api_key, player):
+    response = client_with_api_key.get(f"{API_ENDPOINT}?fields=id,discord_user,steam_user&expand=discord_user")
+    assert response.status_code == status.HTTP_200_OK
+    assert set(response.data["results"][0]) == {"id", "discord_user", "steam_user"}
+    assert response.data["results"][0]["discord_user"]["id"] == player.discord_user.pk
+    assert response.data["results"][0]["steam_user"] == player.steam_user.pk
@@ -0,0 +1,142 @@
+from datetime import timedelta
+
+import pytest
+import requests
+from django.core.cache import cache
+from django.utils import timezone
+
+from accounts.auth import SteamAuthService
+from players.models import SteamUser
+from players.steam import (
+    SteamAPIError,
+    fetch_player_summaries,
+    get_player_summary,
+    get_steam_summary_cache_key,
+    refresh_steam_users,
+    steam_rate_limiter,
+)
+from players.tests.conftest import player, discord_user_data, steam_user_data, players
+
+
+def get_summary(steamid64: str) -> dict:
+    return {
+        "steamid": steamid64,
+        "personaname": f"name{steamid64}",
+        "profileurl": f"https://steamcommunity.com/profiles/{steamid64}/",
+        "avatarfull": f"https://avatars.steamstatic.com/{steamid64}_full.jpg",
+    }
+
+
+def get_http_error(status: int, retry_after: str | None = None) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+    return requests.HTTPError(f"{status} Error", response=response)
+
+
+@pytest.fixture
+def steam_webapi(mocker):
+    cache.clear()
+    webapi = mocker.Mock()
+    webapi.unknown = set()
+
+    def call(method_path, steamids):
+        return {
+            "response": {
+                "players": [get_summary(steamid) for steamid in steamids.split(",") if steamid not in webapi.unknown]
+            }
+        }
+
+    webapi.call.side_effect = call
+    mocker.patch("players.steam.get_steam_webapi", return_value=webapi)
+    mocker.patch("players.steam.time.sleep")
+    yield webapi
+    steam_rate_limiter._next_call_at = 0.0
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_fetch_player_summaries_batches_steamids(steam_webapi):
+    steamids = [str(76561198000000000 + i) for i in range(250)]
+    profiles = fetch_player_summaries(steamids + steamids[:10])
+
+    assert len(profiles) == 250
+    assert [len(call.kwargs["steamids"].split(",")) for call in steam_webapi.call.call_args_list] == [100, 100, 50]
+    profile = profiles[steamids[0]]
+    assert profile["username"] == f"name{steamids[0]}"
+    assert profile["steamid32"] == "STEAM_1:0:19867136"
+    assert cache.get(get_steam_summary_cache_key(steamids[-1])) == profiles[steamids[-1]]
+
+
+@pytest.mark.django_db
+def test_get_player_summary_is_cached(steam_webapi):
+    steamid64 = "76561198190469450"
+    assert get_player_summary(steamid64)["steamid64"] == steamid64
+    assert get_player_summary(steamid64)["steamid64"] == steamid64
+    assert steam_webapi.call.call_count == 1
+
+    steam_webapi.unknown.add("76561198000000001")
+    assert get_player_summary("76561198000000001") is None
+    with pytest.raises(Exception):
+        SteamAuthService().get_player_info("76561198000000001")
+
+
+@pytest.mark.django_db
+def test_fetch_player_summaries_retries_rate_limited_calls(steam_webapi, mocker):
+    back_off = mocker.spy(steam_rate_limiter, "back_off")
+    side_effect = steam_webapi.call.side_effect
+    errors = [get_http_error(429, "7"), get_http_error(503)]
+
+    def call(method_path, steamids):
+        if errors:
+            raise errors.pop(0)
+        return side_effect(method_path, steamids)
+
+    steam_webapi.call.side_effect = call
+    assert list(fetch_player_summaries(["76561198190469450"], retries=2)) == ["76561198190469450"]
+    assert [call.args[0] for call in back_off.call_args_list] == [7.0, 2.0]
+
+
+@pytest.mark.django_db
+def test_fetch_player_summaries_raises_after_retries(steam_webapi):
+    steam_webapi.call.side_effect = get_http_error(429)
+    with pytest.raises(SteamAPIError) as e:
+        fetch_player_summaries(["76561198190469450"], retries=1)
+    assert e.value.status == 429
+    assert steam_webapi.call.call_count == 2
+
+    steam_webapi.call.reset_mock()
+    steam_webapi.call.side_effect = get_http_error(403)
+    with pytest.raises(SteamAPIError):
+        fetch_player_summaries(["76561198190469450"], retries=3)
+    assert steam_webapi.call.call_count == 1
+
+
+@pytest.mark.django_db
+def test_refresh_steam_users(steam_webapi, players, django_assert_num_queries):
+    stale_at = timezone.now() - timedelta(days=2)
+    SteamUser.objects.update(updated_at=stale_at)
+    fresh_user = players[0].steam_user
+    SteamUser.objects.filter(pk=fresh_user.pk).update(updated_at=timezone.now())
+    unknown_user = players[1].steam_user
+    steam_webapi.unknown.add(unknown_user.steamid64)
+
+    # Select the stale users, then per batch one select, one bulk update and the matches of the changed users
+    with django_assert_num_queries(4):
+        refreshed = refresh_steam_users(min_interval=0)
+
+    stale_count = len(players) - 1
+    assert refreshed == stale_count - 1
+    assert steam_webapi.call.call_count == 1
+    steam_user = SteamUser.objects.get(pk=players[2].steam_user.pk)
+    assert steam_user.username == f"name{steam_user.steamid64}"
+    assert steam_user.avatar == f"https://avatars.steamstatic.com/{steam_user.steamid64}_full.jpg"
+    assert steam_user.updated_at > stale_at
+    unknown_user_after = SteamUser.objects.get(pk=unknown_user.pk)
+    assert unknown_user_after.username == unknown_user.username
+    assert unknown_user_after.updated_at > stale_at
+    assert SteamUser.objects.get(pk=fresh_user.pk).username == fresh_user.username
+
+    assert refresh_steam_users(min_interval=0) == 0
+    assert steam_webapi.call.call_count == 1
@@ -65,6 +65,17 @@ def test_get_team(client_with_api_key):
     assert response.data["updated_at"] is not None
 
 
+@pytest.mark.django_db
+def test_get_team_fields_and_expand(client_with_api_key, player):
+    team = Team.objects.create(name="Team 1", leader=player)
+    team.players.add(player)
+    response = client_with_api_key.get(f"{API_URL}{team.id}/?fields=name,leader,players&expand=leader")
+    assert response.status_code == status.HTTP_200_OK
+    assert set(response.data) == {"name", "leader", "players"}
+    assert response.data["leader"]["id"] == player.pk
+    assert response.data["players"] == [player.pk]
+
+
 @pytest.mark.django_db
 @pytest.mark.skip
 def test_create_team(client_with_api_key):
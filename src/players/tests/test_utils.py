@@ -0,0 +1,40 @@
+import pytest
+
+from players.models import DiscordUser, Player
+from players.tests.conftest import player, discord_user_data, steam_user_data, players
+from players.utils import PartyError, resolve_parties, resolve_players
+
+
+@pytest.mark.django_db
+def test_resolve_players(players, django_assert_num_queries):
+    players[1].steam_user = None
+    players[1].save()
+    DiscordUser.objects.create(user_id="123", username="without player")
+    discord_users_ids = [player.discord_user.user_id for player in players[:3]] + ["123", "456"]
+
+    with django_assert_num_queries(1):
+        resolved_players = resolve_players(discord_users_ids)
+        assert resolved_players.found[players[0].discord_user.user_id].steam_user == players[0].steam_user
+    assert list(resolved_players.found) == [players[0].discord_user.user_id, players[2].discord_user.user_id]
+    assert resolved_players.unlinked == {players[1].discord_user.user_id: players[1]}
+    assert resolved_players.missing == {"123", "456"}
+
+
+@pytest.mark.django_db
+def test_resolve_players_without_ids():
+    assert resolve_players([]) == ({}, set(), {})
+    assert not Player.objects.exists()
+
+
+@pytest.mark.django_db
+def test_resolve_parties_rejects_uneven_teams(players):
+    players_by_discord_user = {player.discord_user.user_id: player for player in players[:10]}
+    discord_users_ids = list(players_by_discord_user)
+    parties = [discord_users_ids[start:start + 3] for start in (0, 3, 6)]
+    with pytest.raises(PartyError) as e:
+        resolve_parties(parties, players_by_discord_user)
+    assert e.value.message == "Parties can't be divided into teams of 5 and 5 players"
+    assert e.value.users == discord_users_ids[:9]
+
+    resolved_parties = resolve_parties(parties[:2], players_by_discord_user)
+    assert resolved_parties == [[players_by_discord_user[user_id].id for user_id in party] for party in parties[:2]]
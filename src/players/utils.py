@@ -1,28 +1,143 @@
-from random import shuffle
+from typing import NamedTuple
+
+from django.conf import settings
+
+from players.balance import balance_teams, find_sized_division, get_units
 from players.models import Player, Team
 
+DEFAULT_RATING = 1000
+
+
+class ResolvedPlayers(NamedTuple):
+    """
+    Players resolved from discord user IDs.
 
-def divide_players(players_list: list[Player]) -> tuple[list[Player], list[Player]]:
+    Attributes
+    ----------
+        found (dict[str, Player]): Players with a connected steam user keyed by discord user ID.
+        missing (set[str]): Discord user IDs without a player.
+        unlinked (dict[str, Player]): Players without a connected steam user keyed by discord user ID.
     """
-    Divide a list of players into two lists.
+    found: dict[str, Player]
+    missing: set[str]
+    unlinked: dict[str, Player]
+
+
+def resolve_players(discord_users_ids: list[str]) -> ResolvedPlayers:
+    """
+    Resolve players of the given discord users with a single query.
+
+    Args:
+    -----
+        discord_users_ids (list[str]): Discord user IDs (``DiscordUser.user_id``).
+
+    Returns:
+    --------
+        ResolvedPlayers: Found, missing and unlinked players.
+    """
+    discord_users_ids = [str(discord_user_id) for discord_user_id in discord_users_ids]
+    players: dict[str, Player] = {}
+    for player in (
+        Player.objects.filter(discord_user__user_id__in=set(discord_users_ids))
+        .select_related("discord_user", "steam_user")
+        .order_by("created_at")
+    ):
+        players.setdefault(player.discord_user.user_id, player)
+    found: dict[str, Player] = {}
+    missing: set[str] = set()
+    unlinked: dict[str, Player] = {}
+    for discord_user_id in discord_users_ids:
+        player = players.get(discord_user_id)
+        if player is None:
+            missing.add(discord_user_id)
+        elif player.steam_user is None:
+            unlinked[discord_user_id] = player
+        else:
+            found[discord_user_id] = player
+    return ResolvedPlayers(found, missing, unlinked)
+
+
+class PartyError(Exception):
+    """Parties can't be kept together, ``message`` is returned to the user with ``users``."""
+
+    def __init__(self, message: str, users: list[str]) -> None:
+        super().__init__(message)
+        self.message = message
+        self.users = users
+
+
+def resolve_parties(parties: list[list[str]], players: dict[str, Player]) -> list[list[str]]:
+    """
+    Resolve parties of discord user IDs to parties of player IDs.
+
+    Args:
+    -----
+        parties (list[list[str]]): Discord user IDs of players who have to play in the same team.
+        players (dict[str, Player]): Players of the match keyed by discord user ID.
+
+    Returns:
+    --------
+        list[list[str]]: Player IDs of every party.
+
+    Raises:
+    -------
+        PartyError: A party member is not a player of the match, or the parties can't be divided into
+        teams of ``len(players) // 2`` and ``len(players) - len(players) // 2`` players.
+    """
+    resolved_parties = []
+    for party in parties:
+        party = list(dict.fromkeys(str(discord_user_id) for discord_user_id in party))
+        missing = [discord_user_id for discord_user_id in party if discord_user_id not in players]
+        if missing:
+            raise PartyError("Party members are not players of the match", missing)
+        if len(party) > len(players) // 2:
+            raise PartyError("Party is larger than a team", party)
+        resolved_parties.append([players[discord_user_id].id for discord_user_id in party])
+    team_size = len(players) // 2
+    units = get_units({player.id: 0.0 for player in players.values()}, resolved_parties)
+    if find_sized_division(units, team_size) is None:
+        raise PartyError(
+            f"Parties can't be divided into teams of {team_size} and {len(players) - team_size} players",
+            list(dict.fromkeys(str(discord_user_id) for party in parties for discord_user_id in party)),
+        )
+    return resolved_parties
+
+
+def divide_players(
+    players_list: list[Player],
+    ratings: dict[str, float] | None = None,
+    parties: list[list[str]] | None = None,
+) -> tuple[list[Player], list[Player]]:
+    """
+    Divide a list of players into two teams with the closest ratings.
 
     Args:
     -----
         players_list (list[Player]): List of players.
+        ratings (dict[str, float] | None): Ratings keyed by player ID, missing players get ``DEFAULT_RATING``.
+        parties (list[list[str]] | None): Player IDs of players who have to play in the same team.
 
     Returns:
     --------
         tuple[list[Player], list[Player]]: Tuple with two lists of players.
 
     """
-    shuffle(players_list)
-    num_members = len(players_list)
-    middle_index = num_members // 2
-    return players_list[:middle_index], players_list[middle_index:]
+    ratings = ratings or {}
+    players = {player.id: player for player in players_list}
+    team1, team2, _ = balance_teams(
+        {player_id: ratings.get(player_id, DEFAULT_RATING) for player_id in players},
+        parties or (),
+        time_budget=settings.TEAM_BALANCE_TIME_BUDGET,
+    )
+    return [players[player_id] for player_id in team1], [players[player_id] for player_id in team2]
 
 
 def create_default_teams(
-    team1_name: str, team2_name: str, players_list: list[Player]
+    team1_name: str,
+    team2_name: str,
+    players_list: list[Player],
+    ratings: dict[str, float] | None = None,
+    parties: list[list[str]] | None = None,
 ) -> tuple[Team, Team]:
     """
     Create two teams with the given players.
@@ -31,23 +146,20 @@ def create_default_teams(
     -----
         team1_name (str): Name of the first team.
         team2_name (str): Name of the second team.
-        team1_players_list (list[Player]): List of players for the first team.
-        team2_players_list (list[Player]): List of players for the second team.
+        players_list (list[Player]): Players divided between both teams.
+        ratings (dict[str, float] | None): Ratings keyed by player ID.
+        parties (list[list[str]] | None): Player IDs of players who have to play in the same team.
 
     Returns:
     --------
         tuple[Team, Team]: Tuple with two teams.
 
     """
-    team1 = Team.objects.get_or_create(name=team1_name)[0]
-    team2 = Team.objects.get_or_create(name=team2_name)[0]
-    team1_players_list, team2_players_list = divide_players(players_list)
-
+    team1_players_list, team2_players_list = divide_players(players_list, ratings, parties)
+    # Every match gets its own teams, a shared team would change the roster of the other matches
+    team1 = Team.objects.create(name=team1_name, leader=team1_players_list[0])
     team1.players.set(team1_players_list)
-    team1.leader = team1_players_list[0]
-    team1.save()
 
+    team2 = Team.objects.create(name=team2_name, leader=team2_players_list[0])
     team2.players.set(team2_players_list)
-    team2.leader = team2_players_list[0]
-    team2.save()
     return team1, team2
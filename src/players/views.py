@@ -1,23 +1,41 @@
+from django.db.models import Prefetch
+from drf_spectacular.utils import extend_schema, extend_schema_view
 from rest_framework import viewsets
+
+from api.pagination import CursorOrPageNumberPagination
+from api.serializers import SPARSE_FIELDS_PARAMETERS
 from players.models import Player, Team, DiscordUser, SteamUser
 from players.serializers import PlayerSerializer, TeamSerializer, DiscordUserSerializer, SteamUserSerializer
 
 
+@extend_schema_view(
+    list=extend_schema(parameters=SPARSE_FIELDS_PARAMETERS),
+    retrieve=extend_schema(parameters=SPARSE_FIELDS_PARAMETERS),
+)
 class PlayerViewSet(viewsets.ModelViewSet):
-    queryset = Player.objects.all().order_by("created_at")
+    queryset = Player.objects.select_related("discord_user", "steam_user").order_by("created_at")
     serializer_class = PlayerSerializer
+    pagination_class = CursorOrPageNumberPagination
 
 
 class DiscordUserViewSet(viewsets.ModelViewSet):
     queryset = DiscordUser.objects.all().order_by("created_at")
     serializer_class = DiscordUserSerializer
+    pagination_class = CursorOrPageNumberPagination
 
 
 class SteamUserViewSet(viewsets.ModelViewSet):
     queryset = SteamUser.objects.all().order_by("created_at")
     serializer_class = SteamUserSerializer
+    pagination_class = CursorOrPageNumberPagination
 
 
+@extend_schema_view(
+    list=extend_schema(parameters=SPARSE_FIELDS_PARAMETERS),
+    retrieve=extend_schema(parameters=SPARSE_FIELDS_PARAMETERS),
+)
 class TeamViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Team.objects.all().order_by("created_at")
+    queryset = Team.objects.select_related("leader__discord_user", "leader__steam_user").prefetch_related(
+        Prefetch("players", queryset=Player.objects.select_related("discord_user", "steam_user"))
+    ).order_by("created_at")
     serializer_class = TeamSerializer
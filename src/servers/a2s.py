@@ -0,0 +1,206 @@
+import asyncio
+import struct
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+A2S_HEADER = b"\xFF\xFF\xFF\xFF"
+A2S_INFO_REQUEST = A2S_HEADER + b"TSource Engine Query\x00"
+A2S_INFO_RESPONSE = 0x49
+A2S_CHALLENGE_RESPONSE = 0x41
+SERVER_STATUS_CACHE_KEY = "server_status:{}"
+
+
+class A2SInfoProtocol(asyncio.DatagramProtocol):
+    """Datagram protocol sending an A2S_INFO query and answering the server challenge."""
+
+    def __init__(self, future: asyncio.Future) -> None:
+        self.future = future
+        self.transport = None
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+        transport.sendto(A2S_INFO_REQUEST)
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        if self.future.done():
+            return
+        if data[:4] != A2S_HEADER or len(data) < 5:
+            self.future.set_exception(ValueError("Invalid A2S response"))
+        elif data[4] == A2S_CHALLENGE_RESPONSE:
+            self.transport.sendto(A2S_INFO_REQUEST + data[5:9])
+        elif data[4] == A2S_INFO_RESPONSE:
+            self.future.set_result(data[5:])
+        else:
+            self.future.set_exception(ValueError(f"Unexpected A2S response {data[4]:#x}"))
+
+    def error_received(self, exc: Exception) -> None:
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+
+def parse_a2s_info(payload: bytes) -> dict:
+    """
+    Parse an A2S_INFO response payload (without the packet header).
+
+    Args:
+    -----
+        payload (bytes): Response payload.
+
+    Returns:
+    --------
+        dict: Server name, map, players and max players.
+    """
+    offset = 1  # protocol version
+
+    def read_string() -> str:
+        nonlocal offset
+        end = payload.index(b"\x00", offset)
+        value = payload[offset:end].decode("utf-8", errors="replace")
+        offset = end + 1
+        return value
+
+    name = read_string()
+    map_name = read_string()
+    read_string()  # folder
+    read_string()  # game
+    _, players, max_players, bots = struct.unpack_from("<hBBB", payload, offset)
+    return {
+        "name": name,
+        "map": map_name,
+        "players": players,
+        "max_players": max_players,
+        "bots": bots,
+    }
+
+
+async def query_server_info(ip: str, port: int, timeout: float) -> dict:
+    """
+    Query a server with A2S_INFO over asyncio UDP.
+
+    Args:
+    -----
+        ip (str): Server IP.
+        port (int): Server port.
+        timeout (float): Seconds to wait for the answer.
+
+    Returns:
+    --------
+        dict: Parsed server info with the round trip latency in milliseconds.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    started_at = time.perf_counter()
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: A2SInfoProtocol(future), remote_addr=(ip, int(port))
+    )
+    try:
+        payload = await asyncio.wait_for(future, timeout)
+    finally:
+        transport.close()
+    info = parse_a2s_info(payload)
+    info["latency"] = round((time.perf_counter() - started_at) * 1000, 2)
+    return info
+
+
+async def probe_server(ip: str, port: int, timeout: float) -> dict:
+    """
+    Probe a server and describe its state.
+
+    Args:
+    -----
+        ip (str): Server IP.
+        port (int): Server port.
+        timeout (float): Seconds to wait for the answer.
+
+    Returns:
+    --------
+        dict: Server state, ``online`` is False if the server did not answer.
+    """
+    try:
+        info = await query_server_info(ip, port, timeout)
+    except (OSError, asyncio.TimeoutError, ValueError, struct.error):
+        return {"online": False, "players": None, "max_players": None, "map": None, "latency": None}
+    return {
+        "online": True,
+        "players": info["players"],
+        "max_players": info["max_players"],
+        "map": info["map"],
+        "latency": info["latency"],
+    }
+
+
+async def probe_servers(servers: list, timeout: float) -> dict[str, dict]:
+    """
+    Probe servers concurrently.
+
+    Args:
+    -----
+        servers (list[Server]): Servers to probe.
+        timeout (float): Seconds to wait for each answer.
+
+    Returns:
+    --------
+        dict[str, dict]: Server states keyed by server ID.
+    """
+    states = await asyncio.gather(*[probe_server(server.ip, server.port, timeout) for server in servers])
+    checked_at = timezone.now().isoformat()
+    return {server.pk: {**state, "checked_at": checked_at} for server, state in zip(servers, states)}
+
+
+def get_server_status_cache_key(server_id: str) -> str:
+    return SERVER_STATUS_CACHE_KEY.format(server_id)
+
+
+def poll_servers(servers: list) -> dict[str, dict]:
+    """
+    Probe servers concurrently and cache their states for SERVER_STATUS_TTL seconds.
+
+    Args:
+    -----
+        servers (list[Server]): Servers to probe.
+
+    Returns:
+    --------
+        dict[str, dict]: Server states keyed by server ID.
+    """
+    states = asyncio.run(probe_servers(servers, settings.SERVER_STATUS_TIMEOUT))
+    cache.set_many(
+        {get_server_status_cache_key(server_id): state for server_id, state in states.items()},
+        timeout=settings.SERVER_STATUS_TTL,
+    )
+    return states
+
+
+def get_servers_status(servers_ids: list[str]) -> dict[str, dict]:
+    """
+    Get cached server states.
+
+    Args:
+    -----
+        servers_ids (list[str]): Server IDs.
+
+    Returns:
+    --------
+        dict[str, dict]: Cached states keyed by server ID, servers without a state are omitted.
+    """
+    cache_keys = {get_server_status_cache_key(server_id): server_id for server_id in servers_ids}
+    return {cache_keys[key]: state for key, state in cache.get_many(cache_keys.keys()).items()}
+
+
+async def aget_servers_status(servers_ids: list[str]) -> dict[str, dict]:
+    """
+    Async variant of ``get_servers_status``.
+
+    Args:
+    -----
+        servers_ids (list[str]): Server IDs.
+
+    Returns:
+    --------
+        dict[str, dict]: Cached states keyed by server ID, servers without a state are omitted.
+    """
+    cache_keys = {get_server_status_cache_key(server_id): server_id for server_id in servers_ids}
+    return {cache_keys[key]: state for key, state in (await cache.aget_many(cache_keys.keys())).items()}
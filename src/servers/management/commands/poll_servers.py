@@ -0,0 +1,31 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from servers.a2s import poll_servers
+from servers.models import Server
+
+
+class Command(BaseCommand):
+    help = "Probe all servers with A2S_INFO and cache their online state"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.SERVER_STATUS_POLL_INTERVAL,
+            help="Seconds between polls",
+        )
+        parser.add_argument("--once", action="store_true", help="Poll once and exit")
+
+    def handle(self, *args, **options):
+        while True:
+            started_at = time.monotonic()
+            servers = list(Server.objects.only("id", "ip", "port"))
+            states = poll_servers(servers)
+            online = sum(state["online"] for state in states.values())
+            self.stdout.write(f"Polled {len(states)} servers, {online} online")
+            if options["once"]:
+                return
+            time.sleep(max(options["interval"] - (time.monotonic() - started_at), 0))
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guilds', '0006_guild_guild_created_idx'),
+        ('servers', '0006_remove_server_max_players'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='server',
+            index=models.Index(fields=['created_at', 'id'], name='server_created_idx'),
+        ),
+    ]
@@ -1,8 +1,9 @@
-from socket import gaierror
+from django.conf import settings
 from django.db import models
 from prefix_id import PrefixIDField
-from rcon import Client, EmptyResponse, SessionTimeout, WrongPassword
-from steam import game_servers as gs
+
+from servers.a2s import aget_servers_status, get_servers_status, poll_servers, probe_server
+from servers.rcon_pool import send_rcon_command
 
 
 class Server(models.Model):
@@ -19,30 +20,45 @@ class Server(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="server_created_idx"),
+        ]
+
     def get_connect_string(self):
         return f"connect {self.ip}:{self.port}; password {self.password};"
 
     def check_online(self):
-        try:
-            gs.a2s_info((self.ip, self.port))
-            return True
-        except (TimeoutError, ConnectionRefusedError, gaierror):
-            return False
+        # Probed for at most SERVER_STATUS_TIMEOUT, the state is cached like the poller does
+        return poll_servers([self])[self.pk]["online"]
+
+    async def acheck_online(self):
+        state = await probe_server(self.ip, self.port, settings.SERVER_STATUS_TIMEOUT)
+        return state["online"]
+
+    def get_status(self):
+        return get_servers_status([self.pk]).get(self.pk)
+
+    async def aget_status(self):
+        return (await aget_servers_status([self.pk])).get(self.pk)
+
+    def is_online(self):
+        status = self.get_status()
+        if status is None:
+            return self.check_online()
+        return status["online"]
+
+    async def ais_online(self):
+        status = await self.aget_status()
+        if status is None:
+            return await self.acheck_online()
+        return status["online"]
 
     def get_join_link(self):
         return f"steam://connect/{self.ip}:{self.port}/{self.password}"
 
     def send_rcon_command(self, command, *args):
-        try:
-            with Client(
-                    self.host,
-                    int(self.port),
-                    passwd=self.rcon_password,
-            ) as client:
-                return client.run(command, *args)
-        except (EmptyResponse, SessionTimeout, WrongPassword) as e:
-            print(f"Error sending RCON command: {e}")
-            return None
+        return send_rcon_command(self.ip, self.port, self.rcon_password, command, *args)
 
     def __str__(self):
         return f"<{self.ip}:{self.port} - {self.name}>"
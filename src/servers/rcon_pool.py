@@ -0,0 +1,245 @@
+import os
+import socket
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from rcon import Client, EmptyResponse, SessionTimeout, WrongPassword
+from rcon.source.proto import Packet
+
+
+class RconConnectionPool:
+    """
+    Pool of authenticated RCON connections keyed by server address and password.
+
+    Attributes
+    ----------
+        max_connections (int): Maximum number of connections (and concurrent commands) per server.
+        idle_timeout (float): Seconds after which an idle connection is closed instead of reused.
+        health_check_interval (float): Seconds of idleness after which a connection is checked before reuse.
+        timeout (float): Socket timeout of the connections.
+
+    Methods
+    -------
+        run: Run a command on a server using a pooled connection.
+        stats: Get connect/reuse counters.
+        close: Close all idle connections.
+    """
+
+    health_check_command = "echo"
+
+    def __init__(
+            self,
+            max_connections: int = 2,
+            idle_timeout: float = 300,
+            health_check_interval: float = 30,
+            timeout: float | None = 5,
+    ) -> None:
+        """Initialize the RconConnectionPool."""
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle: dict[tuple, list[tuple[Client, float]]] = defaultdict(list)
+        self._semaphores: dict[tuple, threading.BoundedSemaphore] = {}
+        self._stats: dict[tuple, dict[str, int]] = defaultdict(
+            lambda: {"connects": 0, "reuses": 0, "reconnects": 0, "expired": 0, "health_check_failures": 0}
+        )
+
+    @staticmethod
+    def get_key(host: str, port: int | str, password: str | None) -> tuple:
+        return host, int(port), password
+
+    def _get_semaphore(self, key: tuple) -> threading.BoundedSemaphore:
+        with self._lock:
+            if key not in self._semaphores:
+                self._semaphores[key] = threading.BoundedSemaphore(self.max_connections)
+            return self._semaphores[key]
+
+    def _connect(self, key: tuple) -> Client:
+        host, port, password = key
+        client = Client(host, port, passwd=password, timeout=self.timeout)
+        try:
+            client.connect(login=True)
+        except Exception:
+            client.close()
+            raise
+        with self._lock:
+            self._stats[key]["connects"] += 1
+        return client
+
+    def _is_healthy(self, client: Client) -> bool:
+        try:
+            client.run(self.health_check_command)
+            return True
+        except (EmptyResponse, SessionTimeout, OSError):
+            return False
+
+    @staticmethod
+    def _is_closed_by_server(client: Client) -> bool:
+        # Anything readable before a command is sent is EOF (the server closed the idle socket, the command
+        # would end with EmptyResponse) or a stray packet which would mismatch the response ID
+        sock = client._socket
+        timeout = sock.gettimeout()
+        sock.settimeout(0)
+        try:
+            sock.recv(1, socket.MSG_PEEK)
+        except BlockingIOError:
+            return False
+        except OSError:
+            return True
+        finally:
+            sock.settimeout(timeout)
+        return True
+
+    def _acquire(self, key: tuple) -> tuple[Client, bool]:
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle[key]:
+                    break
+                client, last_used = self._idle[key].pop()
+            idle_for = now - last_used
+            if idle_for > self.idle_timeout:
+                client.close()
+                with self._lock:
+                    self._stats[key]["expired"] += 1
+                continue
+            if idle_for > self.health_check_interval and not self._is_healthy(client):
+                client.close()
+                with self._lock:
+                    self._stats[key]["health_check_failures"] += 1
+                continue
+            with self._lock:
+                self._stats[key]["reuses"] += 1
+            return client, True
+        return self._connect(key), False
+
+    def _release(self, key: tuple, client: Client) -> None:
+        with self._lock:
+            self._idle[key].append((client, time.monotonic()))
+
+    def run(self, host: str, port: int | str, password: str | None, command: str, *args: str) -> str:
+        """
+        Run a command on a server using a pooled connection.
+
+        A reused connection closed by the server, or failing while the command is written, is replaced and
+        the command retried once. Once the command is written it is never sent again, a connection failing
+        while reading the response is closed and the error raised.
+
+        Args:
+        -----
+            host (str): Server host.
+            port (int | str): Server RCON port.
+            password (str | None): RCON password.
+            command (str): RCON command.
+            *args (str): Command arguments.
+
+        Returns:
+        --------
+            str: Command response.
+        """
+        key = self.get_key(host, port, password)
+        request = Packet.make_command(command, *args)
+        with self._get_semaphore(key):
+            client, reused = self._acquire(key)
+            try:
+                if reused and self._is_closed_by_server(client):
+                    raise EmptyResponse()
+                client.send(request)
+            except (EmptyResponse, OSError):
+                client.close()
+                if not reused:
+                    raise
+                with self._lock:
+                    self._stats[key]["reconnects"] += 1
+                client = self._connect(key)
+                try:
+                    client.send(request)
+                except BaseException:
+                    client.close()
+                    raise
+            except BaseException:
+                client.close()
+                raise
+            try:
+                response = client.read()
+                if response.id != request.id:
+                    raise SessionTimeout("packet ID mismatch")
+            except BaseException:
+                client.close()
+                raise
+            self._release(key, client)
+            return response.payload.decode()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        Get connect/reuse counters per server.
+
+        Returns:
+        --------
+            dict[str, dict[str, int]]: Counters keyed by ``host:port``.
+        """
+        with self._lock:
+            return {
+                f"{host}:{port}": {**counters, "idle": len(self._idle[(host, port, password)])}
+                for (host, port, password), counters in self._stats.items()
+            }
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            idle = [client for clients in self._idle.values() for client, _ in clients]
+            self._idle.clear()
+        for client in idle:
+            client.close()
+
+
+_pool: RconConnectionPool | None = None
+_pool_pid: int | None = None
+
+
+def get_rcon_pool() -> RconConnectionPool:
+    """
+    Get the process-wide RCON connection pool.
+
+    A forked process (e.g. a gunicorn worker) gets its own pool instead of sharing sockets with its parent.
+
+    Returns:
+    --------
+        RconConnectionPool: The RCON connection pool.
+    """
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        _pool = RconConnectionPool(
+            max_connections=settings.RCON_POOL_MAX_CONNECTIONS,
+            idle_timeout=settings.RCON_POOL_IDLE_TIMEOUT,
+            health_check_interval=settings.RCON_POOL_HEALTH_CHECK_INTERVAL,
+            timeout=settings.RCON_TIMEOUT,
+        )
+        _pool_pid = os.getpid()
+    return _pool
+
+
+def send_rcon_command(host: str, port: int | str, rcon_password: str | None, command: str, *args: str) -> str | None:
+    """
+    Send an RCON command to the server using the connection pool.
+
+    Args:
+    -----
+        host (str): Server host.
+        port (int | str): Server RCON port.
+        rcon_password (str | None): RCON password.
+        command (str): RCON command.
+
+    Returns:
+    --------
+        str | None: Command response or None if the command failed.
+    """
+    try:
+        return get_rcon_pool().run(host, port, rcon_password, command, *args)
+    except (EmptyResponse, SessionTimeout, WrongPassword) as e:
+        print(f"Error sending RCON command: {e}")
+        return None
@@ -1,19 +1,44 @@
+from django.db import models
 from rest_framework import serializers
 from rest_framework.reverse import reverse, reverse_lazy
 
 from guilds.serializers import GuildSerializer
+from servers.a2s import get_servers_status
 from servers.models import Server
 
 
+class ServerStatusSerializer(serializers.Serializer):
+    online = serializers.BooleanField()
+    players = serializers.IntegerField(allow_null=True)
+    max_players = serializers.IntegerField(allow_null=True)
+    map = serializers.CharField(allow_null=True)
+    latency = serializers.FloatField(allow_null=True)
+    checked_at = serializers.DateTimeField()
+
+
+class ServerListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        servers = data.all() if isinstance(data, models.manager.BaseManager) else data
+        self.context["servers_status"] = get_servers_status([server.pk for server in servers])
+        return super().to_representation(servers)
+
+
 class ServerSerializer(serializers.ModelSerializer):
     rcon_password = serializers.CharField(write_only=True, required=False)
     # guild = GuildSerializer(read_only=True)
 
     join_url = serializers.SerializerMethodField()
+    status = serializers.SerializerMethodField()
 
     def get_join_url(self, obj):
         return reverse_lazy("server-join", args=[obj.id], request=self.context["request"])
 
+    def get_status(self, obj) -> ServerStatusSerializer:
+        servers_status = self.context.get("servers_status")
+        status = servers_status.get(obj.pk) if servers_status is not None else obj.get_status()
+        return ServerStatusSerializer(status).data if status else None
+
     class Meta:
         model = Server
-        fields = ["id", "name", "ip", "port", "password", "is_public", "rcon_password", "guild", "join_url"]
\ No newline at end of file
+        fields = ["id", "name", "ip", "port", "password", "is_public", "rcon_password", "guild", "join_url", "status"]
+        list_serializer_class = ServerListSerializer
\ No newline at end of file
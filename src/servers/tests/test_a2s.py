@@ -0,0 +1,113 @@
+import asyncio
+import socket
+import struct
+import threading
+
+import pytest
+from django.core.cache import cache
+
+from servers.a2s import A2S_HEADER, A2S_INFO_REQUEST, parse_a2s_info, poll_servers
+from servers.models import Server
+
+CHALLENGE = b"\x01\x02\x03\x04"
+
+
+def build_info_payload(name="Test server", map_name="de_mirage", players=7, max_players=10):
+    return (
+        b"\x11"
+        + name.encode() + b"\x00"
+        + map_name.encode() + b"\x00"
+        + b"csgo\x00"
+        + b"Counter-Strike 2\x00"
+        + struct.pack("<hBBB", 730, players, max_players, 0)
+        + b"dl\x00\x01"
+    )
+
+
+@pytest.fixture
+def a2s_server():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(5)
+    requests = []
+
+    def serve():
+        try:
+            while True:
+                data, addr = sock.recvfrom(1400)
+                requests.append(data)
+                if data == A2S_INFO_REQUEST:
+                    sock.sendto(A2S_HEADER + b"A" + CHALLENGE, addr)
+                elif data == A2S_INFO_REQUEST + CHALLENGE:
+                    sock.sendto(A2S_HEADER + b"I" + build_info_payload(), addr)
+        except OSError:
+            pass
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield sock.getsockname(), requests
+    sock.close()
+
+
+def test_parse_a2s_info():
+    info = parse_a2s_info(build_info_payload(players=3, max_players=12))
+    assert info == {"name": "Test server", "map": "de_mirage", "players": 3, "max_players": 12, "bots": 0}
+
+
+@pytest.mark.django_db
+def test_poll_servers(a2s_server, settings):
+    settings.SERVER_STATUS_TIMEOUT = 1
+    (ip, port), requests = a2s_server
+    online_server = Server.objects.create(ip=ip, port=port, name="Online server")
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as closed_socket:
+        closed_socket.bind(("127.0.0.1", 0))
+        closed_port = closed_socket.getsockname()[1]
+    offline_server = Server.objects.create(ip="127.0.0.1", port=closed_port, name="Offline server")
+    cache.clear()
+
+    states = poll_servers([online_server, offline_server])
+
+    assert requests == [A2S_INFO_REQUEST, A2S_INFO_REQUEST + CHALLENGE]
+    assert states[online_server.pk]["online"] is True
+    assert states[online_server.pk]["players"] == 7
+    assert states[online_server.pk]["max_players"] == 10
+    assert states[online_server.pk]["map"] == "de_mirage"
+    assert states[online_server.pk]["latency"] >= 0
+    assert states[offline_server.pk]["online"] is False
+    assert online_server.get_status() == states[online_server.pk]
+    assert online_server.is_online() is True
+    assert offline_server.is_online() is False
+
+
+@pytest.mark.django_db
+def test_acheck_online(a2s_server, settings):
+    settings.SERVER_STATUS_TIMEOUT = 1
+    (ip, port), requests = a2s_server
+    online_server = Server.objects.create(ip=ip, port=port, name="Online server")
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as closed_socket:
+        closed_socket.bind(("127.0.0.1", 0))
+        closed_port = closed_socket.getsockname()[1]
+    offline_server = Server.objects.create(ip="127.0.0.1", port=closed_port, name="Offline server")
+    cache.clear()
+
+    async def check():
+        return await asyncio.gather(online_server.acheck_online(), offline_server.ais_online())
+
+    assert asyncio.run(check()) == [True, False]
+    poll_servers([online_server])
+    assert asyncio.run(online_server.aget_status())["players"] == 7
+
+
+@pytest.mark.django_db
+def test_is_online_probes_uncached_server(a2s_server, settings, mocker):
+    settings.SERVER_STATUS_TIMEOUT = 1
+    a2s_info = mocker.patch("steam.game_servers.a2s_info")
+    (ip, port), requests = a2s_server
+    server = Server.objects.create(ip=ip, port=port, name="Online server")
+    cache.clear()
+
+    assert server.is_online() is True
+    a2s_info.assert_not_called()
+    assert server.get_status()["players"] == 7
+    assert server.is_online() is True
+    assert len(requests) == 2
@@ -41,3 +41,11 @@ def test_get_join_link(server_data):
     server = Server.objects.create(**server_data)
     join_link = server.get_join_link()
     assert join_link == f"steam://connect/{server.ip}:{server.port}/{server.password}"
+
+
+@pytest.mark.django_db
+def test_send_rcon_command(server_data, mocker):
+    server = Server.objects.create(**server_data)
+    run = mocker.patch("servers.rcon_pool.RconConnectionPool.run", return_value="ok")
+    assert server.send_rcon_command("css_endmatch") == "ok"
+    run.assert_called_once_with(server.ip, server.port, server.rcon_password, "css_endmatch")
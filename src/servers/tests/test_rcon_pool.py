@@ -0,0 +1,160 @@
+import pytest
+from rcon import EmptyResponse, SessionTimeout, WrongPassword
+from rcon.source.proto import Packet, Type
+
+from servers import rcon_pool
+from servers.rcon_pool import RconConnectionPool
+
+
+class FakeSocket:
+    def __init__(self):
+        self.closed_by_server = False
+        self.timeout = None
+
+    def gettimeout(self):
+        return self.timeout
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def recv(self, size, flags=0):
+        if self.closed_by_server:
+            return b""
+        raise BlockingIOError()
+
+
+class FakeClient:
+    instances = []
+
+    def __init__(self, host, port, passwd=None, timeout=None):
+        self.host = host
+        self.port = port
+        self.passwd = passwd
+        self.commands = []
+        self.closed = False
+        self.fail_next = None
+        self.fail_on_send = None
+        self.request = None
+        self._socket = FakeSocket()
+        FakeClient.instances.append(self)
+
+    def connect(self, login=False):
+        if self.passwd == "wrong":
+            raise WrongPassword()
+
+    def run(self, command, *args):
+        if self.fail_next:
+            error, self.fail_next = self.fail_next, None
+            raise error
+        self.commands.append(" ".join((command, *args)))
+        return f"{command} ok"
+
+    def send(self, packet):
+        if self.fail_on_send:
+            error, self.fail_on_send = self.fail_on_send, None
+            raise error
+        self.request = packet
+        self.commands.append(packet.payload.decode())
+
+    def read(self):
+        if self._socket.closed_by_server:
+            raise EmptyResponse()
+        if self.fail_next:
+            error, self.fail_next = self.fail_next, None
+            raise error
+        command = self.request.payload.decode().split(" ")[0]
+        return Packet(self.request.id, Type.SERVERDATA_RESPONSE_VALUE, f"{command} ok".encode())
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_client(mocker):
+    FakeClient.instances = []
+    mocker.patch.object(rcon_pool, "Client", FakeClient)
+    return FakeClient
+
+
+def test_pool_reuses_authenticated_connection(fake_client):
+    pool = RconConnectionPool()
+    assert pool.run("127.0.0.1", "27015", "changeme", "css_endmatch") == "css_endmatch ok"
+    assert pool.run("127.0.0.1", 27015, "changeme", "matchzy_loadmatch_url", '"url"') == "matchzy_loadmatch_url ok"
+    assert len(fake_client.instances) == 1
+    assert fake_client.instances[0].commands == ["css_endmatch", 'matchzy_loadmatch_url "url"']
+    assert pool.stats()["127.0.0.1:27015"]["connects"] == 1
+    assert pool.stats()["127.0.0.1:27015"]["reuses"] == 1
+
+
+def test_pool_keeps_connections_per_server(fake_client):
+    pool = RconConnectionPool()
+    pool.run("127.0.0.1", 27015, "changeme", "status")
+    pool.run("127.0.0.1", 27016, "changeme", "status")
+    assert len(fake_client.instances) == 2
+    assert pool.stats()["127.0.0.1:27016"]["connects"] == 1
+
+
+def test_pool_reconnects_when_server_closed_idle_connection(fake_client):
+    pool = RconConnectionPool()
+    pool.run("127.0.0.1", 27015, "changeme", "status")
+    first_client = fake_client.instances[0]
+    first_client._socket.closed_by_server = True
+    assert pool.run("127.0.0.1", 27015, "changeme", "css_endmatch") == "css_endmatch ok"
+    assert first_client.closed
+    assert first_client.commands == ["status"]
+    assert fake_client.instances[1].commands == ["css_endmatch"]
+    assert pool.stats()["127.0.0.1:27015"]["reconnects"] == 1
+
+
+def test_pool_reconnects_when_sending_fails(fake_client):
+    pool = RconConnectionPool()
+    pool.run("127.0.0.1", 27015, "changeme", "status")
+    first_client = fake_client.instances[0]
+    first_client.fail_on_send = BrokenPipeError()
+    assert pool.run("127.0.0.1", 27015, "changeme", "css_endmatch") == "css_endmatch ok"
+    assert first_client.closed
+    assert fake_client.instances[1].commands == ["css_endmatch"]
+    assert pool.stats()["127.0.0.1:27015"]["reconnects"] == 1
+
+
+@pytest.mark.parametrize("error", [EmptyResponse(), SessionTimeout("packet ID mismatch"), TimeoutError()])
+def test_pool_does_not_resend_written_command(fake_client, error):
+    pool = RconConnectionPool()
+    pool.run("127.0.0.1", 27015, "changeme", "status")
+    first_client = fake_client.instances[0]
+    first_client.fail_next = error
+    with pytest.raises(type(error)):
+        pool.run("127.0.0.1", 27015, "changeme", "css_endmatch")
+    assert first_client.closed
+    assert first_client.commands == ["status", "css_endmatch"]
+    assert len(fake_client.instances) == 1
+    assert pool.run("127.0.0.1", 27015, "changeme", "status") == "status ok"
+    assert len(fake_client.instances) == 2
+
+
+def test_pool_closes_expired_connections(fake_client, mocker):
+    pool = RconConnectionPool(idle_timeout=10)
+    monotonic = mocker.patch.object(rcon_pool.time, "monotonic", return_value=100)
+    pool.run("127.0.0.1", 27015, "changeme", "status")
+    monotonic.return_value = 200
+    pool.run("127.0.0.1", 27015, "changeme", "status")
+    assert fake_client.instances[0].closed
+    assert len(fake_client.instances) == 2
+    assert pool.stats()["127.0.0.1:27015"]["expired"] == 1
+
+
+def test_pool_health_checks_idle_connections(fake_client, mocker):
+    pool = RconConnectionPool(idle_timeout=100, health_check_interval=10)
+    monotonic = mocker.patch.object(rcon_pool.time, "monotonic", return_value=100)
+    pool.run("127.0.0.1", 27015, "changeme", "status")
+    fake_client.instances[0].fail_next = ConnectionResetError()
+    monotonic.return_value = 150
+    pool.run("127.0.0.1", 27015, "changeme", "status")
+    assert fake_client.instances[0].closed
+    assert pool.stats()["127.0.0.1:27015"]["health_check_failures"] == 1
+    assert pool.stats()["127.0.0.1:27015"]["connects"] == 2
+
+
+def test_send_rcon_command_with_wrong_password(fake_client, mocker):
+    mocker.patch.object(rcon_pool, "_pool", None)
+    assert rcon_pool.send_rcon_command("127.0.0.1", 27015, "wrong", "status") is None
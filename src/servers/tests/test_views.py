@@ -1,10 +1,12 @@
 import pytest
+from django.core.cache import cache
 from rest_framework import status
 from rest_framework.reverse import reverse_lazy
 
 from cs2_battle_bot.tests.conftest import api_client, client_with_api_key
 from guilds.models import Guild
 from guilds.tests.conftest import guild_data
+from servers.a2s import get_server_status_cache_key
 from servers.models import Server
 
 API_ENDPOINT = "/api/servers/"
@@ -154,4 +156,26 @@ def test_delete_server(client_with_api_key, server):
 def test_server_join(client_with_api_key, server):
     response = client_with_api_key.get(f"{API_ENDPOINT}{server.id}/join/")
     assert response.status_code == 301
-    assert response.url == f"steam://connect/{server.ip}:{server.port}/{server.password}"
\ No newline at end of file
+    assert response.url == f"steam://connect/{server.ip}:{server.port}/{server.password}"
+
+@pytest.mark.django_db
+def test_get_servers_list_with_cached_status(client_with_api_key, server):
+    cache.clear()
+    response = client_with_api_key.get(API_ENDPOINT)
+    assert response.data["results"][0]["status"] is None
+
+    cache.set(get_server_status_cache_key(server.pk), {
+        "online": True,
+        "players": 4,
+        "max_players": 10,
+        "map": "de_nuke",
+        "latency": 12.5,
+        "checked_at": "2024-05-01T12:00:00+00:00",
+    })
+    response = client_with_api_key.get(API_ENDPOINT)
+    assert response.data["results"][0]["status"]["online"] is True
+    assert response.data["results"][0]["status"]["players"] == 4
+    assert response.data["results"][0]["status"]["map"] == "de_nuke"
+
+    response = client_with_api_key.get(f"{API_ENDPOINT}{server.id}/")
+    assert response.data["status"]["latency"] == 12.5
@@ -6,6 +6,7 @@ from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
 
+from api.pagination import CursorOrPageNumberPagination
 from servers.models import Server
 from servers.serializers import ServerSerializer
 
@@ -18,6 +19,7 @@ class CustomSchemeRedirect(HttpResponsePermanentRedirect):
 class ServerViewSet(viewsets.ModelViewSet):
     queryset = Server.objects.all().order_by("created_at")
     serializer_class = ServerSerializer
+    pagination_class = CursorOrPageNumberPagination
 
     @extend_schema(
         parameters=[